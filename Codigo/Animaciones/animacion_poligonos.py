@@ -4,7 +4,12 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
 from matplotlib.patches import Polygon
 from Codigo.Auxiliares.graficas import dibujar_poligonos
-from Codigo.Auxiliares.lectura_datos import leer_datos_desde_json
+from Codigo.Auxiliares.lectura_datos import leer_datos
+from Codigo.Auxiliares.escena_binaria import leer_muestras_npz
+from Codigo.Auxiliares.evaluacion import evaluar_escena
+from Codigo.Auxiliares.muestreo import muestreo_curva
+from Codigo.Auxiliares.autointerseccion import intervalos_autointerseccion, tiempos_en_intervalos, unir_intervalos
+from Codigo.Auxiliares.area import polinomio_area, cambios_area, tramos_invertidos
 from .auxiliares_animacion import *
 
 if __name__ == "__main__":
@@ -14,10 +19,10 @@ if __name__ == "__main__":
     args = parsear_argumentos()
     parametros = leer_argumentos(args)
     
-    # 2. Leer polígonos y curvas desde el JSON 
+    # 2. Leer polígonos y curvas desde el JSON (o desde el formato binario .npz)
     ruta_datos = args.archivo_datos
     lista_poligonos, lista_curvas, intervalos_t, tiempos_triangulos, tiempos_triangulos_mal, \
-    intervalos_triangulos_mal, reparametrizaciones = leer_datos_desde_json(ruta_datos)
+    intervalos_triangulos_mal, reparametrizaciones = leer_datos(ruta_datos)
     n = len(lista_curvas)
     print("Polígonos y curvas leídos")
 
@@ -30,9 +35,10 @@ if __name__ == "__main__":
     if len(tiempos_triangulos) == 0:
         tiempos_triangulos = intervalos_t
 
-    # Reparametrización de las curvas dadas
+    # Reparametrización de las curvas dadas: cada curva guarda su composición con la reparametrización,
+    # de modo que todas se evalúan directamente en los tiempos de la animación
     t_vals = crear_valores_t(intervalos_t, parametros["frames_por_intervalo"])
-    t_vals_curvas = list()
+    intervalo_animacion = (intervalos_t[0], intervalos_t[-1])
     if not parametros["usar_repars"]:
         reparametrizaciones = []
 
@@ -40,10 +46,23 @@ if __name__ == "__main__":
         if len(reparametrizaciones) < n:
             print("Hay menos reparametrizaciones que curvas, se asignan en orden de aparición en el fichero")
         for i in range(min(len(reparametrizaciones), n)):
-            t_vals_curvas.append(np.array([reparametrizaciones[i](t) for t in t_vals]))
+            lista_curvas[i].set_reparametrizacion(reparametrizaciones[i], intervalo_animacion)
     
-    for i in range(n - len(reparametrizaciones)):
-        t_vals_curvas.append(t_vals)
+    # Si el fichero no indica cuándo está mal el polígono, se calculan los intervalos en los que se corta a sí mismo
+    if intervalos_triangulos_mal is None:
+        intervalos_triangulos_mal = intervalos_autointerseccion(lista_curvas, intervalos_t[0], intervalos_t[-1])
+        print(f"Intervalos en los que el polígono se corta a sí mismo: "
+              f"{[(float(a), float(b)) for a, b in intervalos_triangulos_mal]}")
+    # Tiempos en los que el polígono degenera o se invierte, a partir de su área con signo
+    if parametros["comprobar_area"]:
+        area = polinomio_area(lista_curvas)
+        eventos, tramos = cambios_area(area, intervalos_t[0], intervalos_t[-1])
+        for (a, b), tipo in eventos:
+            descripcion = "se invierte" if tipo == "inversion" else "degenera"
+            print(f"El polígono {descripcion} en t = {float((a + b) / 2)}")
+        intervalos_triangulos_mal = unir_intervalos(intervalos_triangulos_mal + tramos_invertidos(tramos))
+    if tiempos_triangulos_mal is None:
+        tiempos_triangulos_mal = tiempos_en_intervalos(intervalos_t, intervalos_triangulos_mal)
     
     # Cálculo del número de frames para que el tiempo sea el indicado
     frames_animacion = len(t_vals)
@@ -56,12 +75,21 @@ if __name__ == "__main__":
                     parametros["tiempo_parada_final"] + parametros["tiempo_fade_inicial"])
 
     
-    # Evaluación de las curvas dadas en sus respectivos intervalos de tiempo
-    x = []
-    y = []
-    for i in range(n):
-        x.append(np.array([lista_curvas[i].xpoly(t) for t in t_vals_curvas[i]]))
-        y.append(np.array([lista_curvas[i].ypoly(t) for t in t_vals_curvas[i]]))
+    # Evaluación de las curvas dadas en sus respectivos intervalos de tiempo. Si el fichero binario tiene
+    # las posiciones ya calculadas en los mismos tiempos (y con las mismas reparametrizaciones), se usan esas
+    vertices = None
+    if ruta_datos.lower().endswith(".npz"):
+        muestras = leer_muestras_npz(ruta_datos)
+        if muestras is not None:
+            t_muestras, vertices_muestras, muestras_reparametrizadas = muestras
+            mismos_tiempos = np.array_equal(t_muestras, np.asarray(t_vals, dtype=float))
+            if muestras_reparametrizadas == (len(reparametrizaciones) > 0) and mismos_tiempos:
+                vertices = np.asarray(vertices_muestras)
+                print("Posiciones de las curvas leídas del fichero")
+    if vertices is None:
+        vertices = evaluar_escena(lista_curvas, t_vals, reparametrizadas=True, intervalo=intervalo_animacion)
+    x = vertices[:, :, 0]
+    y = vertices[:, :, 1]
 
     # Creamos la figura para la animación
     fig, ax = plt.subplots()
@@ -89,6 +117,17 @@ if __name__ == "__main__":
         traces_y.append([])
         traces.append(ax.plot([], [], color = colores_curvas[i%nro_colores_curvas], alpha = parametros["alpha_curvas"])[0])
 
+    # Muestreo adaptativo de las trazas: para cada curva se calcula una vez la poligonal que la aproxima con la
+    # tolerancia dada y, para cada frame, cuántos de sus puntos corresponden a tiempos ya recorridos
+    muestreos_trazas = None
+    if parametros["tolerancia_trazas"] is not None:
+        tolerancia = parametros["tolerancia_trazas"] * max(longitud_x, longitud_y)
+        muestreos_trazas = []
+        for curva in lista_curvas:
+            t_muestreo, puntos_muestreo = muestreo_curva(curva, [float(ti) for ti in intervalos_t], tolerancia,
+                                                         reparametrizada=True)
+            muestreos_trazas.append((puntos_muestreo, np.searchsorted(t_muestreo, t_vals, side='right')))
+
     colormap_poligono = plt.cm.winter
     verts_poligono_inicial = [(x[i][0], y[i][0]) for i in range(n)]
     poligono_movil = Polygon(verts_poligono_inicial, closed=True, color = colormap_poligono(0), alpha = 0)
@@ -166,13 +205,19 @@ if __name__ == "__main__":
         for i, point in enumerate(points):
             point.set_data([x[i][t]], [y[i][t]])
         
-        for i, trace_x in enumerate(traces_x):
-            trace_x.append(x[i][t])
-        for i, trace_y in enumerate(traces_y):
-            trace_y.append(y[i][t])
+        if muestreos_trazas is None:
+            for i, trace_x in enumerate(traces_x):
+                trace_x.append(x[i][t])
+            for i, trace_y in enumerate(traces_y):
+                trace_y.append(y[i][t])
 
-        for i, trace in enumerate(traces):
-            trace.set_data(traces_x[i], traces_y[i])
+            for i, trace in enumerate(traces):
+                trace.set_data(traces_x[i], traces_y[i])
+        else:
+            for i, trace in enumerate(traces):
+                puntos_muestreo, indices_frames = muestreos_trazas[i]
+                k = indices_frames[t]
+                trace.set_data(np.append(puntos_muestreo[:k, 0], x[i][t]), np.append(puntos_muestreo[:k, 1], y[i][t]))
 
         verts_poligono_movil = [(x[i][t], y[i][t]) for i in range(n)]
         poligono_movil.set_xy(verts_poligono_movil)
@@ -31,7 +31,8 @@ def parsear_argumentos():
     )
     parser.add_argument(
         "archivo_datos",
-        help="Ruta al fichero JSON que contiene los datos para la animación: polígonos, curvas y reparametrizaciones"
+        help="Ruta al fichero JSON (o .npz, ver escena_binaria) que contiene los datos para la animación: " \
+        "polígonos, curvas y reparametrizaciones"
     )
     parser.add_argument(
         "--frames_por_intervalo",
@@ -92,6 +93,17 @@ def parsear_argumentos():
         help="Color del borde de los polígonos móviles. Para que sea el mismo que el interior, poner 'interior'" \
         "Por defecto es None"
     )
+    parser.add_argument(
+        "--tolerancia_trazas",
+        help="Si se da, las trazas de las curvas se dibujan con un muestreo adaptativo en el que la distancia " \
+        "entre la traza y la curva es a lo sumo este valor, como fracción del tamaño de la figura (por ejemplo 0.001). " \
+        "Por defecto, las trazas unen las posiciones de los vértices en cada frame"
+    )
+    parser.add_argument(
+        "--comprobar_area",
+        help="Si es 'True' (o 1), se calcula el polinomio de área con signo del polígono móvil, se indican los " \
+        "tiempos en los que degenera o cambia de orientación y se pinta de rojo mientras está invertido"
+    )
     args = parser.parse_args()
     return args
 
@@ -180,6 +192,11 @@ def leer_argumentos(args):
         edge_poligonos = args.edge_poligonos
     parametros["edge_poligonos"] = edge_poligonos
 
+    tolerancia_trazas = None
+    if args.tolerancia_trazas:
+        tolerancia_trazas = float(args.tolerancia_trazas)
+    parametros["tolerancia_trazas"] = tolerancia_trazas
+
     if args.guardar_archivo:
         guardar = True
         ruta_archivo = args.guardar_archivo
@@ -201,6 +218,11 @@ def leer_argumentos(args):
             "Por defecto, se utilizan las reparametrizaciones si se han dado en el fichero.")
     parametros["usar_repars"] = usar_repars
 
+    comprobar_area = False
+    if args.comprobar_area:
+        comprobar_area = args.comprobar_area.lower() in ('true', 't', '1')
+    parametros["comprobar_area"] = comprobar_area
+
     return parametros
 
 def decidir_edgecolor(edge_poligonos, color_interior):
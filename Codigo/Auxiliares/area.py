@@ -0,0 +1,80 @@
+import sympy as sp
+from Codigo.Auxiliares.sturm import aislar_raices
+t = sp.symbols('t')
+
+TOLERANCIA_AREA = sp.Rational(1, 10**9)
+
+def polinomio_area(curvas):
+    """
+    Devuelve el área con signo (fórmula del área de Gauss) del polígono cuyos vértices son las posiciones
+    de las curvas, en orden, como sympy Polynomial en 't':
+        A(t) = 1/2 sum_i (x_i(t) y_{i+1}(t) - x_{i+1}(t) y_i(t)).
+    Si las curvas tienen reparametrización, se usan los polinomios compuestos. El área es positiva si
+    el polígono está orientado en sentido antihorario.
+    """
+    vertices = [curva.polinomios_reparametrizados() for curva in curvas]
+    n = len(vertices)
+    area = sp.Poly(0, t)
+    for i in range(n):
+        x_i, y_i = vertices[i]
+        x_sig, y_sig = vertices[(i+1) % n]
+        area += x_i * y_sig - x_sig * y_i
+    return area * sp.Rational(1, 2)
+
+def cambios_area(area, t0, t1, tolerancia = TOLERANCIA_AREA):
+    """
+    Analiza el signo del polinomio de área en el intervalo [t0, t1] de una sola vez, aislando todas sus raíces
+    con su multiplicidad (ver aislar_raices; el área suele tener grado alto, y entonces se aíslan con sympy).
+    Devuelve:
+    - Una lista de tuplas (intervalo, tipo), una por cada raíz del área en [t0, t1], siendo intervalo un par (a, b)
+      de sympy Rational de longitud menor que la tolerancia que contiene la raíz (a == b si es exacta), y tipo
+      "inversion" si el área cambia de signo en la raíz (multiplicidad impar: el polígono se invierte) o
+      "colapso" si el polígono degenera pero recupera su orientación (multiplicidad par, o raíz en un extremo).
+    - Una lista de tuplas (a, b, signo) con los tramos en los que el área tiene signo constante y no nulo.
+    Si el área es idénticamente nula, el polígono está degenerado todo el tiempo y se lanza una Exception.
+    """
+    if area.is_zero:
+        raise Exception("El área del polígono es nula en todo momento")
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    raices = aislar_raices(area, t0, t1, tolerancia, multiplicidades = True, extremos = True)
+
+    eventos = list()
+    for (a, b), multiplicidad in raices:
+        en_extremo = b <= t0 or a >= t1
+        tipo = "inversion" if multiplicidad % 2 == 1 and not en_extremo else "colapso"
+        eventos.append(((a, b), tipo))
+
+    # Tramos de signo constante entre raíces consecutivas (aproximadas por el centro de su intervalo aislante).
+    # El signo se evalúa de forma exacta fuera de los intervalos aislantes, donde el área no se anula.
+    extremos = [t0] + [(a + b) / 2 for (a, b), _ in raices if t0 < b and a < t1] + [t1]
+    huecos = [t0] + [extremo for (a, b), _ in raices for extremo in (a, b)] + [t1]
+    huecos = [(huecos[k], huecos[k+1]) for k in range(0, len(huecos), 2)]
+    tramos = list()
+    for (a, b), (izq, der) in zip(zip(extremos[:-1], extremos[1:]), [h for h in huecos if h[0] < h[1]]):
+        tramos.append((a, b, sp.sign(area.eval((izq + der) / 2))))
+    return eventos, tramos
+
+def intervalos_invertidos(curvas, t0, t1, tolerancia = TOLERANCIA_AREA):
+    """
+    Intervalos de tiempo dentro de [t0, t1] en los que el polígono formado por las curvas tiene la orientación
+    contraria a la que tiene al principio.
+    """
+    _, tramos = cambios_area(polinomio_area(curvas), t0, t1, tolerancia)
+    return tramos_invertidos(tramos)
+
+def tramos_invertidos(tramos):
+    """
+    A partir de los tramos de signo constante que devuelve cambios_area, devuelve la lista de intervalos
+    en los que el signo es el contrario al del primer tramo.
+    """
+    if len(tramos) == 0:
+        return []
+    signo_inicial = tramos[0][2]
+    intervalos = list()
+    for a, b, s in tramos:
+        if s != signo_inicial:
+            if intervalos and intervalos[-1][1] == a:
+                intervalos[-1] = (intervalos[-1][0], b)
+            else:
+                intervalos.append((a, b))
+    return intervalos
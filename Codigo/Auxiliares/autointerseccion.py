@@ -0,0 +1,129 @@
+import os
+import argparse
+import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+from Codigo.Auxiliares.sturm import aislar_raices
+
+TOLERANCIA_TIEMPOS = sp.Rational(1, 10**9)
+
+def orientacion(p, q, r):
+    """
+    Polinomio de orientación de los puntos móviles p, q y r (tuplas de dos sympy Polynomial en 't'):
+    el determinante (q - p) x (r - p), positivo si p, q, r están en sentido antihorario.
+    """
+    return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+def pares_lados_no_adyacentes(n):
+    """
+    Pares (i, j), i < j, de lados no adyacentes de un polígono de n vértices, siendo el lado i el que une
+    los vértices i e i+1 (módulo n).
+    """
+    return [(i, j) for i in range(n) for j in range(i + 2, n) if not (i == 0 and j == n - 1)]
+
+def intervalos_corte_lados(p1, p2, q1, q2, t0, t1, tolerancia = TOLERANCIA_TIEMPOS):
+    """
+    Intervalos de tiempo dentro de (t0, t1) en los que los segmentos móviles p1p2 y q1q2 se cortan
+    (en un punto interior de ambos).
+    Los segmentos se cortan cuando p1 y p2 quedan a distinto lado de la recta q1q2 y q1 y q2 a distinto lado
+    de la recta p1p2, es decir, cuando los productos de las orientaciones correspondientes son negativos.
+    Estos signos solo pueden cambiar en las raíces de las cuatro orientaciones, que se aíslan de forma exacta
+    y se refinan hasta la tolerancia dada. Entre cada dos raíces consecutivas se evalúan las orientaciones
+    (de forma exacta) en un punto intermedio.
+    Devuelve una lista de intervalos (a, b) (sympy Rational), cuyos extremos son aproximaciones de las raíces
+    con error menor que la tolerancia.
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    orientaciones = [orientacion(q1, q2, p1), orientacion(q1, q2, p2),
+                     orientacion(p1, p2, q1), orientacion(p1, p2, q2)]
+    if any(o.is_zero for o in orientaciones):
+        # Alguno de los puntos está siempre alineado con el otro segmento: no hay cortes propios
+        return []
+
+    raices = sorted((a + b) / 2 for o in orientaciones for a, b in aislar_raices(o, t0, t1, tolerancia))
+    cortes = [t0] + [r for r in raices if r - t0 > tolerancia and t1 - r > tolerancia] + [t1]
+    # Las raíces de polinomios distintos más cercanas que la tolerancia se consideran la misma
+    cortes = [c for k, c in enumerate(cortes) if k == 0 or c - cortes[k-1] > tolerancia]
+
+    intervalos = list()
+    for a, b in zip(cortes[:-1], cortes[1:]):
+        medio = (a + b) / 2
+        s = [sp.sign(o.eval(medio)) for o in orientaciones]
+        if s[0] * s[1] < 0 and s[2] * s[3] < 0:
+            if intervalos and intervalos[-1][1] == a:
+                intervalos[-1] = (intervalos[-1][0], b)
+            else:
+                intervalos.append((a, b))
+    return intervalos
+
+def _trabajo_lados(trabajo):
+    i, j, vertices, t0, t1, tolerancia = trabajo
+    n = len(vertices)
+    return intervalos_corte_lados(vertices[i], vertices[(i+1) % n], vertices[j], vertices[(j+1) % n],
+                                  t0, t1, tolerancia)
+
+def intervalos_autointerseccion(curvas, t0, t1, procesos = None, tolerancia = TOLERANCIA_TIEMPOS):
+    """
+    Calcula los intervalos de tiempo dentro de (t0, t1) en los que el polígono cuyos vértices son las posiciones
+    de las curvas (en orden, y con su reparametrización si la tienen) no es simple, porque se cortan dos de sus
+    lados no adyacentes.
+    Cada par de lados no adyacentes es un trabajo independiente, y los trabajos se reparten entre procesos
+    (por defecto, tantos como núcleos; con procesos = 1 se hace todo en el proceso actual).
+    Los polígonos de tres vértices no tienen lados no adyacentes, así que para ellos el resultado es vacío.
+    Devuelve una lista ordenada de intervalos (a, b) disjuntos (sympy Rational).
+    """
+    vertices = [curva.polinomios_reparametrizados() for curva in curvas]
+    trabajos = [(i, j, vertices, t0, t1, tolerancia) for i, j in pares_lados_no_adyacentes(len(vertices))]
+
+    if procesos == 1 or len(trabajos) <= 1:
+        resultados = list(map(_trabajo_lados, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(_trabajo_lados, trabajos))
+
+    return unir_intervalos([intervalo for intervalos in resultados for intervalo in intervalos])
+
+def unir_intervalos(intervalos):
+    """
+    Une los intervalos (a, b) que se solapan o se tocan. Devuelve una lista ordenada de intervalos disjuntos.
+    """
+    unidos = list()
+    for a, b in sorted(intervalos):
+        if unidos and a <= unidos[-1][1]:
+            unidos[-1] = (unidos[-1][0], max(unidos[-1][1], b))
+        else:
+            unidos.append((a, b))
+    return unidos
+
+def tiempos_en_intervalos(tiempos, intervalos):
+    """
+    Devuelve los tiempos de la lista dada que están en alguno de los intervalos (cerrados).
+    """
+    return [ti for ti in tiempos if any(a <= ti <= b for a, b in intervalos)]
+
+if __name__ == "__main__":
+    from Codigo.Auxiliares.lectura_datos import leer_datos_desde_json
+
+    parser = argparse.ArgumentParser(
+        description="Calcula los intervalos de tiempo en los que el polígono formado por las curvas de una " \
+        "animación se corta a sí mismo"
+    )
+    parser.add_argument(
+        "archivo_datos",
+        help="Ruta al fichero JSON con los datos de la animación"
+    )
+    parser.add_argument(
+        "--procesos",
+        help="Número de procesos entre los que repartir los pares de lados (por defecto, uno por núcleo)"
+    )
+    args = parser.parse_args()
+
+    _, curvas, tiempos, _, _, _, repars = leer_datos_desde_json(args.archivo_datos)
+    for curva, repar in zip(curvas, repars):
+        curva.set_reparametrizacion(repar, (tiempos[0], tiempos[-1]))
+    procesos = int(args.procesos) if args.procesos else os.cpu_count()
+
+    intervalos = intervalos_autointerseccion(curvas, tiempos[0], tiempos[-1], procesos)
+    if len(intervalos) == 0:
+        print("El polígono no se corta a sí mismo")
+    for a, b in intervalos:
+        print(f"[{float(a)}, {float(b)}]")
@@ -0,0 +1,123 @@
+import math
+from fractions import Fraction
+from math import comb
+from Codigo.Auxiliares.cambios_signo import ningun_cambio, signo_filtrado, gamma, a_float, MINIMO_FILTRO
+from Codigo.Auxiliares.hermite import a_fraccion
+
+PROFUNDIDAD_SUBDIVISION = 3
+
+def coeficientes_bernstein(coefs, a, b, grado = None):
+    """
+    Devuelve los coeficientes de Bernstein en el intervalo [a, b] del polinomio de coeficientes coefs
+    (Fraction, orden creciente de grado), es decir, los b_k tales que
+        p(t) = sum_k b_k C(n, k) u^k (1 - u)^(n - k),   con u = (t - a) / (b - a).
+    grado es el grado n de la base (por defecto, el del polinomio; puede ser mayor).
+    Todo el cálculo es exacto.
+    """
+    a, b = a_fraccion(a), a_fraccion(b)
+    n = len(coefs) - 1 if grado is None else grado
+    h = b - a
+
+    # q(u) = p(a + h u): desarrollo de Taylor en a (Horner) y cambio de escala
+    q = [Fraction(0)] * (len(coefs))
+    for c in reversed(coefs):
+        for i in range(len(q) - 1, 0, -1):
+            q[i] = q[i] * a + q[i-1]
+        q[0] = q[0] * a + c
+    potencia = Fraction(1)
+    for i in range(len(q)):
+        q[i] *= potencia
+        potencia *= h
+
+    # Cambio de la base de monomios a la de Bernstein: b_k = sum_{i <= k} C(k, i) / C(n, i) q_i
+    return [sum((Fraction(comb(k, i), comb(n, i)) * q[i] for i in range(min(k, len(q) - 1) + 1)), Fraction(0))
+            for k in range(n + 1)]
+
+def puntos_control(curva_x, curva_y, a, b):
+    """
+    Devuelve las listas de coordenadas x e y de los puntos de control (polígono de control de Bézier)
+    del tramo de la curva (curva_x(t), curva_y(t)) con t en [a, b]. Los polinomios son sympy Polynomial.
+    """
+    coefs_x = [a_fraccion(c) for c in reversed(curva_x.all_coeffs())]
+    coefs_y = [a_fraccion(c) for c in reversed(curva_y.all_coeffs())]
+    grado = max(len(coefs_x), len(coefs_y)) - 1
+    return coeficientes_bernstein(coefs_x, a, b, grado), coeficientes_bernstein(coefs_y, a, b, grado)
+
+def subdividir(coefs, s = Fraction(1, 2)):
+    """
+    Algoritmo de de Casteljau: a partir de los coeficientes de Bernstein de un polinomio en un intervalo,
+    devuelve los de sus dos trozos, antes y después de la fracción s del intervalo.
+    """
+    izquierda = [coefs[0]]
+    derecha = [coefs[-1]]
+    actual = list(coefs)
+    while len(actual) > 1:
+        actual = [(1 - s) * actual[i] + s * actual[i+1] for i in range(len(actual) - 1)]
+        izquierda.append(actual[0])
+        derecha.append(actual[-1])
+    return izquierda, derecha[::-1]
+
+def sin_raices_bernstein(coefs, profundidad = PROFUNDIDAD_SUBDIVISION):
+    """
+    Intenta demostrar que el polinomio de coeficientes de Bernstein coefs (en un intervalo [a, b])
+    no tiene raíces en el intervalo abierto (a, b).
+    Como los polinomios de la base de Bernstein son positivos en (a, b), basta con que todos los coeficientes
+    tengan el mismo signo (admitiendo ceros, pero no todos nulos). Si no es así, se subdivide el intervalo
+    por la mitad hasta profundidad veces.
+    Devuelve True si se ha demostrado que no hay raíces, y False si no se ha podido decidir.
+    """
+    if ningun_cambio(coefs) and any(c != 0 for c in coefs):
+        return True
+    if profundidad == 0:
+        return False
+    izquierda, derecha = subdividir(coefs)
+    if izquierda[-1] == 0:
+        # El punto medio es una raíz
+        return False
+    return sin_raices_bernstein(izquierda, profundidad - 1) and sin_raices_bernstein(derecha, profundidad - 1)
+
+def sin_cortes_recta(control_x, control_y, coefs_recta, profundidad = PROFUNDIDAD_SUBDIVISION):
+    """
+    Intenta demostrar, sin calcular secuencias de Sturm, que el tramo de curva con puntos de control
+    (control_x, control_y) no corta a la recta a*x + b*y + c = 0 (coefs_recta = (a, b, c)) en el interior
+    del intervalo. Como la ecuación de la recta es afín, los coeficientes de Bernstein de a*x(t) + b*y(t) + c
+    son los valores de la ecuación en los puntos de control.
+    Los signos de esos valores se calculan primero en coma flotante con una cota del error (ver signo_filtrado),
+    y solo si no bastan para decidir se calculan los valores exactos y se subdivide.
+    Devuelve True si se ha demostrado que no hay cortes, y False si no se ha podido decidir.
+    """
+    a, b, c = coefs_recta
+    signos = signos_recta(control_x, control_y, coefs_recta)
+    if ningun_cambio(signos) and any(s != 0 for s in signos):
+        return True
+    return sin_raices_bernstein([a*px + b*py + c for px, py in zip(control_x, control_y)], profundidad)
+
+def signos_recta(control_x, control_y, coefs_recta):
+    """
+    Signos de la ecuación de la recta a*x + b*y + c (coefs_recta = (a, b, c), Fraction) en los puntos dados,
+    calculados en coma flotante con una cota rigurosa del error de redondeo, y de forma exacta solo
+    cuando la cota no permite decidir.
+    """
+    a, b, c = coefs_recta
+    a_f, b_f, c_f = _float_filtro(a), _float_filtro(b), _float_filtro(c)
+    signos = list()
+    for px, py in zip(control_x, control_y):
+        terminos = (a_f * _float_filtro(px), b_f * _float_filtro(py), c_f)
+        valor = terminos[0] + terminos[1] + terminos[2]
+        # Cada término tiene como mucho 3 redondeos (los dos factores y el producto) y la suma 2 más
+        cota = gamma(6) * (abs(terminos[0]) + abs(terminos[1]) + abs(terminos[2]))
+        if any(0 < abs(termino) < MINIMO_FILTRO for termino in terminos):
+            # Productos demasiado pequeños: el error relativo no está acotado
+            valor = math.nan
+        signos.append(signo_filtrado(valor, cota, lambda px=px, py=py: a*px + b*py + c))
+    return signos
+
+def _float_filtro(r):
+    """
+    Aproximación en coma flotante de r con error relativo como mucho EPSILON, o nan si r es demasiado
+    pequeño para garantizarlo (o inf si es demasiado grande).
+    """
+    r_f = a_float(r)
+    if r != 0 and abs(r_f) < MINIMO_FILTRO:
+        return math.nan
+    return r_f
@@ -0,0 +1,210 @@
+"""
+Caché de los polinomios calculados con interpolar() y de los leídos de ficheros JSON.
+Por defecto solo se guardan en memoria, durante la ejecución del programa. Se controla con variables de entorno:
+- TFG_CACHE_DIR: directorio en el que guardar además la caché en disco, para reutilizarla entre ejecuciones.
+  Si no se da, no se escribe nada en disco.
+- TFG_CACHE=0: desactiva la caché por completo (ni en memoria ni en disco).
+"""
+import os
+import json
+import hashlib
+import sympy as sp
+from collections import OrderedDict
+from Codigo.Auxiliares.hermite import a_fraccion, poly_desde_coeficientes
+from Codigo.Auxiliares.formato_polinomios import coeficientes_desde_texto, poly_desde_lista
+t = sp.symbols('t')
+
+MAX_ENTRADAS_MEMORIA = 512
+MAX_BYTES_DISCO = 64 * 1024 * 1024
+
+class CacheInterpolacion(object):
+    """
+    Caché de polinomios direccionada por contenido: cada entrada se identifica por un hash de los datos
+    que determinan los polinomios (condiciones de interpolación, o la expresión leída de un fichero).
+
+    Tiene dos niveles:
+    - En memoria: un OrderedDict con los sympy Polynomial ya construidos, con política LRU y a lo sumo
+      max_entradas_memoria entradas.
+    - En disco, solo si se da un directorio: un fichero JSON por entrada con los coeficientes racionales
+      ("p/q", orden creciente de grado). La fecha de modificación de cada fichero se actualiza al leerlo,
+      y cuando el tamaño total supera max_bytes_disco se borran los ficheros usados hace más tiempo.
+    """
+    def __init__(self, directorio = None, max_entradas_memoria = MAX_ENTRADAS_MEMORIA,
+                 max_bytes_disco = MAX_BYTES_DISCO):
+        self.directorio = directorio
+        self.max_entradas_memoria = max_entradas_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self.memoria = OrderedDict()
+        self._bytes_disco = None    # se calcula la primera vez que se escribe en disco
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        """
+        Devuelve la lista de polinomios guardada con la clave dada, o None si no está en la caché.
+        """
+        if clave in self.memoria:
+            self.memoria.move_to_end(clave)
+            self.aciertos += 1
+            return self.memoria[clave]
+        if self.directorio is None:
+            self.fallos += 1
+            return None
+
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                columnas = json.load(f)
+            os.utime(ruta)
+        except (OSError, ValueError):
+            self.fallos += 1
+            return None
+
+        polinomios = [poly_desde_coeficientes([a_fraccion(c) for c in coefs]) for coefs in columnas]
+        self._guardar_en_memoria(clave, polinomios)
+        self.aciertos += 1
+        return polinomios
+
+    def guardar(self, clave, polinomios):
+        """
+        Guarda la lista de polinomios (sympy Polynomial en 't') con la clave dada, en memoria y, si hay
+        directorio, en disco.
+        """
+        self._guardar_en_memoria(clave, polinomios)
+        if self.directorio is None:
+            return
+        columnas = [[str(c) for c in reversed(p.all_coeffs())] for p in polinomios]
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            ruta = self._ruta(clave)
+            ruta_tmp = ruta + f".{os.getpid()}.tmp"
+            with open(ruta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(columnas, f)
+            os.replace(ruta_tmp, ruta)
+            self._actualizar_tamano(os.path.getsize(ruta))
+        except OSError:
+            # Si no se puede escribir en disco, la caché sigue funcionando en memoria
+            pass
+
+    def vaciar(self):
+        """
+        Borra todas las entradas de la caché, en memoria y en disco.
+        """
+        self.memoria.clear()
+        for nombre, _, _ in self._ficheros():
+            try:
+                os.remove(nombre)
+            except OSError:
+                pass
+        self._bytes_disco = 0
+
+    def _guardar_en_memoria(self, clave, polinomios):
+        self.memoria[clave] = polinomios
+        self.memoria.move_to_end(clave)
+        while len(self.memoria) > self.max_entradas_memoria:
+            self.memoria.popitem(last=False)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + ".json")
+
+    def _ficheros(self):
+        """
+        Devuelve una lista de tuplas (ruta, fecha de modificación, tamaño) de los ficheros de la caché en disco.
+        """
+        ficheros = []
+        if self.directorio is None:
+            return ficheros
+        try:
+            with os.scandir(self.directorio) as entradas:
+                for entrada in entradas:
+                    if entrada.name.endswith(".json"):
+                        info = entrada.stat()
+                        ficheros.append((entrada.path, info.st_mtime, info.st_size))
+        except OSError:
+            pass
+        return ficheros
+
+    def _actualizar_tamano(self, bytes_nuevos):
+        if self._bytes_disco is None:
+            self._bytes_disco = sum(tamano for _, _, tamano in self._ficheros())
+        else:
+            self._bytes_disco += bytes_nuevos
+        if self._bytes_disco <= self.max_bytes_disco:
+            return
+
+        # Se borran los ficheros usados hace más tiempo hasta quedar por debajo del 90% del límite
+        ficheros = sorted(self._ficheros(), key=lambda f: f[1])
+        self._bytes_disco = sum(tamano for _, _, tamano in ficheros)
+        for ruta, _, tamano in ficheros:
+            if self._bytes_disco <= 0.9 * self.max_bytes_disco:
+                break
+            try:
+                os.remove(ruta)
+                self._bytes_disco -= tamano
+            except OSError:
+                pass
+
+def clave_condiciones(tipo, condiciones):
+    """
+    Calcula la clave (hash SHA-256) de unas condiciones de interpolación {tiempo: [datos de orden 0, 1, ...]},
+    como las que devuelven CurvaInterpolacion.condiciones y PolinomioInterpolacion.condiciones.
+    tipo distingue los distintos objetos que se guardan (por ejemplo, "curva" o "polinomio").
+    """
+    canonico = [[str(tiempo), [[str(v) for v in datos] for datos in condiciones[tiempo]]]
+                for tiempo in sorted(condiciones)]
+    return _hash([tipo, canonico])
+
+def clave_expresion(expresion):
+    """
+    Calcula la clave (hash SHA-256) del polinomio dado por una expresión en forma de string.
+    """
+    return _hash(["expresion", expresion])
+
+def _hash(datos):
+    return hashlib.sha256(json.dumps(datos, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+_cache = None
+
+def cache_por_defecto():
+    """
+    Devuelve la caché compartida por todo el programa, o None si se ha desactivado con TFG_CACHE=0.
+    Solo se guarda en disco si se ha dado un directorio con TFG_CACHE_DIR.
+    """
+    global _cache
+    if os.environ.get("TFG_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = CacheInterpolacion(os.environ.get("TFG_CACHE_DIR") or None)
+    return _cache
+
+def poly_desde_texto(expresion):
+    """
+    Devuelve el sympy Polynomial en 't' correspondiente a la expresión dada. Las expresiones de coeficientes
+    racionales se analizan directamente (ver coeficientes_desde_texto); las demás se analizan con sympy,
+    consultando antes la caché.
+    """
+    coefs = coeficientes_desde_texto(expresion)
+    if coefs is not None:
+        return poly_desde_coeficientes(coefs)
+
+    cache = cache_por_defecto()
+    if cache is None:
+        return sp.Poly(expresion, t)
+
+    clave = clave_expresion(expresion)
+    polinomios = cache.obtener(clave)
+    if polinomios is None:
+        polinomios = [sp.Poly(expresion, t)]
+        # Solo se guardan los polinomios de coeficientes racionales (no los calculados en coma flotante)
+        if polinomios[0].domain in (sp.ZZ, sp.QQ):
+            cache.guardar(clave, polinomios)
+    return polinomios[0]
+
+def poly_desde_json(valor):
+    """
+    Devuelve el sympy Polynomial en 't' guardado en un fichero JSON en cualquiera de los formatos de
+    polinomio_a_json: una expresión (texto) o una lista de pares [numerador, denominador].
+    """
+    if isinstance(valor, str):
+        return poly_desde_texto(valor)
+    return poly_desde_lista(valor)
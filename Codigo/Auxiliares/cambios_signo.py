@@ -1,3 +1,15 @@
+import math
+
+# Épsilon de la máquina (unidad de redondeo) de la doble precisión
+EPSILON = 2.0**-53
+# Por debajo de este valor los números en coma flotante pueden perder precisión relativa (números subnormales),
+# y las cotas de error relativo dejan de valer
+MINIMO_FILTRO = 1e-280
+
+# Número de signos calculados con el filtro en coma flotante y número de ellos que se han tenido que
+# recalcular de forma exacta porque el filtro no era concluyente
+_estadisticas = {"evaluaciones": 0, "exactas": 0}
+
 def signo(f):
     if f > 0:
         return 1
@@ -35,4 +47,44 @@ def cambios_signo(l):
     return cambios
 
 def ningun_cambio(l):
-    return all(signo(r) >= 0 for r in l) or all(signo(r) <= 0 for r in l)
\ No newline at end of file
+    return all(signo(r) >= 0 for r in l) or all(signo(r) <= 0 for r in l)
+
+def gamma(n):
+    """
+    Constante gamma_n = n u / (1 - n u) del análisis de errores de redondeo: si se encadenan n operaciones
+    en coma flotante, el error relativo acumulado es como mucho gamma_n.
+    """
+    return n * EPSILON / (1 - n * EPSILON)
+
+def signo_filtrado(valor, cota, exacto):
+    """
+    Signo de un número del que se conoce una aproximación en coma flotante (valor) con error como mucho cota.
+    Si el intervalo [valor - cota, valor + cota] no contiene al 0, el signo de valor es el correcto.
+    Si no (o si valor o cota no son finitos), se llama a exacto(), que debe devolver el número calculado
+    de forma exacta, y se devuelve su signo.
+    """
+    _estadisticas["evaluaciones"] += 1
+    if math.isfinite(valor) and math.isfinite(cota) and abs(valor) > cota:
+        return 1 if valor > 0 else -1
+    _estadisticas["exactas"] += 1
+    return signo(exacto())
+
+def a_float(r):
+    """
+    Convierte un número racional (int o Fraction) en float, devolviendo inf si no cabe en un float.
+    """
+    try:
+        return float(r)
+    except OverflowError:
+        return math.inf
+
+def estadisticas_filtro():
+    """
+    Devuelve un diccionario con el número de signos calculados con el filtro en coma flotante ("evaluaciones")
+    y cuántos se han tenido que recalcular de forma exacta ("exactas").
+    """
+    return dict(_estadisticas)
+
+def reiniciar_estadisticas_filtro():
+    _estadisticas["evaluaciones"] = 0
+    _estadisticas["exactas"] = 0
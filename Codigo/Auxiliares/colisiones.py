@@ -0,0 +1,93 @@
+import os
+import sys
+import argparse
+import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+from Codigo.Auxiliares.sturm import aislar_raices
+
+TOLERANCIA_COLISIONES = sp.Rational(1, 10**9)
+
+def tiempos_colision(curva_i, curva_j, t0, t1, tolerancia = TOLERANCIA_COLISIONES):
+    """
+    Tiempos de [t0, t1] en los que dos curvas (pares de sympy Polynomial (x(t), y(t))) están en el mismo punto,
+    es decir, raíces reales comunes de x_i - x_j e y_i - y_j. Son las raíces de su máximo común divisor
+    sobre los racionales, que se aíslan de forma exacta (ver aislar_raices).
+    Devuelve una lista de intervalos (a, b) (sympy Rational) de longitud menor que la tolerancia, cada uno
+    con un tiempo de colisión (a == b si es exacto), o None si las dos curvas coinciden en todo momento.
+    """
+    dx = curva_i[0] - curva_j[0]
+    dy = curva_i[1] - curva_j[1]
+    if dx.is_zero and dy.is_zero:
+        return None
+    g = sp.gcd(dx, dy)
+    if g.degree() <= 0:
+        return []
+    return aislar_raices(g, t0, t1, tolerancia, extremos = True)
+
+def _trabajo_colision(trabajo):
+    i, j, curva_i, curva_j, t0, t1, tolerancia = trabajo
+    return i, j, tiempos_colision(curva_i, curva_j, t0, t1, tolerancia)
+
+def colisiones_curvas(curvas, t0, t1, procesos = None, tolerancia = TOLERANCIA_COLISIONES):
+    """
+    Comprueba todos los pares de curvas (objetos CurvaInterpolacion, con su reparametrización si la tienen)
+    en el intervalo de tiempos [t0, t1].
+    Los polinomios compuestos con las reparametrizaciones se calculan una sola vez por curva (y quedan guardados
+    en cada curva) y los pares se reparten entre procesos (por defecto, tantos como núcleos; con procesos = 1
+    se hace todo en el proceso actual).
+    Devuelve un diccionario {(i, j): lista de intervalos con los tiempos de colisión, o None si las curvas i y j
+    coinciden siempre}, solo con los pares que chocan.
+    """
+    polinomios = [curva.polinomios_reparametrizados() for curva in curvas]
+    trabajos = [(i, j, polinomios[i], polinomios[j], t0, t1, tolerancia)
+                for i in range(len(curvas)) for j in range(i + 1, len(curvas))]
+
+    if procesos == 1 or len(trabajos) <= 1:
+        resultados = list(map(_trabajo_colision, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(_trabajo_colision, trabajos))
+
+    return {(i, j): tiempos for i, j, tiempos in resultados if tiempos is None or len(tiempos) > 0}
+
+if __name__ == "__main__":
+    from Codigo.Auxiliares.lectura_datos import leer_datos_desde_json
+
+    parser = argparse.ArgumentParser(
+        description="Comprueba si dos vértices del polígono de una animación coinciden en algún momento"
+    )
+    parser.add_argument(
+        "archivo_datos",
+        help="Ruta al fichero JSON con los datos de la animación"
+    )
+    parser.add_argument(
+        "--reparametrizaciones",
+        help="Indica si se deben usar las reparametrizaciones del fichero ('True' o 'False', por defecto True)"
+    )
+    parser.add_argument(
+        "--procesos",
+        help="Número de procesos entre los que repartir los pares de curvas (por defecto, uno por núcleo)"
+    )
+    args = parser.parse_args()
+
+    _, curvas, tiempos, _, _, _, repars = leer_datos_desde_json(args.archivo_datos)
+    if not (args.reparametrizaciones and args.reparametrizaciones.lower() in ('false', 'f', '0')):
+        for curva, repar in zip(curvas, repars):
+            curva.set_reparametrizacion(repar, (tiempos[0], tiempos[-1]))
+    # Las curvas sin polinomios (sin nodos) no se pueden comprobar
+    indices = [i for i, curva in enumerate(curvas) if curva.xpoly is not None and curva.ypoly is not None]
+    procesos = int(args.procesos) if args.procesos else os.cpu_count()
+
+    colisiones = colisiones_curvas([curvas[i] for i in indices], tiempos[0], tiempos[-1], procesos)
+    for (i, j), tiempos_ij in sorted(colisiones.items()):
+        if tiempos_ij is None:
+            print(f"Las curvas {indices[i]} y {indices[j]} coinciden en todo momento")
+        else:
+            texto = ", ".join(str(a) if a == b else f"{float((a + b) / 2)}" for a, b in tiempos_ij)
+            print(f"Las curvas {indices[i]} y {indices[j]} chocan en t = {texto}")
+
+    if len(colisiones) == 0:
+        print("Resultado: CORRECTO (no hay colisiones)")
+    else:
+        print(f"Resultado: INCORRECTO ({len(colisiones)} pares de curvas chocan)")
+        sys.exit(1)
@@ -0,0 +1,269 @@
+import os
+import zipfile
+import argparse
+import numpy as np
+import sympy as sp
+from fractions import Fraction
+from Codigo.Curvas.nodos import Nodo
+from Codigo.Curvas.clase_curva import CurvaInterpolacion
+from Codigo.Auxiliares.hermite import a_fraccion, poly_desde_coeficientes
+
+VERSION_FORMATO = 1
+
+def enteros_a_arrays(enteros):
+    """
+    Codifica una lista de enteros de tamaño arbitrario en tres arrays de NumPy:
+    - signos (int8): el signo de cada entero.
+    - desplazamientos (int64, longitud n + 1): el valor absoluto del entero i ocupa las cifras
+      desplazamientos[i]:desplazamientos[i+1] del array de cifras.
+    - cifras (uint32): las cifras en base 2^32 de los valores absolutos, de menor a mayor peso.
+    """
+    signos = np.array([(e > 0) - (e < 0) for e in enteros], dtype=np.int8)
+    bytes_enteros = [abs(e).to_bytes(4 * ((abs(e).bit_length() + 31) // 32), 'little') for e in enteros]
+    desplazamientos = np.zeros(len(enteros) + 1, dtype=np.int64)
+    desplazamientos[1:] = np.cumsum([len(b) // 4 for b in bytes_enteros])
+    cifras = np.frombuffer(b"".join(bytes_enteros), dtype='<u4').astype(np.uint32)
+    return signos, desplazamientos, cifras
+
+def arrays_a_enteros(signos, desplazamientos, cifras):
+    """
+    Operación inversa de enteros_a_arrays: devuelve la lista de enteros.
+    """
+    datos = np.ascontiguousarray(cifras, dtype='<u4').tobytes()
+    desplazamientos = (4 * np.asarray(desplazamientos)).tolist()
+    return [int(s) * int.from_bytes(datos[a:b], 'little')
+            for s, a, b in zip(signos.tolist(), desplazamientos[:-1], desplazamientos[1:])]
+
+# Listas de racionales que se guardan en el fichero. Todas comparten los mismos arrays de numeradores
+# y denominadores, y "racionales_rangos" indica qué trozo corresponde a cada una (-1 si no está)
+CAMPOS_RACIONALES = ("poligonos_x", "poligonos_y", "nodos_tiempo", "nodos_x", "nodos_y", "derivadas_x", "derivadas_y",
+                     "xpoly", "ypoly", "reparametrizaciones", "tiempos", "tiempos_triangulos",
+                     "tiempos_triangulos_mal", "intervalos_triangulos_mal")
+
+def _guardar_racionales(arrays, campos):
+    """
+    Añade al diccionario de arrays los numeradores y denominadores de todas las listas de racionales del
+    diccionario campos {nombre: lista de racionales, o None si no se guarda}, seguidas, y sus rangos.
+    """
+    fracciones = list()
+    rangos = np.full((len(CAMPOS_RACIONALES), 2), -1, dtype=np.int64)
+    for k, nombre in enumerate(CAMPOS_RACIONALES):
+        if campos.get(nombre) is not None:
+            rangos[k] = (len(fracciones), len(fracciones) + len(campos[nombre]))
+            fracciones += [a_fraccion(v) for v in campos[nombre]]
+    arrays["racionales_rangos"] = rangos
+    for parte, enteros in (("num", [f.numerator for f in fracciones]), ("den", [f.denominator for f in fracciones])):
+        signos, desplazamientos, cifras = enteros_a_arrays(enteros)
+        arrays[f"{parte}_signos"] = signos
+        arrays[f"{parte}_desplazamientos"] = desplazamientos
+        arrays[f"{parte}_cifras"] = cifras
+
+def _leer_racionales(arrays):
+    """
+    Diccionario {nombre: lista de sympy Rational, o None} guardado con _guardar_racionales.
+    """
+    partes = [arrays_a_enteros(arrays[f"{parte}_signos"], arrays[f"{parte}_desplazamientos"], arrays[f"{parte}_cifras"])
+              for parte in ("num", "den")]
+    racionales = [sp.Rational(p, q) for p, q in zip(*partes)]
+    return {nombre: racionales[a:b] if a >= 0 else None
+            for nombre, (a, b) in zip(CAMPOS_RACIONALES, arrays["racionales_rangos"].tolist())}
+
+def _coeficientes_poly(poly):
+    """
+    Coeficientes (Fraction) en orden creciente de grado; los de coma flotante se guardan con su valor exacto.
+    """
+    return [a_fraccion(c) if c.is_Rational else Fraction(float(c)) for c in reversed(poly.all_coeffs())]
+
+def _coeficientes_polinomios(arrays, nombre, polinomios):
+    """
+    Guarda en arrays el número de coeficientes de cada polinomio de la lista (0 si es None) y devuelve la lista
+    de todos los coeficientes seguidos.
+    """
+    coefs = [_coeficientes_poly(p) if p is not None else [] for p in polinomios]
+    arrays[f"{nombre}_longitudes"] = np.array([len(c) for c in coefs], dtype=np.int64)
+    return [c for lista in coefs for c in lista]
+
+def _leer_polinomios(arrays, racionales, nombre):
+    """
+    Lista de sympy Polynomial (o None) guardada con _coeficientes_polinomios.
+    """
+    coefs = _dividir(racionales[nombre], arrays[f"{nombre}_longitudes"].tolist())
+    return [poly_desde_coeficientes([Fraction(int(c.p), int(c.q)) for c in lista]) if lista else None
+            for lista in coefs]
+
+def _dividir(lista, longitudes):
+    """
+    Divide la lista en trozos consecutivos de las longitudes dadas.
+    """
+    trozos = list()
+    inicio = 0
+    for longitud in longitudes:
+        trozos.append(lista[inicio:inicio + longitud])
+        inicio += longitud
+    return trozos
+
+def guardar_escena_npz(ruta_fichero, poligonos, curvas, tiempos, tiempos_triangulos = None,
+                       tiempos_triangulos_mal = None, intervalos_triangulos_mal = None, reparametrizaciones = None,
+                       muestras = None):
+    """
+    Guarda los datos de una animación (en el formato que devuelve leer_datos_desde_json) en un fichero .npz
+    sin comprimir, de modo que leer_escena_npz pueda proyectar sus arrays en memoria.
+    Los números racionales (vértices, nodos, coeficientes de los polinomios, tiempos) se guardan de forma
+    exacta como enteros de tamaño arbitrario (ver enteros_a_arrays).
+    muestras es opcional: una tupla (t_vals, vértices, reparametrizadas) con los tiempos (array de floats),
+    las posiciones de las curvas en esos tiempos (array de forma (n_curvas, n_frames, 2), como el de evaluar_escena)
+    y si se han calculado con las reparametrizaciones.
+    """
+    arrays = {"version": np.array([VERSION_FORMATO])}
+    nodos = [n for curva in curvas for n in curva.nodos]
+    arrays["poligonos_longitudes"] = np.array([len(p[0]) for p in poligonos], dtype=np.int64)
+    arrays["curvas_nodos"] = np.array([len(curva.nodos) for curva in curvas], dtype=np.int64)
+    arrays["nodos_derivadas"] = np.array([len(n.get_derivadas()) for n in nodos], dtype=np.int64)
+    campos = {
+        "poligonos_x": [v for p in poligonos for v in p[0]],
+        "poligonos_y": [v for p in poligonos for v in p[1]],
+        "nodos_tiempo": [n.get_tiempo() for n in nodos],
+        "nodos_x": [n.get_punto()[0] for n in nodos],
+        "nodos_y": [n.get_punto()[1] for n in nodos],
+        "derivadas_x": [d[0] for n in nodos for d in n.get_derivadas()],
+        "derivadas_y": [d[1] for n in nodos for d in n.get_derivadas()],
+        "xpoly": _coeficientes_polinomios(arrays, "xpoly", [curva.xpoly for curva in curvas]),
+        "ypoly": _coeficientes_polinomios(arrays, "ypoly", [curva.ypoly for curva in curvas]),
+        "reparametrizaciones": _coeficientes_polinomios(arrays, "reparametrizaciones", reparametrizaciones or []),
+        "tiempos": tiempos,
+        "tiempos_triangulos": tiempos_triangulos or [],
+        # Los datos opcionales que no se dan (None) no se guardan
+        "tiempos_triangulos_mal": tiempos_triangulos_mal,
+        "intervalos_triangulos_mal": None if intervalos_triangulos_mal is None else
+                                     [e for intervalo in intervalos_triangulos_mal for e in intervalo],
+    }
+    _guardar_racionales(arrays, campos)
+    if muestras is not None:
+        t_vals, vertices, reparametrizadas = muestras
+        arrays["muestras_t"] = np.asarray(t_vals, dtype=float)
+        arrays["muestras_vertices"] = np.asarray(vertices, dtype=float)
+        arrays["muestras_reparametrizadas"] = np.array([bool(reparametrizadas)])
+
+    # np.savez (sin comprimir) guarda cada array con ZIP_STORED, lo que permite proyectarlos en memoria
+    with open(ruta_fichero, 'wb') as f:
+        np.savez(f, **arrays)
+
+def abrir_npz(ruta_fichero):
+    """
+    Devuelve un diccionario {nombre: array} con los arrays del fichero .npz sin comprimir, proyectados en memoria
+    (np.memmap, de solo lectura) en lugar de leídos: la lectura es casi instantánea y los procesos que abren
+    el mismo fichero comparten las páginas. Los arrays vacíos o de un fichero comprimido se leen normalmente.
+    """
+    arrays = dict()
+    with zipfile.ZipFile(ruta_fichero) as zf, open(ruta_fichero, 'rb') as f:
+        for info in zf.infolist():
+            nombre = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as miembro:
+                    arrays[nombre] = np.lib.format.read_array(miembro)
+                continue
+            # Cabecera local del zip: 30 bytes fijos, el nombre del fichero y el campo extra
+            f.seek(info.header_offset + 26)
+            longitud_nombre, longitud_extra = np.frombuffer(f.read(4), dtype='<u2')
+            inicio = info.header_offset + 30 + int(longitud_nombre) + int(longitud_extra)
+            f.seek(inicio)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                forma, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                forma, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                raise ValueError(f"Versión del formato .npy no soportada: {version}")
+            if dtype.hasobject:
+                raise ValueError(f"El array '{nombre}' contiene objetos de Python y no se puede proyectar en memoria")
+            if int(np.prod(forma)) == 0:
+                arrays[nombre] = np.empty(forma, dtype=dtype)
+            else:
+                arrays[nombre] = np.memmap(ruta_fichero, dtype=dtype, mode='r', offset=f.tell(), shape=forma,
+                                           order='F' if fortran else 'C')
+    return arrays
+
+def leer_escena_npz(ruta_fichero):
+    """
+    Lee un fichero guardado con guardar_escena_npz y devuelve lo mismo que leer_datos_desde_json:
+    polígonos, curvas (CurvaInterpolacion, ya interpoladas si lo estaban al guardarlas), tiempos, tiempos de
+    los triángulos, tiempos e intervalos en los que el polígono está mal (o None) y reparametrizaciones.
+    """
+    arrays = abrir_npz(ruta_fichero)
+    if int(arrays["version"][0]) != VERSION_FORMATO:
+        raise ValueError(f"Versión del formato binario no soportada: {int(arrays['version'][0])}")
+
+    racionales = _leer_racionales(arrays)
+
+    longitudes = arrays["poligonos_longitudes"].tolist()
+    poligonos = [(tuple(x), tuple(y)) for x, y in zip(_dividir(racionales["poligonos_x"], longitudes),
+                                                      _dividir(racionales["poligonos_y"], longitudes))]
+
+    derivadas = _dividir(list(zip(racionales["derivadas_x"], racionales["derivadas_y"])),
+                         arrays["nodos_derivadas"].tolist())
+    nodos = [Nodo(tiempo, (x, y), ders) for tiempo, x, y, ders in zip(racionales["nodos_tiempo"], racionales["nodos_x"],
+                                                                       racionales["nodos_y"], derivadas)]
+    xpolys = _leer_polinomios(arrays, racionales, "xpoly")
+    ypolys = _leer_polinomios(arrays, racionales, "ypoly")
+    curvas = [CurvaInterpolacion(nodos_curva, xpoly, ypoly) if xpoly is not None and ypoly is not None
+              else CurvaInterpolacion(nodos_curva)
+              for nodos_curva, xpoly, ypoly in zip(_dividir(nodos, arrays["curvas_nodos"].tolist()), xpolys, ypolys)]
+
+    tiempos = racionales["tiempos"]
+    tiempos_triangulos = racionales["tiempos_triangulos"]
+    tiempos_triangulos_mal = racionales["tiempos_triangulos_mal"]
+    intervalos_triangulos_mal = None
+    if racionales["intervalos_triangulos_mal"] is not None:
+        extremos = racionales["intervalos_triangulos_mal"]
+        intervalos_triangulos_mal = list(zip(extremos[0::2], extremos[1::2]))
+    repars = _leer_polinomios(arrays, racionales, "reparametrizaciones")
+
+    return poligonos, curvas, tiempos, tiempos_triangulos, tiempos_triangulos_mal, intervalos_triangulos_mal, repars
+
+def leer_muestras_npz(ruta_fichero):
+    """
+    Devuelve las muestras guardadas en el fichero como una tupla (t_vals, vértices, reparametrizadas), con los
+    arrays proyectados en memoria, o None si el fichero no tiene muestras.
+    """
+    arrays = abrir_npz(ruta_fichero)
+    if "muestras_t" not in arrays:
+        return None
+    return arrays["muestras_t"], arrays["muestras_vertices"], bool(arrays["muestras_reparametrizadas"][0])
+
+if __name__ == "__main__":
+    from Codigo.Auxiliares.lectura_datos import leer_datos_desde_json
+    from Codigo.Auxiliares.evaluacion import evaluar_escena
+    from Codigo.Animaciones.auxiliares_animacion import crear_valores_t
+
+    parser = argparse.ArgumentParser(
+        description="Convierte un fichero JSON de datos para una animación al formato binario .npz"
+    )
+    parser.add_argument(
+        "archivo_datos",
+        help="Ruta al fichero JSON con los datos de la animación"
+    )
+    parser.add_argument(
+        "--salida",
+        help="Ruta del fichero .npz (por defecto, la del fichero de datos cambiando la extensión)"
+    )
+    parser.add_argument(
+        "--frames_por_intervalo",
+        help="Si se da, se guardan también las posiciones de las curvas (con sus reparametrizaciones) en los " \
+        "tiempos de una animación con este número de frames por intervalo"
+    )
+    args = parser.parse_args()
+
+    datos = leer_datos_desde_json(args.archivo_datos)
+    poligonos, curvas, tiempos, tiempos_triangulos, tiempos_triangulos_mal, intervalos_triangulos_mal, repars = datos
+    muestras = None
+    if args.frames_por_intervalo:
+        t_vals = crear_valores_t(tiempos, int(args.frames_por_intervalo))
+        intervalo = (tiempos[0], tiempos[-1])
+        for curva, repar in zip(curvas, repars):
+            curva.set_reparametrizacion(repar, intervalo)
+        muestras = (t_vals, evaluar_escena(curvas, t_vals, reparametrizadas=True, intervalo=intervalo), len(repars) > 0)
+
+    salida = args.salida if args.salida else os.path.splitext(args.archivo_datos)[0] + ".npz"
+    guardar_escena_npz(salida, poligonos, curvas, tiempos, tiempos_triangulos, tiempos_triangulos_mal,
+                       intervalos_triangulos_mal, repars, muestras)
+    print(f"Datos guardados en '{salida}' ({os.path.getsize(salida)} bytes)")
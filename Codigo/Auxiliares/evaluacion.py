@@ -0,0 +1,155 @@
+import numpy as np
+from numpy.polynomial import chebyshev
+import sympy as sp
+from math import lcm
+from Codigo.Auxiliares.hermite import a_fraccion
+t = sp.symbols('t')
+
+def coeficientes_float(poly):
+    """
+    Devuelve los coeficientes del sympy Polynomial poly como array de NumPy de floats,
+    en orden decreciente de grado (el convenio de np.polyval).
+    """
+    return np.array([float(c) for c in poly.all_coeffs()])
+
+def coeficientes_intervalo(poly, a, b):
+    """
+    Devuelve los coeficientes en coma flotante del polinomio q(s) = poly(c + h s), con c = (a + b)/2 y
+    h = (b - a)/2, en la base de polinomios de Chebyshev T_0, T_1, ... (orden creciente, el convenio de
+    np.polynomial.chebyshev). Evaluar poly en [a, b] equivale a evaluar q en [-1, 1].
+    El cambio de base se hace de forma exacta antes de redondear. En la base de monomios, los polinomios
+    de grado alto (como los que resultan de componer una curva con una reparametrización) tienen
+    coeficientes enormes que se cancelan al evaluar; en la base de Chebyshev en [-1, 1] los coeficientes
+    son del orden de los valores del polinomio y la evaluación es estable.
+    """
+    a, b = sp.Rational(a), sp.Rational(b)
+    c, h = (a + b) / 2, (b - a) / 2
+    q = poly.to_field().compose(sp.Poly(c + h*t, t))
+
+    # Se trabaja solo con enteros: q = A / D, con A de coeficientes enteros, y en cada momento los coeficientes
+    # de Chebyshev calculados son C / (D * 2^m).
+    coefs = [a_fraccion(coef) for coef in q.all_coeffs()]
+    D = lcm(*(coef.denominator for coef in coefs))
+    # Esquema de Horner en la base de Chebyshev: cheb <- s * cheb + a_k, usando que
+    # s T_0 = T_1  y  s T_j = (T_{j+1} + T_{j-1}) / 2  (se multiplica por 2 para no dividir)
+    C = [0]
+    m = 0
+    for coef in coefs:
+        S = [0] * (len(C) + 1)
+        for j, v in enumerate(C):
+            if j == 0:
+                S[1] += 2*v
+            else:
+                S[j+1] += v
+                S[j-1] += v
+        m += 1
+        S[0] += (coef.numerator * (D // coef.denominator)) << m
+        C = S
+    while len(C) > 1 and C[-1] == 0:
+        C.pop()
+    # La división de enteros de Python redondea correctamente aunque los enteros no quepan en un float
+    return np.array([v / (D << m) for v in C])
+
+def variable_intervalo(t_vals, a, b):
+    """
+    Transforma los tiempos t del intervalo [a, b] en la variable s = (t - c)/h de coeficientes_intervalo.
+    """
+    a, b = float(a), float(b)
+    return (np.asarray(t_vals, dtype=float) - (a + b) / 2) / ((b - a) / 2)
+
+def evaluar_intervalo(coefs, t_vals, a, b):
+    """
+    Evalúa en los tiempos t_vals (del intervalo [a, b]) el polinomio dado por sus coeficientes
+    de Chebyshev en la variable reescalada (ver coeficientes_intervalo), con el algoritmo de Clenshaw.
+    """
+    return chebyshev.chebval(variable_intervalo(t_vals, a, b), coefs)
+
+def horner(coefs, t_vals):
+    """
+    Evalúa el polinomio de coeficientes coefs (orden decreciente de grado) en todos los valores del
+    array t_vals a la vez, con el esquema de Horner vectorizado.
+    """
+    t_vals = np.asarray(t_vals, dtype=float)
+    resultado = np.full(t_vals.shape, coefs[0] if len(coefs) > 0 else 0.0)
+    for c in coefs[1:]:
+        resultado = resultado * t_vals + c
+    return resultado
+
+def matriz_coeficientes(lista_coefs, creciente = False):
+    """
+    Apila varias listas de coeficientes (posiblemente de grados distintos) en una matriz con una fila
+    por polinomio y columnas en orden creciente de grado, rellenando con ceros.
+    Las listas están en orden decreciente de grado, salvo que creciente sea True.
+    """
+    grado_max = max((len(coefs) for coefs in lista_coefs), default=1) - 1
+    matriz = np.zeros((len(lista_coefs), grado_max + 1))
+    for i, coefs in enumerate(lista_coefs):
+        matriz[i, :len(coefs)] = coefs if creciente else coefs[::-1]
+    return matriz
+
+def evaluar_escena(curvas, t_vals, reparametrizadas = False, intervalo = None, tam_bloque = 4096):
+    """
+    Evalúa a la vez todas las curvas de una escena en los tiempos dados.
+    Los coeficientes de todas las curvas se apilan en una matriz, de modo que para cada bloque de tiempos
+    basta con construir una vez la matriz de potencias (Vandermonde) y hacer un producto de matrices.
+
+    Parameters
+    ----------
+    curvas : list
+        Lista de objetos CurvaInterpolacion (interpolados).
+    t_vals : array-like
+        Array de tiempos común a todas las curvas, o bien una lista con un array de tiempos por curva
+        (todos de la misma longitud), por ejemplo tras aplicar reparametrizaciones distintas a cada curva.
+    reparametrizadas : bool
+        Si es True, se evalúan los polinomios compuestos con la reparametrización de cada curva
+        (ver CurvaInterpolacion.set_reparametrizacion), de modo que todas las curvas comparten los tiempos.
+    intervalo : tuple
+        Intervalo (a, b) que contiene los tiempos. Si se da, se usa la base de Chebyshev en la variable
+        reescalada de coeficientes_intervalo, mucho mejor condicionada para polinomios de grado alto,
+        y la matriz de potencias se sustituye por la de polinomios de Chebyshev. Si no se da y reparametrizadas
+        es True, se usa el intervalo de las reparametrizaciones de las curvas, que debe ser el mismo en todas.
+    tam_bloque : int
+        Número de tiempos que se procesan a la vez, para acotar la memoria usada por la matriz de potencias.
+
+    Returns
+    -------
+    np.ndarray
+        Array de forma (n_curvas, n_frames, 2) con las coordenadas de cada curva en cada tiempo.
+    """
+    if reparametrizadas and intervalo is None:
+        intervalos = {curva.intervalo_reparametrizacion for curva in curvas if curva.reparametrizacion is not None}
+        if len(intervalos) > 1:
+            raise ValueError("Las reparametrizaciones de las curvas tienen intervalos distintos: hay que indicar uno")
+        intervalo = intervalos.pop() if intervalos else None
+    coefs = matriz_coeficientes([c for curva in curvas for c in curva.coeficientes_float(reparametrizadas, intervalo)],
+                                creciente = intervalo is not None)
+    n = len(curvas)
+    coefs = coefs.reshape(n, 2, -1).transpose(0, 2, 1)          # n_curvas x (grado + 1) x 2
+    grado = coefs.shape[1] - 1
+
+    t_vals = np.asarray(t_vals, dtype=float)
+    if intervalo is not None:
+        t_vals = variable_intervalo(t_vals, *intervalo)
+    tiempos_comunes = t_vals.ndim == 1
+    n_frames = t_vals.shape[-1]
+    vertices = np.empty((n, n_frames, 2))
+    for inicio in range(0, n_frames, tam_bloque):
+        fin = min(inicio + tam_bloque, n_frames)
+        if tiempos_comunes:
+            # Una sola matriz de potencias para todas las curvas: (frames x grado) @ (grado x 2 n_curvas)
+            potencias = _potencias(t_vals[inicio:fin], grado, intervalo)
+            bloque = potencias @ coefs.transpose(1, 0, 2).reshape(grado + 1, 2*n)
+            vertices[:, inicio:fin, :] = bloque.reshape(fin - inicio, n, 2).transpose(1, 0, 2)
+        else:
+            potencias = _potencias(t_vals[:, inicio:fin], grado, intervalo)    # n_curvas x frames x (grado + 1)
+            vertices[:, inicio:fin, :] = np.einsum('cfg,cgk->cfk', potencias, coefs)
+    return vertices
+
+def _potencias(t_vals, grado, intervalo):
+    """
+    Matriz de potencias t^0, ..., t^grado de los tiempos dados (añadiendo un último eje), o, si se da
+    un intervalo, la de los polinomios de Chebyshev T_0(s), ..., T_grado(s) en la variable reescalada.
+    """
+    if intervalo is None:
+        return t_vals[..., None] ** np.arange(grado + 1)
+    return chebyshev.chebvander(t_vals, grado)
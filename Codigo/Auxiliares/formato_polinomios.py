@@ -0,0 +1,130 @@
+import re
+from fractions import Fraction
+from Codigo.Auxiliares.hermite import a_fraccion, poly_desde_coeficientes
+
+# Formatos en los que se pueden guardar los polinomios en los ficheros JSON
+FORMATO_TEXTO = "texto"                 # expresión de sympy, p. ej. "3*t**2/4 - t + 1"
+FORMATO_COEFICIENTES = "coeficientes"   # lista de pares [numerador, denominador], en orden creciente de grado
+FORMATOS = (FORMATO_TEXTO, FORMATO_COEFICIENTES)
+
+_TOKENS = re.compile(r"\s*(?:(\d+)|(t)|(\*\*)|([*/+-]))")
+
+def coeficientes_desde_texto(expresion):
+    """
+    Analiza una expresión de un polinomio en 't' de coeficientes racionales, como las que escribe
+    str(poly.as_expr()) ("16463*t**9/39513600 - 3*t/4 + 2", "-t**2 + t/2", ...), sin usar sympy.
+    Admite sumas y restas de términos que son productos y cocientes de enteros y potencias enteras de t.
+    Devuelve la lista de coeficientes (Fraction) en orden creciente de grado, o None si la expresión tiene
+    otra forma (números decimales, paréntesis, otras variables...), en cuyo caso hay que usar sympy.
+    """
+    # Lista de tokens (entero, variable, potencia, operador); deben cubrir toda la expresión
+    tokens = list()
+    posicion = 0
+    expresion = expresion.rstrip()
+    while posicion < len(expresion):
+        encontrado = _TOKENS.match(expresion, posicion)
+        if encontrado is None:
+            return None
+        tokens.append(encontrado.groups())
+        posicion = encontrado.end()
+
+    coeficientes = dict()
+    i = 0
+    while i < len(tokens):
+        if coeficientes and tokens[i][3] not in ("+", "-"):
+            return None
+        # Signo del término
+        signo = 1
+        while i < len(tokens) and tokens[i][3] in ("+", "-"):
+            if tokens[i][3] == "-":
+                signo = -signo
+            i += 1
+        # Factores del término, separados por * o /
+        numerador, denominador, grado = signo, 1, 0
+        operador = "*"
+        while True:
+            if i >= len(tokens):
+                return None
+            entero, variable, _, _ = tokens[i]
+            i += 1
+            if entero is not None:
+                if operador == "*":
+                    numerador *= int(entero)
+                else:
+                    denominador *= int(entero)
+            elif variable is not None and operador == "*":
+                if i < len(tokens) and tokens[i][2] is not None:
+                    if i + 1 >= len(tokens) or tokens[i+1][0] is None:
+                        return None
+                    grado += int(tokens[i+1][0])
+                    i += 2
+                else:
+                    grado += 1
+            else:
+                return None
+            if i < len(tokens) and tokens[i][3] in ("*", "/"):
+                operador = tokens[i][3]
+                i += 1
+            else:
+                break
+        if denominador == 0:
+            return None
+        coeficientes[grado] = coeficientes.get(grado, Fraction(0)) + Fraction(numerador, denominador)
+
+    if not coeficientes:
+        return None
+    return [coeficientes.get(k, Fraction(0)) for k in range(max(coeficientes) + 1)]
+
+def texto_desde_coeficientes(coefs):
+    """
+    Escribe la expresión del polinomio de coeficientes racionales coefs (orden creciente de grado) en la forma
+    que analiza coeficientes_desde_texto, sin usar sympy, para cuando no se tiene un sympy Polynomial.
+    Los términos no se ordenan como en str(poly.as_expr()) ("-t + 4" en lugar de "4 - t").
+    """
+    terminos = list()
+    for grado in range(len(coefs) - 1, -1, -1):
+        c = a_fraccion(coefs[grado])
+        if c == 0:
+            continue
+        potencia = "" if grado == 0 else ("t" if grado == 1 else f"t**{grado}")
+        absoluto = abs(c)
+        if potencia == "":
+            termino = str(absoluto)
+        elif absoluto.numerator == 1:
+            termino = potencia
+        else:
+            termino = f"{absoluto.numerator}*{potencia}"
+        if potencia != "" and absoluto.denominator != 1:
+            termino += f"/{absoluto.denominator}"
+        if not terminos:
+            terminos.append(("-" if c < 0 else "") + termino)
+        else:
+            terminos.append(("- " if c < 0 else "+ ") + termino)
+    return " ".join(terminos) if terminos else "0"
+
+def lista_desde_poly(poly):
+    """
+    Representación del sympy Polynomial poly como lista de pares [numerador, denominador] (enteros),
+    uno por grado en orden creciente. Los coeficientes en coma flotante se guardan con su valor exacto.
+    """
+    coefs = [a_fraccion(c) if c.is_Rational else Fraction(float(c)) for c in reversed(poly.all_coeffs())]
+    return [[c.numerator, c.denominator] for c in coefs]
+
+def poly_desde_lista(lista):
+    """
+    Construye el sympy Polynomial en 't' a partir de la lista de pares [numerador, denominador] de lista_desde_poly.
+    """
+    if not isinstance(lista, list) or not all(isinstance(par, list) and len(par) == 2 for par in lista):
+        raise ValueError("Los coeficientes deben ser una lista de pares [numerador, denominador]")
+    return poly_desde_coeficientes([Fraction(int(p), int(q)) for p, q in lista])
+
+def polinomio_a_json(poly, formato = FORMATO_TEXTO):
+    """
+    Valor que se guarda en un fichero JSON para el sympy Polynomial poly en el formato dado (ver FORMATOS).
+    En formato texto se escribe la expresión de sympy, como siempre.
+    """
+    if formato == FORMATO_TEXTO:
+        return str(poly.as_expr())
+    if formato == FORMATO_COEFICIENTES:
+        return lista_desde_poly(poly)
+    raise ValueError(f"Formato de polinomio desconocido: {formato}. Debe ser uno de {FORMATOS}")
@@ -1,12 +1,25 @@
+import numpy as np
 import sympy as sp
+from fractions import Fraction
+from math import factorial, perm
 from Codigo.Curvas.nodos import *
 t = sp.symbols('t')
 
-def hermite_sympy_dicts(t_vals, valores_dict, ders_dict):
+MODOS_HERMITE = ("fraccion", "sympy", "float")
+
+# Por encima de este error relativo estimado, el modo "float" recomienda usar un modo exacto
+TOLERANCIA_FLOAT = 1e-8
+
+def hermite_sympy_dicts(t_vals, valores_dict, ders_dict, modo = "fraccion"):
     """
     Halla el polinomio de interpolación de Hermite que toma los valores dados
     en el diccionario dado en valores_dict y con derivadas (hasta orden arbitrario) dadas en ders_dict.
     Todos los inputs (valores en t_vals, valores_dict y ders_dict) son Sympy Rationals.
+    El parámetro modo permite elegir el motor de cálculo (el resultado es idéntico en ambos casos):
+    - "fraccion": diferencias divididas con enteros y fractions.Fraction (por defecto, más rápido).
+    - "sympy": tabla completa de diferencias divididas con sympy.Rational y sp.expand.
+    - "float": cálculo numérico con NumPy (ver hermite_float). En este caso no se devuelve un
+      sympy Polynomial, sino la tupla (coefs, error_estimado).
     
     Parameters
     ----------
@@ -31,6 +44,12 @@ def hermite_sympy_dicts(t_vals, valores_dict, ders_dict):
     H : sympy Polynomial
         El polinomio de interpolación de Hermite en el símbolo 't'.
     """
+    if modo == "fraccion":
+        return hermite_fracciones(t_vals, valores_dict, ders_dict)
+    if modo == "float":
+        return hermite_float(t_vals, valores_dict, ders_dict)
+    if modo != "sympy":
+        raise ValueError(f"Modo de interpolación '{modo}' no reconocido. Opciones: {MODOS_HERMITE}")
 
     # 1. Construimos Z (lista de nodos) repitiendo cada t_i tantas veces como valores a interpolar
     Z = []
@@ -69,13 +88,514 @@ def hermite_sympy_dicts(t_vals, valores_dict, ders_dict):
     H = sp.expand(H)
     return sp.Poly(H, t)
 
-def curva_hermite_nodos(nodos):
+def hermite_fracciones(t_vals, valores_dict, ders_dict):
+    """
+    Mismo cálculo que hermite_sympy_dicts, pero con aritmética exacta de Python (int y Fraction)
+    en lugar de objetos de sympy:
+    - Solo se guarda una columna de la tabla de diferencias divididas, que se va sobreescribiendo.
+      De cada columna k basta con quedarse con su primer elemento f[Z_0, ..., Z_k].
+    - Los factoriales se calculan una sola vez.
+    - La forma de Newton se desarrolla con el esquema de Horner sobre listas de coeficientes,
+      sin pasar por expresiones simbólicas.
+    Devuelve un sympy Polynomial con exactamente los mismos coeficientes.
+    """
+    Z, columna, derivadas = _nodos_repetidos_fraccion(t_vals, valores_dict, ders_dict)
+    N = len(Z)
+    factoriales = [factorial(k) for k in range(N)]
+
+    # Coeficientes de la forma de Newton: c_k = f[Z_0, ..., Z_k]
+    coefs_newton = columna[:1]
+    for k in range(1, N):
+        # Al recorrer i en orden creciente, columna[i+1] aún contiene el valor de la columna k-1
+        for i in range(N-k):
+            if Z[i] == Z[i+k]:
+                columna[i] = derivadas[i][k-1] / factoriales[k]
+            else:
+                columna[i] = (columna[i+1] - columna[i]) / (Z[i+k] - Z[i])
+        coefs_newton.append(columna[0])
+
+    return poly_desde_coeficientes(newton_a_monomios(coefs_newton, Z))
+
+def hermite_float(t_vals, valores_dict, ders_dict):
+    """
+    Interpolación de Hermite en coma flotante. Las columnas de la tabla de diferencias divididas
+    se calculan de una vez con operaciones vectorizadas de NumPy, por lo que admite cientos de nodos.
+
+    Returns
+    -------
+    coefs : np.ndarray
+        Coeficientes del polinomio en orden decreciente de grado (el convenio de np.polyval).
+    error_estimado : float
+        Estimación del error relativo del polinomio obtenido. Es el máximo entre:
+        - el número de condición de evaluar el polinomio en la base de monomios en el rango de los nodos
+          (por eps), que mide cuánto se amplifican los errores de redondeo de los coeficientes,
+        - el residuo relativo en las condiciones de interpolación (valores y derivadas en los nodos).
+        Si supera TOLERANCIA_FLOAT conviene usar un modo exacto. Si los cálculos se desbordan
+        (con cientos de nodos los coeficientes pueden no caber en un float), vale infinito.
+    """
+    Z, columna, derivadas = _nodos_repetidos_float(t_vals, valores_dict, ders_dict)
+    N = len(Z)
+    if N == 0:
+        return np.zeros(1), 0.0
+
+    with np.errstate(over = 'ignore', invalid = 'ignore', divide = 'ignore'):
+        coefs_newton = np.empty(N)
+        coefs_newton[0] = columna[0]
+        for k in range(1, N):
+            dz = Z[k:] - Z[:-k]
+            iguales = dz == 0
+            dz[iguales] = 1
+            columna = (columna[1:] - columna[:-1]) / dz
+            if k <= derivadas.shape[1] and iguales.any():
+                # nodo repetido k + 1 veces: se usa la derivada k-ésima dividida por k!
+                columna[iguales] = derivadas[:N-k, k-1][iguales]
+            coefs_newton[k] = columna[0]
+
+        coefs = _newton_a_monomios_float(coefs_newton, Z)
+        return coefs, _estimar_error_float(coefs, t_vals, valores_dict, ders_dict)
+
+def _estimar_error_float(coefs, t_vals, valores_dict, ders_dict):
+    """
+    Calcula el error relativo estimado de hermite_float (ver su documentación).
+    """
+    eps = np.finfo(float).eps
+    tiempos = np.array([float(ti) for ti in t_vals])
+    T = np.abs(tiempos).max()
+
+    # Residuo en cada orden de derivación, relativo a la escala de los datos de ese orden
+    residuo = 0.0
+    max_orden = max(len(ders_dict[ti]) for ti in t_vals)
+    for k in range(max_orden + 1):
+        nodos_k = [ti for ti in t_vals if k <= len(ders_dict[ti])]
+        datos_k = np.array([float(valores_dict[ti]) if k == 0 else float(ders_dict[ti][k-1]) for ti in nodos_k])
+        evaluacion_k = np.polyval(np.polyder(coefs, k), [float(ti) for ti in nodos_k])
+        escala_k = max(np.abs(datos_k).max(), 1.0)
+        residuo_k = np.abs(evaluacion_k - datos_k).max() / escala_k
+        if not np.isfinite(residuo_k):
+            # Un NaN haría falsa cualquier comparación con TOLERANCIA_FLOAT: se cuenta como error infinito
+            return float("inf")
+        residuo = max(residuo, residuo_k)
+
+    escala = max(np.abs([float(valores_dict[ti]) for ti in t_vals]).max(), 1.0)
+    condicion = len(coefs) * eps * np.polyval(np.abs(coefs), T) / escala
+    if not np.isfinite(condicion):
+        return float("inf")
+    return float(max(condicion, residuo))
+
+def _nodos_repetidos_float(t_vals, valores_dict, ders_dict):
+    """
+    Versión en coma flotante de _nodos_repetidos_fraccion. Devuelve arrays de NumPy: Z, la columna 0
+    de la tabla, y una matriz cuya fila i contiene las derivadas del nodo Z_i divididas por k!.
+    """
+    Z = []
+    columna = []
+    filas_derivadas = []
+    for ti in t_vals:
+        ders_i = [float(d) / factorial(k+1) for k, d in enumerate(ders_dict[ti])]
+        repeticiones = len(ders_i) + 1
+        Z += [float(ti)] * repeticiones
+        columna += [float(valores_dict[ti])] * repeticiones
+        filas_derivadas += [ders_i] * repeticiones
+
+    max_orden = max((len(d) for d in filas_derivadas), default = 0)
+    derivadas = np.zeros((len(Z), max_orden))
+    for i, ders_i in enumerate(filas_derivadas):
+        derivadas[i, :len(ders_i)] = ders_i
+    return np.array(Z), np.array(columna), derivadas
+
+def _newton_a_monomios_float(coefs_newton, Z):
+    """
+    Versión vectorizada de newton_a_monomios. Devuelve los coeficientes en orden decreciente de grado.
+    """
+    N = len(coefs_newton)
+    coefs = np.array([coefs_newton[-1]])
+    for k in range(N-2, -1, -1):
+        # coefs <- coefs * (t - Z_k) + c_k
+        nuevos = np.append(coefs, coefs_newton[k])
+        nuevos[1:-1] -= Z[k] * coefs[:-1]
+        nuevos[-1] -= Z[k] * coefs[-1]
+        coefs = nuevos
+    return coefs
+
+def poly_desde_floats(coefs):
+    """
+    Construye un sympy Polynomial en 't' con coeficientes en coma flotante a partir de un array
+    de coeficientes en orden decreciente de grado.
+    """
+    return sp.Poly.from_list([sp.Float(c) for c in coefs], t)
+
+def _nodos_repetidos_fraccion(t_vals, valores_dict, ders_dict):
+    """
+    Construye la lista Z de nodos repetidos, la columna 0 de la tabla de diferencias divididas y,
+    para cada posición de Z, la tupla de derivadas del nodo correspondiente. Todo como Fraction.
+    """
+    Z = []
+    columna = []
+    derivadas = []
+    for ti in t_vals:
+        zi = a_fraccion(ti)
+        ders_i = tuple(a_fraccion(d) for d in ders_dict[ti])
+        repeticiones = len(ders_i) + 1
+        Z += [zi] * repeticiones
+        columna += [a_fraccion(valores_dict[ti])] * repeticiones
+        derivadas += [ders_i] * repeticiones
+    return Z, columna, derivadas
+
+def newton_a_monomios(coefs_newton, Z):
+    """
+    Desarrolla el polinomio c_0 + c_1 (t - Z_0) + ... + c_{N-1} (t - Z_0)...(t - Z_{N-2})
+    en la base de monomios mediante el esquema de Horner.
+    Devuelve la lista de coeficientes en orden creciente de grado.
+    """
+    N = len(coefs_newton)
+    if N == 0:
+        return []
+    coefs = [coefs_newton[-1]]
+    for k in range(N-2, -1, -1):
+        # coefs <- coefs * (t - Z_k) + c_k
+        z = Z[k]
+        nuevos = [coefs_newton[k] - z*coefs[0]]
+        for j in range(1, len(coefs)):
+            nuevos.append(coefs[j-1] - z*coefs[j])
+        nuevos.append(coefs[-1])
+        coefs = nuevos
+    return coefs
+
+def a_fraccion(r):
+    """
+    Convierte un número racional (int, str, sympy Rational o Fraction) en un objeto Fraction.
+    """
+    if isinstance(r, (int, Fraction)):
+        return Fraction(r)
+    r = sp.Rational(r)
+    return Fraction(int(r.p), int(r.q))
+
+def poly_desde_coeficientes(coefs):
+    """
+    Construye un sympy Polynomial en 't' a partir de sus coeficientes racionales en orden creciente de grado.
+    """
+    coefs_rational = [sp.Rational(c.numerator, c.denominator) for c in reversed(coefs)]
+    return sp.Poly.from_list(coefs_rational, t)
+
+def hermite_lote(t_vals, lista_valores_dicts, lista_ders_dicts, modo = "fraccion"):
+    """
+    Interpola a la vez varias columnas de datos que comparten los mismos nodos: la lista de tiempos
+    t_vals y el número de derivadas impuestas en cada tiempo deben ser iguales en todas ellas
+    (por ejemplo, las coordenadas x e y de una curva, o varias curvas con los mismos tiempos).
+    Los denominadores Z_{i+k} - Z_i y la base de Newton (t - Z_0)...(t - Z_{k-1}) se calculan una
+    sola vez para todas las columnas.
+
+    Parameters
+    ----------
+    t_vals : list
+        [t0, t1, ..., tn], comunes a todas las columnas.
+    lista_valores_dicts : list
+        Un diccionario de valores (como valores_dict en hermite_sympy_dicts) por columna.
+    lista_ders_dicts : list
+        Un diccionario de derivadas (como ders_dict en hermite_sympy_dicts) por columna.
+    modo : str
+        "fraccion", "sympy" o "float" (ver hermite_sympy_dicts).
+
+    Returns
+    -------
+    list
+        Un sympy Polynomial por columna. En modo "float", una tupla (coefs, error_estimado) por columna.
+    """
+    if modo == "sympy":
+        return [hermite_sympy_dicts(t_vals, valores_dict, ders_dict, modo)
+                for valores_dict, ders_dict in zip(lista_valores_dicts, lista_ders_dicts)]
+    if modo not in MODOS_HERMITE:
+        raise ValueError(f"Modo de interpolación '{modo}' no reconocido. Opciones: {MODOS_HERMITE}")
+
+    multiplicidades = [len(lista_ders_dicts[0][ti]) for ti in t_vals]
+    for ders_dict in lista_ders_dicts:
+        if [len(ders_dict[ti]) for ti in t_vals] != multiplicidades:
+            raise ValueError("Todas las columnas deben tener el mismo número de derivadas en cada tiempo")
+
+    if modo == "float":
+        return _hermite_lote_float(t_vals, lista_valores_dicts, lista_ders_dicts)
+
+    columnas = []
+    lista_derivadas = []
+    for valores_dict, ders_dict in zip(lista_valores_dicts, lista_ders_dicts):
+        Z, columna, derivadas = _nodos_repetidos_fraccion(t_vals, valores_dict, ders_dict)
+        columnas.append(columna)
+        lista_derivadas.append(derivadas)
+    N = len(Z)
+
+    coefs_newton = [columna[:1] for columna in columnas]
+    for k in range(1, N):
+        # Inversos de los denominadores de la columna k, compartidos por todas las columnas de datos.
+        # None indica nodo repetido k + 1 veces (se usa la derivada k-ésima dividida por k!)
+        inversos = [None if Z[i] == Z[i+k] else 1 / (Z[i+k] - Z[i]) for i in range(N-k)]
+        k_factorial = factorial(k)
+        for columna, derivadas, coefs in zip(columnas, lista_derivadas, coefs_newton):
+            for i in range(N-k):
+                if inversos[i] is None:
+                    columna[i] = derivadas[i][k-1] / k_factorial
+                else:
+                    columna[i] = (columna[i+1] - columna[i]) * inversos[i]
+            coefs.append(columna[0])
+
+    base = base_newton(Z)
+    polinomios = []
+    for coefs in coefs_newton:
+        coefs_monomios = [Fraction(0)] * N
+        for c_k, omega_k in zip(coefs, base):
+            if c_k:
+                for j, w in enumerate(omega_k):
+                    coefs_monomios[j] += c_k * w
+        polinomios.append(poly_desde_coeficientes(coefs_monomios))
+    return polinomios
+
+def base_newton(Z):
+    """
+    Devuelve la lista de coeficientes (en orden creciente de grado) de los polinomios de la base de Newton
+    omega_k = (t - Z_0)(t - Z_1)...(t - Z_{k-1}), para k = 0, ..., len(Z) - 1.
+    """
+    base = [[Fraction(1)]] if Z else []
+    for k in range(len(Z) - 1):
+        omega = base[-1]
+        z = Z[k]
+        # omega_{k+1} = omega_k * (t - Z_k)
+        siguiente = [-z*omega[0]] + [omega[j-1] - z*omega[j] for j in range(1, len(omega))] + [omega[-1]]
+        base.append(siguiente)
+    return base
+
+def _hermite_lote_float(t_vals, lista_valores_dicts, lista_ders_dicts):
+    """
+    Versión en coma flotante de hermite_lote: todas las columnas de datos se actualizan a la vez
+    como una matriz, y los coeficientes se obtienen con un único producto por la matriz de la base de Newton.
+    """
+    datos = [_nodos_repetidos_float(t_vals, valores_dict, ders_dict)
+             for valores_dict, ders_dict in zip(lista_valores_dicts, lista_ders_dicts)]
+    R = len(datos)
+    if R == 0:
+        return []
+    Z = datos[0][0]
+    N = len(Z)
+    if N == 0:
+        return [(np.zeros(1), 0.0) for _ in range(R)]
+
+    with np.errstate(over = 'ignore', invalid = 'ignore', divide = 'ignore'):
+        columnas = np.stack([columna for _, columna, _ in datos], axis = 1)      # N x R
+        derivadas = np.stack([ders for _, _, ders in datos], axis = 2)          # N x max_orden x R
+        coefs_newton = np.empty((N, R))
+        coefs_newton[0] = columnas[0]
+        for k in range(1, N):
+            dz = Z[k:] - Z[:-k]
+            iguales = dz == 0
+            dz[iguales] = 1
+            columnas = (columnas[1:] - columnas[:-1]) / dz[:, None]
+            if k <= derivadas.shape[1] and iguales.any():
+                columnas[iguales] = derivadas[:N-k, k-1][iguales]
+            coefs_newton[k] = columnas[0]
+
+        # Matriz de la base de Newton: fila k = coeficientes de omega_k en orden decreciente de grado
+        base = np.zeros((N, N))
+        omega = np.array([1.0])
+        for k in range(N):
+            base[k, N-1-k:] = omega
+            omega = np.append(omega, 0.0)
+            omega[1:] -= Z[k] * omega[:-1].copy()
+        coefs = coefs_newton.T @ base                                            # R x N
+
+        return [(coefs[r], _estimar_error_float(coefs[r], t_vals, lista_valores_dicts[r], lista_ders_dicts[r]))
+                for r in range(R)]
+
+class EstadoHermite(object):
+    """
+    Forma de Newton de uno o varios polinomios de Hermite (columnas) con los mismos nodos, que se puede
+    ampliar condición a condición en O(N) en lugar de recalcular toda la tabla de diferencias divididas.
+
+    Si p interpola las N condiciones actuales y omega(t) = (t - Z_0)...(t - Z_{N-1}), el polinomio que
+    además cumple p^(m)(z) = v (siendo m el número de condiciones que ya había en z) es
+        p + c * omega,    con    c = (v - p^(m)(z)) / omega^(m)(z),
+    porque omega y sus m - 1 primeras derivadas se anulan en todas las condiciones anteriores.
+    c es el nuevo coeficiente de Newton, y omega^(m)(z) = m! * prod_{Z_j != z} (z - Z_j).
+
+    Si monomios es True, también se actualizan en cada condición los coeficientes de cada polinomio en la base
+    de monomios. Si es False, solo se guardan los coeficientes de Newton: p^(m)(z) se calcula por multiplicación
+    anidada en la base de Newton, y los polinomios se desarrollan únicamente cuando se piden con polinomios().
+    """
+    def __init__(self, columnas = 1, monomios = True):
+        self.Z = []                                         # nodos repetidos, en orden de llegada
+        self.multiplicidades = dict()                       # tiempo -> nº de condiciones en ese tiempo
+        self.monomios = monomios
+        self.omega = [Fraction(1)]                          # coeficientes de omega, orden creciente
+        self.coefs_newton = [[] for _ in range(columnas)]
+        self.coefs = [[] for _ in range(columnas)]          # coeficientes de cada polinomio, orden creciente
+
+    def anadir_condicion(self, tiempo, valores):
+        """
+        Añade la siguiente condición en el tiempo dado: el valor si aún no hay condiciones en ese tiempo,
+        o la derivada de orden m si ya hay m condiciones. valores contiene un dato por columna.
+        """
+        z = a_fraccion(tiempo)
+        m = self.multiplicidades.get(z, 0)
+
+        omega_m = Fraction(factorial(m))
+        for zj in self.Z:
+            if zj != z:
+                omega_m *= z - zj
+
+        for columna, v in enumerate(valores):
+            if not self.monomios:
+                c = (a_fraccion(v) - _derivada_newton_en(self.coefs_newton[columna], self.Z, m, z)) / omega_m
+                self.coefs_newton[columna].append(c)
+                continue
+            coefs = self.coefs[columna]
+            c = (a_fraccion(v) - _derivada_en(coefs, m, z)) / omega_m
+            self.coefs_newton[columna].append(c)
+            if len(coefs) < len(self.omega):
+                coefs.extend([Fraction(0)] * (len(self.omega) - len(coefs)))
+            for j, w in enumerate(self.omega):
+                coefs[j] += c * w
+
+        if self.monomios:
+            # omega <- omega * (t - z)
+            self.omega = [-z*self.omega[0]] + [self.omega[j-1] - z*self.omega[j]
+                                               for j in range(1, len(self.omega))] + [self.omega[-1]]
+        self.Z.append(z)
+        self.multiplicidades[z] = m + 1
+
+    def anadir_condiciones(self, condiciones):
+        """
+        Añade en orden una lista de condiciones (tiempo, valores) (ver anadir_condicion).
+        """
+        for tiempo, valores in condiciones:
+            self.anadir_condicion(tiempo, valores)
+
+    def polinomios(self):
+        """
+        Devuelve la lista de polinomios (sympy Polynomial, uno por columna) que interpolan las condiciones añadidas.
+        Si solo se guardan los coeficientes de Newton (monomios = False), se desarrollan ahora.
+        """
+        if not self.monomios:
+            return [poly_desde_coeficientes(newton_a_monomios(coefs_newton, self.Z[:max(len(self.Z) - 1, 0)]))
+                    for coefs_newton in self.coefs_newton]
+        return [poly_desde_coeficientes(coefs) for coefs in self.coefs]
+
+    def polinomios_newton(self):
+        """
+        Devuelve la lista de polinomios (uno por columna) en forma de Newton, como objetos PolinomioNewton.
+        """
+        return [PolinomioNewton(self.Z, coefs_newton, coefs if self.monomios else None)
+                for coefs_newton, coefs in zip(self.coefs_newton, self.coefs)]
+
+class PolinomioNewton(object):
+    """
+    Polinomio exacto guardado en forma de Newton:
+        c_0 + c_1 (t - Z_0) + c_2 (t - Z_0)(t - Z_1) + ... + c_{N-1} (t - Z_0)...(t - Z_{N-2}).
+    Se evalúa por multiplicación anidada (Horner en la base de Newton), sin desarrollar el producto.
+    El sympy Polynomial en la base de monomios solo se construye cuando se pide (a_poly) y se guarda.
+    """
+    def __init__(self, nodos, coefs_newton, coefs_monomios = None):
+        self.nodos = [a_fraccion(z) for z in nodos[:max(len(coefs_newton) - 1, 0)]]
+        self.coefs_newton = [a_fraccion(c) for c in coefs_newton]
+        # Si se conocen los coeficientes en la base de monomios (orden creciente), se evita desarrollar
+        self._coefs_monomios = None if coefs_monomios is None else list(coefs_monomios)
+        self._poly = None
+        self._floats = None
+
+    def __call__(self, t0):
+        """
+        Evalúa el polinomio en t0. Si t0 es un número en coma flotante, el cálculo se hace en coma flotante;
+        en otro caso se hace de forma exacta y se devuelve un sympy Rational.
+        """
+        if isinstance(t0, (float, np.floating, np.ndarray)):
+            return self.evaluar_float(t0)
+
+        z = a_fraccion(t0)
+        resultado = self.coefs_newton[-1] if self.coefs_newton else Fraction(0)
+        for k in range(len(self.coefs_newton) - 2, -1, -1):
+            resultado = resultado * (z - self.nodos[k]) + self.coefs_newton[k]
+        return sp.Rational(resultado.numerator, resultado.denominator)
+
+    def evaluar_float(self, t_vals):
+        """
+        Evalúa el polinomio en coma flotante en un número o array de NumPy, por multiplicación anidada.
+        """
+        if self._floats is None:
+            self._floats = (np.array([float(c) for c in self.coefs_newton]), np.array([float(z) for z in self.nodos]))
+        coefs, nodos = self._floats
+        t_vals = np.asarray(t_vals, dtype = float)
+        resultado = np.full(t_vals.shape, coefs[-1] if len(coefs) > 0 else 0.0)
+        for k in range(len(coefs) - 2, -1, -1):
+            resultado = resultado * (t_vals - nodos[k]) + coefs[k]
+        return resultado
+
+    def a_poly(self):
+        """
+        Devuelve el polinomio como sympy Polynomial en 't' (desarrollado en la base de monomios).
+        """
+        if self._poly is None:
+            if self._coefs_monomios is None:
+                self._coefs_monomios = newton_a_monomios(self.coefs_newton, self.nodos)
+            self._poly = poly_desde_coeficientes(self._coefs_monomios)
+        return self._poly
+
+    def degree(self):
+        return self.a_poly().degree()
+
+    def __str__(self):
+        return str(self.a_poly().as_expr())
+
+    def __repr__(self):
+        return f"PolinomioNewton({self})"
+
+def _derivada_en(coefs, m, z):
+    """
+    Evalúa en z la derivada m-ésima del polinomio de coeficientes coefs (orden creciente), por Horner.
+    """
+    resultado = Fraction(0)
+    for j in range(len(coefs) - 1, m - 1, -1):
+        resultado = resultado * z + coefs[j] * perm(j, m)
+    return resultado
+
+def _derivada_newton_en(coefs_newton, Z, m, z):
+    """
+    Evalúa en z la derivada m-ésima del polinomio en forma de Newton de coeficientes coefs_newton y nodos Z,
+    sin desarrollarlo: se hace la multiplicación anidada llevando los m + 1 primeros coeficientes de Taylor en z,
+    ya que cada factor (t - Z_k) es (z - Z_k) + (t - z).
+    """
+    taylor = [Fraction(0)] * (m + 1)
+    for k in range(len(coefs_newton) - 1, -1, -1):
+        # taylor <- taylor * (t - Z_k) + c_k, con k = N-1 el último coeficiente (sin factor)
+        if k < len(coefs_newton) - 1:
+            d = z - Z[k]
+            for j in range(m, 0, -1):
+                taylor[j] = taylor[j] * d + taylor[j-1]
+            taylor[0] *= d
+        taylor[0] += coefs_newton[k]
+    return taylor[m] * factorial(m)
+
+def condiciones_nuevas(anteriores, actuales):
+    """
+    Compara dos diccionarios de condiciones de interpolación {tiempo: [datos de orden 0, orden 1, ...]}.
+    Si actuales solo añade condiciones a anteriores (tiempos nuevos, o derivadas de orden superior en
+    tiempos existentes), devuelve la lista de condiciones (tiempo, valores) que faltan, en el orden
+    en que deben añadirse a un EstadoHermite. Si se ha quitado o modificado alguna condición, devuelve None.
+    """
+    nuevas = []
+    for tiempo, datos in anteriores.items():
+        datos_actuales = actuales.get(tiempo)
+        if datos_actuales is None or datos_actuales[:len(datos)] != datos:
+            return None
+    for tiempo, datos in actuales.items():
+        ya_incluidos = len(anteriores.get(tiempo, ()))
+        nuevas.extend((tiempo, valores) for valores in datos[ya_incluidos:])
+    return nuevas
+
+def curva_hermite_nodos(nodos, modo = "fraccion"):
     """
     Interpolación de curvas de Hermite en R2.
     Parameters
     ----------
     nodos: list
     Lista de nodos a interpolar, con tiempos, puntos y derivadas
+    modo: str
+    Motor de cálculo de las diferencias divididas (ver hermite_sympy_dicts)
 
     Returns
     -------
@@ -83,35 +603,91 @@ def curva_hermite_nodos(nodos):
         Polinomio interpolante de Hermite en x.
     curva_y : sympy Polynomial
         Polinomio interpolante de Hermite en y.
+    Si modo == "float", se devuelve en su lugar (coefs_x, coefs_y, error_estimado), con los
+    coeficientes como arrays de NumPy y el mayor de los dos errores estimados.
     """
     
+    tiempos, valores, derivadas = _datos_curva(nodos)
+    curva_x, curva_y = hermite_lote(tiempos, valores, derivadas, modo)
+
+    if modo == "float":
+        (coefs_x, error_x), (coefs_y, error_y) = curva_x, curva_y
+        return coefs_x, coefs_y, max(error_x, error_y)
+
+    return curva_x, curva_y
+
+def curvas_hermite_lote(lista_nodos_curvas, modo = "fraccion"):
+    """
+    Interpola a la vez varias curvas. Las curvas se agrupan según sus nodos repetidos (tiempos y número
+    de derivadas en cada tiempo), y todas las coordenadas de un mismo grupo se resuelven con una
+    sola llamada a hermite_lote.
+
+    Parameters
+    ----------
+    lista_nodos_curvas : list
+        Lista con la lista de nodos de cada curva.
+
+    Returns
+    -------
+    list
+        Para cada curva, el resultado que daría curva_hermite_nodos.
+    """
+    grupos = dict()
+    for indice, nodos in enumerate(lista_nodos_curvas):
+        clave = tuple((n.get_tiempo(), len(n.get_derivadas())) for n in nodos)
+        grupos.setdefault(clave, []).append(indice)
+
+    resultados = [None] * len(lista_nodos_curvas)
+    for indices in grupos.values():
+        tiempos = None
+        valores = []
+        derivadas = []
+        for indice in indices:
+            tiempos, valores_curva, derivadas_curva = _datos_curva(lista_nodos_curvas[indice])
+            valores.extend(valores_curva)
+            derivadas.extend(derivadas_curva)
+
+        polinomios = hermite_lote(tiempos, valores, derivadas, modo)
+        for j, indice in enumerate(indices):
+            curva_x, curva_y = polinomios[2*j], polinomios[2*j + 1]
+            if modo == "float":
+                (coefs_x, error_x), (coefs_y, error_y) = curva_x, curva_y
+                resultados[indice] = (coefs_x, coefs_y, max(error_x, error_y))
+            else:
+                resultados[indice] = (curva_x, curva_y)
+    return resultados
+
+def _datos_curva(nodos):
+    """
+    Extrae de la lista de nodos de una curva los tiempos y los diccionarios de valores y derivadas
+    de cada coordenada, en el formato de hermite_sympy_dicts.
+    """
     tiempos = [n.get_tiempo() for n in nodos]
     puntos_x = {n.get_tiempo(): n.get_punto()[0] for n in nodos}
     puntos_y = {n.get_tiempo(): n.get_punto()[1] for n in nodos}
     ders_x = {n.get_tiempo(): tuple(der[0] for der in n.get_derivadas()) for n in nodos}
     ders_y = {n.get_tiempo(): tuple(der[1] for der in n.get_derivadas()) for n in nodos}
+    return tiempos, [puntos_x, puntos_y], [ders_x, ders_y]
 
-    curva_x = hermite_sympy_dicts(tiempos, puntos_x, ders_x)
-    curva_y = hermite_sympy_dicts(tiempos, puntos_y, ders_y)
-
-    return curva_x, curva_y
-
-def hermite_nodos(nodos):
+def hermite_nodos(nodos, modo = "fraccion"):
     """
     Interpolación de polinomios de Hermite en R.
     Parameters
     ----------
     nodos: list
     Lista de nodos a interpolar, con tiempos, puntos y derivadas
+    modo: str
+    Motor de cálculo de las diferencias divididas (ver hermite_sympy_dicts)
 
     Returns
     -------
     sympy Polynomial
         Polinomio de Hermite interpolando los nodos dados.
+        Si modo == "float", se devuelve la tupla (coefs, error_estimado) de hermite_float.
     """
     # Los nodos deberían estar ordenados por tiempo, y sin repeticiones (no dos nodos con mismo tiempo)
     t_vals = [n.get_tiempo() for n in nodos]
     valores_dict = {n.get_tiempo(): n.get_valor() for n in nodos}
     ders_dict = {n.get_tiempo(): tuple(n.get_derivadas()) for n in nodos}
 
-    return hermite_sympy_dicts(t_vals, valores_dict, ders_dict)
\ No newline at end of file
+    return hermite_sympy_dicts(t_vals, valores_dict, ders_dict, modo)
\ No newline at end of file
@@ -1,6 +1,17 @@
+import os
+import glob
 import json
 import sympy as sp
 from Codigo.Curvas.clase_curva import *
+from Codigo.Auxiliares.cache_interpolacion import poly_desde_json
+from Codigo.Auxiliares.formato_polinomios import FORMATO_TEXTO
+from Codigo.Auxiliares.escena_binaria import guardar_escena_npz, leer_escena_npz
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
 
 def leer_poligonos_desde_json(ruta_fichero):
     """
@@ -19,9 +30,11 @@ def leer_poligonos_desde_json(ruta_fichero):
 
     return lista_poligonos
 
-def leer_curvas_desde_json(ruta_fichero):
+def leer_curvas_desde_json(ruta_fichero, interpolar = False):
     """
-    Lee el JSON y devuelve un diccionario cuyos valores son objetos de la clase CurvaInterpolacion
+    Lee el JSON y devuelve un diccionario cuyos valores son objetos de la clase CurvaInterpolacion.
+    Las curvas se devuelven tal como están en el fichero; si interpolar es True, se interpolan todas a la vez
+    (ver interpolar_curvas).
     """
 
     with open(ruta_fichero, 'r', encoding='utf-8') as f:
@@ -34,24 +47,44 @@ def leer_curvas_desde_json(ruta_fichero):
     for nombre in curvas_dict:
         curvas_obj[nombre] = CurvaInterpolacion.from_dict(curvas_dict[nombre])
 
+    if interpolar:
+        interpolar_curvas(list(curvas_obj.values()))
     return curvas_obj
 
-def lista_curvas_desde_json(ruta_fichero):
+def lista_curvas_desde_json(ruta_fichero, interpolar = False):
     """
     Lee el json y devuelve una lista con las curvas guardadas en una lista en el fichero.
+    Si interpolar es True, se interpolan todas a la vez (ver interpolar_curvas).
     """
 
     with open(ruta_fichero, 'r', encoding='utf-8') as f:
         datos = json.load(f)
 
-    return [CurvaInterpolacion.from_dict(c) for c in datos["curvas"]]
+    curvas = [CurvaInterpolacion.from_dict(c) for c in datos["curvas"]]
+    if interpolar:
+        interpolar_curvas(curvas)
+    return curvas
+
+def completar_interpolacion(curvas, interpolar = False):
+    """
+    Interpola conjuntamente (ver interpolar_curvas) las curvas de la lista que no tienen polinomios.
+    Si interpolar es True, se recalculan los polinomios de todas las curvas.
+    Los lectores de ficheros no la usan: las curvas guardadas sin polinomios se leen sin interpolar,
+    y quien necesite sus polinomios debe llamarla (o interpolar cada curva).
+    """
+    pendientes = [c for c in curvas if interpolar or c.xpoly is None or c.ypoly is None]
+    if pendientes:
+        interpolar_curvas(pendientes)
 
-def leer_datos_desde_json(ruta_fichero):
+def leer_datos_desde_json(ruta_fichero, interpolar = False):
     """
     Lee el fichero json y devuelve:
     - Una lista de los poligonos (representados por dos tuplas)
-    - Una lista de curvas (como objetos CurvaInterpolacion)
+    - Una lista de curvas (como objetos CurvaInterpolacion), tal como están en el fichero
+      (si interpolar es True, se interpolan todas a la vez).
     - Una lista de tiempos (sp.Rational)
+    - Las listas de tiempos para los triángulos fijos y de tiempos e intervalos en los que el polígono
+      está mal (None si no aparecen en el fichero) y la lista de reparametrizaciones.
     """
 
     with open(ruta_fichero, 'r', encoding='utf-8') as f:
@@ -65,25 +98,203 @@ def leer_datos_desde_json(ruta_fichero):
         lista_poligonos.append(tuplas_coordenadas)
     
     curvas = [CurvaInterpolacion.from_dict(c) for c in datos["curvas"]]
+    if interpolar:
+        interpolar_curvas(curvas)
     tiempos = [sp.Rational(t) for t in datos["tiempos"]]
     tiempos_triangulos = [sp.Rational(ti) for ti in datos.get("tiempos_triangulos", [])]
-    tiempos_triangulos_mal = [sp.Rational(ti) for ti in datos.get("tiempos_triangulos_mal", [])]
-    intervalos_triangulos_mal = [(sp.Rational(intervalo[0]), sp.Rational(intervalo[1]))
-                                 for intervalo in datos.get("intervalos_triangulos_mal", [])]
+    tiempos_triangulos_mal = None
+    if "tiempos_triangulos_mal" in datos:
+        tiempos_triangulos_mal = [sp.Rational(ti) for ti in datos["tiempos_triangulos_mal"]]
+    intervalos_triangulos_mal = None
+    if "intervalos_triangulos_mal" in datos:
+        intervalos_triangulos_mal = [(sp.Rational(intervalo[0]), sp.Rational(intervalo[1]))
+                                     for intervalo in datos["intervalos_triangulos_mal"]]
     
 
     repars = list()
-    t = sp.symbols('t')
     for string_f in datos.get("reparametrizaciones", []):
-        repars.append(sp.Poly(string_f, t))
+        repars.append(poly_desde_json(string_f))
 
     return lista_poligonos, curvas, tiempos, tiempos_triangulos, tiempos_triangulos_mal, intervalos_triangulos_mal, repars
 
-def guardar_en_dict(objeto, diccionario, nombre=None):
+def leer_datos(ruta_fichero, interpolar = False):
+    """
+    Lee los datos de una animación de un fichero JSON (ver leer_datos_desde_json) o del formato binario .npz
+    (ver leer_escena_npz), según la extensión del fichero, y los devuelve en la misma forma.
+    """
+    if ruta_fichero.lower().endswith(".npz"):
+        datos = leer_escena_npz(ruta_fichero)
+        if interpolar:
+            interpolar_curvas(datos[1])
+        return datos
+    return leer_datos_desde_json(ruta_fichero, interpolar)
+
+def guardar_datos_npz(ruta_fichero, poligonos, curvas, tiempos, tiempos_triangulos = None,
+                      tiempos_triangulos_mal = None, intervalos_triangulos_mal = None, reparametrizaciones = None,
+                      muestras = None):
+    """
+    Guarda los datos de una animación en el formato binario .npz (ver guardar_escena_npz).
+    """
+    guardar_escena_npz(ruta_fichero, poligonos, curvas, tiempos, tiempos_triangulos, tiempos_triangulos_mal,
+                       intervalos_triangulos_mal, reparametrizaciones, muestras)
+
+class DiarioSesion(object):
+    """
+    Diario de una sesión interactiva: fichero de texto al que solo se añaden líneas, una por cada objeto guardado
+    con guardar_en_dict, con un objeto JSON {"nombre": ..., "datos": ...} en una sola línea.
+    Cada anotación se escribe en el fichero en cuanto se hace (una sola escritura al final del fichero, que
+    sobrevive a un fallo del programa), y cada lote de anotaciones se fuerza además la escritura en disco (os.fsync),
+    que es lo más costoso. Al terminar bien, compactar() escribe el fichero JSON final y borra el diario.
+    Cada sesión tiene su propio diario (ver abrir), bloqueado mientras está abierto, para que varias sesiones en el
+    mismo directorio no se pisen: el bloqueo lo libera el sistema al cerrar el fichero o al terminar el proceso,
+    aunque termine mal, así que un diario que no está bloqueado es de una sesión que se interrumpió.
+    """
+    def __init__(self, ruta_diario, lote = 8):
+        self.ruta = ruta_diario
+        self.lote = lote
+        self._pendientes = 0
+        self._fichero = open(ruta_diario, 'a+', encoding='utf-8')
+        if not _bloquear(self._fichero):
+            self._fichero.close()
+            raise Exception(f"El diario '{ruta_diario}' está en uso por otra sesión")
+        texto = self.leer_texto()
+        if texto and not texto.endswith("\n"):
+            # Línea incompleta de una sesión anterior que se interrumpió: la siguiente anotación va en otra línea
+            self._fichero.write("\n")
+
+    @classmethod
+    def abrir(cls, base, lote = 8):
+        """
+        Abre el diario de una nueva sesión, base + ".<pid>.diario", y recupera los diarios con la misma base de
+        sesiones que se interrumpieron (los que no están bloqueados por una sesión abierta): sus anotaciones se
+        copian en el diario nuevo y después se borran.
+        Devuelve el diario y el diccionario {nombre: datos} recuperado.
+        """
+        diario = cls(f"{base}.{os.getpid()}.diario", lote)
+        # El diario puede existir ya si una sesión anterior con el mismo pid se interrumpió
+        recuperado = _leer_anotaciones(diario.leer_texto())
+        for ruta in diarios_sesiones(base):
+            if ruta == diario.ruta:
+                continue
+            try:
+                fichero = open(ruta, 'r+', encoding='utf-8')
+            except FileNotFoundError:
+                # Lo ha recuperado otra sesión
+                continue
+            with fichero:
+                if not _bloquear(fichero):
+                    # Es de una sesión abierta
+                    continue
+                anotaciones = _leer_anotaciones(fichero.read())
+            for nombre, datos in anotaciones.items():
+                diario.anotar(nombre, datos)
+                recuperado[nombre] = datos
+            diario.sincronizar()
+            os.remove(ruta)
+        return diario, recuperado
+
+    def leer_texto(self):
+        """
+        Texto completo del diario.
+        """
+        self._fichero.seek(0)
+        return self._fichero.read()
+
+    def anotar(self, nombre, datos):
+        """
+        Añade al diario los datos (diccionario serializable en JSON) guardados con el nombre dado.
+        """
+        self._fichero.write(json.dumps({"nombre": nombre, "datos": datos}, ensure_ascii=False) + "\n")
+        self._fichero.flush()
+        self._pendientes += 1
+        if self._pendientes >= self.lote:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """
+        Fuerza la escritura en disco de las anotaciones hechas desde la última vez.
+        """
+        if self._pendientes > 0:
+            self._fichero.flush()
+            os.fsync(self._fichero.fileno())
+            self._pendientes = 0
+
+    def cerrar(self):
+        if not self._fichero.closed:
+            self.sincronizar()
+            self._fichero.close()
+
+    def descartar(self):
+        """
+        Cierra el diario y lo borra (al terminar una sesión en la que no hay nada que guardar).
+        """
+        self.cerrar()
+        os.remove(self.ruta)
+
+    def compactar(self, ruta_fichero, diccionario):
+        """
+        Escribe el diccionario completo en el fichero JSON ruta_fichero (ver guardar_dict_en_archivo) y, cuando
+        ya está escrito, borra el diario.
+        """
+        self.cerrar()
+        guardar_dict_en_archivo(ruta_fichero, diccionario)
+        os.remove(self.ruta)
+
+    @staticmethod
+    def recuperar(ruta_diario):
+        """
+        Devuelve el diccionario {nombre: datos} del diario ruta_diario (ver _leer_anotaciones), o None si no existe.
+        """
+        if not os.path.exists(ruta_diario):
+            return None
+        with open(ruta_diario, 'r', encoding='utf-8') as f:
+            return _leer_anotaciones(f.read())
+
+def diarios_sesiones(base):
+    """
+    Rutas de los diarios de sesiones con la base dada (base + ".<pid>.diario"), abiertas o interrumpidas.
+    """
+    prefijo, sufijo = base + ".", ".diario"
+    return sorted(ruta for ruta in glob.glob(glob.escape(base) + ".*" + sufijo)
+                  if ruta[len(prefijo):-len(sufijo)].isdigit())
+
+def _leer_anotaciones(texto):
+    """
+    Diccionario {nombre: datos} que resulta de aplicar en orden las anotaciones del texto de un diario
+    (las posteriores sustituyen a las anteriores con el mismo nombre). Las líneas incompletas (si el programa
+    se interrumpió mientras escribía una) se ignoran.
+    """
+    diccionario = dict()
+    for linea in texto.splitlines():
+        try:
+            anotacion = json.loads(linea)
+        except json.JSONDecodeError:
+            continue
+        diccionario[anotacion["nombre"]] = anotacion["datos"]
+    return diccionario
+
+def _bloquear(fichero):
+    """
+    Intenta bloquear el fichero abierto de forma exclusiva, sin esperar. Devuelve True si lo consigue.
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fichero.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # En Windows se bloquea el primer byte del fichero
+            fichero.seek(0)
+            msvcrt.locking(fichero.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def guardar_en_dict(objeto, diccionario, nombre=None, formato=FORMATO_TEXTO, diario=None):
     """
     Añade los datos actuales del objeto al diccionario para poder guardarlos posteriormente en
     un fichero json.
-    El objeto debe tener un método .to_dict()
+    El objeto debe tener un método .to_dict(formato), y formato indica cómo se guardan los polinomios
+    (ver polinomio_a_json)
+    Si se da un diario (DiarioSesion), los datos se anotan también en él inmediatamente.
     """
     if nombre is None:
         nombre = str(type(objeto)) + str(len(diccionario))
@@ -91,21 +302,26 @@ def guardar_en_dict(objeto, diccionario, nombre=None):
     if nombre in diccionario.keys():
         print(f"Ya hay una curva guardada con el nombre '{nombre}'")
         s = ""
-        while s != "y" or s != "n":
+        while s not in ("y", "n"):
             s = input("¿Sobreescribir? (y/n)").lower()
         
         if s == "n":
             print("Vuelve a llamar a la función guardar_curva especificando otro nombre")
             return
 
-    diccionario[nombre] = objeto.to_dict()
+    diccionario[nombre] = objeto.to_dict(formato)
+    if diario is not None:
+        diario.anotar(nombre, diccionario[nombre])
     return
 
 def guardar_dict_en_archivo(ruta_fichero, diccionario):
     """
     Guarda los datos del diccionario en el fichero ruta_fichero
     *** Sobreescribe el fichero si ya existe ***
+    Los datos se escriben primero en un fichero temporal, que luego sustituye al definitivo, para que
+    una interrupción no deje el fichero a medias.
     """
-    
-    with open(ruta_fichero, 'w', encoding='utf-8') as f:
-        json.dump(diccionario, f, ensure_ascii=False, indent=4)
\ No newline at end of file
+    temporal = ruta_fichero + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(diccionario, f, ensure_ascii=False, indent=4)
+    os.replace(temporal, ruta_fichero)
@@ -0,0 +1,240 @@
+import json
+from collections.abc import MutableMapping
+from Codigo.Curvas.clase_curva import CurvaInterpolacion
+from Codigo.Auxiliares.lectura_datos import completar_interpolacion
+
+TAMANO_BLOQUE = 1 << 16
+
+class RegistroCurva(object):
+    """
+    Registro ligero de una curva leída de un fichero JSON: guarda el diccionario tal como está en el fichero
+    (cadenas y números, sin Nodo, sympy Rational ni sympy Polynomial) y solo construye el objeto
+    CurvaInterpolacion la primera vez que se pide con curva().
+    """
+    __slots__ = ("nombre", "datos", "_curva")
+
+    def __init__(self, nombre, datos):
+        self.nombre = nombre
+        self.datos = datos
+        self._curva = None
+
+    @classmethod
+    def desde_curva(cls, nombre, curva):
+        """
+        Registro de una curva ya construida (sin datos leídos de un fichero).
+        """
+        registro = cls(nombre, None)
+        registro._curva = curva
+        return registro
+
+    @property
+    def nro_nodos(self):
+        if self.datos is None:
+            return len(self._curva.nodos)
+        return len(self.datos.get("nodos", []))
+
+    @property
+    def interpolada(self):
+        """
+        Indica si el fichero guarda los polinomios de la curva (si no, hay que interpolarla al construirla).
+        """
+        if self.datos is None:
+            return self._curva.xpoly is not None and self._curva.ypoly is not None
+        return self.datos.get("xpoly") is not None and self.datos.get("ypoly") is not None
+
+    @property
+    def materializada(self):
+        return self._curva is not None
+
+    def curva(self, interpolar = False):
+        """
+        Devuelve el objeto CurvaInterpolacion, construyéndolo (e interpolándolo si no tiene polinomios o si
+        interpolar es True) solo la primera vez.
+        """
+        if self._curva is None:
+            curva = CurvaInterpolacion.from_dict(self.datos)
+            completar_interpolacion([curva], interpolar)
+            self._curva = curva
+        return self._curva
+
+class CurvasPerezosas(MutableMapping):
+    """
+    Diccionario {nombre: CurvaInterpolacion} que construye cada curva la primera vez que se accede a ella.
+    Se puede usar en lugar del diccionario que devuelve leer_curvas_desde_json: también se pueden añadir,
+    sustituir y borrar curvas, y las que se añaden se guardan ya construidas.
+    Si el fichero guarda las curvas en una lista, los nombres son los índices.
+    """
+    def __init__(self, registros, interpolar = False):
+        self.registros = {registro.nombre: registro for registro in registros}
+        self.interpolar = interpolar
+
+    def __getitem__(self, nombre):
+        return self.registros[nombre].curva(self.interpolar)
+
+    def __setitem__(self, nombre, curva):
+        self.registros[nombre] = RegistroCurva.desde_curva(nombre, curva)
+
+    def __delitem__(self, nombre):
+        del self.registros[nombre]
+
+    def __iter__(self):
+        return iter(self.registros)
+
+    def __len__(self):
+        return len(self.registros)
+
+    def materializar(self, nombres = None):
+        """
+        Construye a la vez las curvas dadas (por defecto, todas), interpolando conjuntamente las que no tienen
+        polinomios (ver interpolar_curvas), y devuelve la lista de curvas.
+        """
+        nombres = list(self.registros) if nombres is None else list(nombres)
+        pendientes = [self.registros[nombre] for nombre in nombres if not self.registros[nombre].materializada]
+        curvas = [CurvaInterpolacion.from_dict(registro.datos) for registro in pendientes]
+        completar_interpolacion(curvas, self.interpolar)
+        for registro, curva in zip(pendientes, curvas):
+            registro._curva = curva
+        return [self[nombre] for nombre in nombres]
+
+    def materializadas(self):
+        """
+        Nombres de las curvas que ya se han construido.
+        """
+        return [nombre for nombre, registro in self.registros.items() if registro.materializada]
+
+def registros_curvas(curvas_datos):
+    """
+    Registros de las curvas de la entrada "curvas" de un fichero, tanto si es un diccionario como si es una lista.
+    """
+    if isinstance(curvas_datos, dict):
+        return [RegistroCurva(nombre, datos) for nombre, datos in curvas_datos.items()]
+    return [RegistroCurva(i, datos) for i, datos in enumerate(curvas_datos)]
+
+def leer_curvas_perezoso(ruta_fichero, interpolar = False):
+    """
+    Lee el JSON una sola vez y devuelve un CurvasPerezosas con las curvas de la entrada "curvas", que solo
+    se construyen (e interpolan, si hace falta) cuando se usan.
+    """
+    with open(ruta_fichero, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    return CurvasPerezosas(registros_curvas(datos["curvas"]), interpolar)
+
+def iterar_curvas_json(ruta_fichero, tamano_bloque = TAMANO_BLOQUE):
+    """
+    Recorre las curvas de la entrada "curvas" del fichero JSON sin cargarlo entero en memoria:
+    el fichero se lee por bloques y cada curva se analiza y se devuelve (como RegistroCurva) en cuanto está
+    completa, descartando después el texto ya leído. El resto de entradas del objeto principal se saltan.
+    Así la memoria usada no depende del número de curvas, sino del tamaño de la mayor de ellas.
+    """
+    with open(ruta_fichero, 'r', encoding='utf-8') as f:
+        lector = _LectorIncremental(f, tamano_bloque)
+        lector.consumir("{")
+        if lector.siguiente() == "}":
+            return
+        while True:
+            clave = lector.valor()
+            lector.consumir(":")
+            if clave == "curvas":
+                yield from _iterar_curvas(lector)
+            else:
+                lector.valor()
+            if lector.siguiente() == "}":
+                return
+            lector.consumir(",")
+
+def buscar_curvas_json(ruta_fichero, nombres, interpolar = False):
+    """
+    Devuelve un diccionario {nombre: CurvaInterpolacion} con las curvas del fichero cuyos nombres (o índices,
+    si las curvas están en una lista) se dan, recorriendo el fichero con iterar_curvas_json y dejando de leer
+    en cuanto se han encontrado todas. Solo se construyen esas curvas.
+    """
+    buscados = set(nombres)
+    registros = list()
+    for registro in iterar_curvas_json(ruta_fichero):
+        if registro.nombre in buscados:
+            registros.append(registro)
+            buscados.discard(registro.nombre)
+            if not buscados:
+                break
+    if buscados:
+        raise KeyError(f"No se han encontrado las curvas {sorted(buscados, key=str)} en {ruta_fichero}")
+    curvas = CurvasPerezosas(registros, interpolar)
+    return dict(zip(curvas.registros, curvas.materializar()))
+
+def _iterar_curvas(lector):
+    """
+    Devuelve uno a uno los registros de la lista o diccionario de curvas en el que está el lector.
+    """
+    apertura = lector.siguiente()
+    if apertura not in ("[", "{"):
+        raise ValueError("La entrada 'curvas' debe ser una lista o un diccionario")
+    cierre = "]" if apertura == "[" else "}"
+    lector.consumir(apertura)
+    i = 0
+    while lector.siguiente() != cierre:
+        if i > 0:
+            lector.consumir(",")
+        if apertura == "{":
+            nombre = lector.valor()
+            lector.consumir(":")
+        else:
+            nombre = i
+        yield RegistroCurva(nombre, lector.valor())
+        i += 1
+    lector.consumir(cierre)
+
+class _LectorIncremental(object):
+    """
+    Lee un fichero de texto JSON por bloques y analiza sus valores uno a uno con json.JSONDecoder.raw_decode,
+    guardando solo el texto que aún no se ha analizado.
+    """
+    def __init__(self, fichero, tamano_bloque):
+        self.fichero = fichero
+        self.tamano_bloque = tamano_bloque
+        self.texto = ""
+        self.posicion = 0
+        self.fin = False
+        self.decodificador = json.JSONDecoder()
+
+    def _leer(self, tamano = None):
+        bloque = self.fichero.read(tamano or self.tamano_bloque)
+        if not bloque:
+            self.fin = True
+        # Se descarta el texto ya analizado
+        self.texto = self.texto[self.posicion:] + bloque
+        self.posicion = 0
+
+    def siguiente(self):
+        """
+        Devuelve el siguiente carácter que no es un espacio, sin consumirlo (o "" al final del fichero).
+        """
+        while True:
+            while self.posicion < len(self.texto) and self.texto[self.posicion].isspace():
+                self.posicion += 1
+            if self.posicion < len(self.texto) or self.fin:
+                return self.texto[self.posicion:self.posicion + 1]
+            self._leer()
+
+    def consumir(self, caracter):
+        if self.siguiente() != caracter:
+            raise ValueError(f"JSON mal formado: se esperaba '{caracter}' y se ha encontrado " \
+                             f"'{self.siguiente()}'")
+        self.posicion += 1
+
+    def valor(self):
+        """
+        Analiza y devuelve el siguiente valor JSON completo, leyendo más bloques si hace falta.
+        """
+        self.siguiente()
+        while True:
+            try:
+                valor, final = self.decodificador.raw_decode(self.texto, self.posicion)
+                # Un número al final del texto leído podría continuar en el bloque siguiente
+                if final < len(self.texto) or self.fin:
+                    self.posicion = final
+                    return valor
+            except json.JSONDecodeError:
+                if self.fin:
+                    raise
+            # Se lee al menos tanto como lo que ya hay, para no repetir el análisis demasiadas veces
+            self._leer(max(self.tamano_bloque, len(self.texto) - self.posicion))
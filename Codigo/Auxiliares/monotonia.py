@@ -0,0 +1,216 @@
+import os
+import sys
+import glob
+import json
+import argparse
+import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+from Codigo.Auxiliares.cache_interpolacion import poly_desde_json
+from Codigo.Auxiliares.sturm import aislar_raices, secuencia_sturm, quitar_raices
+t = sp.symbols('t')
+
+TOLERANCIA_MONOTONIA = sp.Rational(1, 10**9)
+# Si no se da una velocidad mínima, se usa esta fracción de la velocidad media de la reparametrización
+FRACCION_VELOCIDAD = sp.Rational(1, 10)
+
+def es_estrictamente_monotona(repar, t0, t1):
+    """
+    Comprueba con la secuencia de Sturm de la derivada si la reparametrización repar (sympy Polynomial en 't')
+    es estrictamente monótona en [t0, t1], es decir, si su derivada no cambia de signo.
+    Devuelve 1 si es estrictamente creciente, -1 si es estrictamente decreciente y 0 si no es monótona.
+    Es la comprobación rápida: si la derivada no se anula en (t0, t1) basta con contar sus raíces,
+    sin aislarlas.
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    derivada = repar.diff(t)
+    if derivada.is_zero:
+        return 0
+    reducida = quitar_raices(derivada, [t0, t1])
+    if reducida.degree() <= 0 or secuencia_sturm(reducida).nro_raices(t0, t1) == 0:
+        return int(sp.sign(derivada.eval((t0 + t1) / 2)))
+    return sentido_monotonia(derivada, puntos_estacionarios(derivada, t0, t1)[0], t0, t1)
+
+def puntos_estacionarios(derivada, t0, t1, tolerancia = TOLERANCIA_MONOTONIA):
+    """
+    Aísla las raíces de la derivada de una reparametrización en [t0, t1] (incluidos los extremos) y las clasifica:
+    - "retroceso" si la derivada cambia de signo: el vértice se detiene y vuelve hacia atrás.
+    - "pausa" si no cambia de signo (raíz de multiplicidad par, o raíz en un extremo): el vértice se detiene
+      un instante pero sigue en el mismo sentido.
+    Devuelve la lista ordenada de tuplas ((a, b), tipo), siendo (a, b) un intervalo de longitud como mucho
+    la tolerancia con la raíz (a == b si es exacta), y la lista de signos de la derivada en los tramos entre raíces.
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    raices = aislar_raices(derivada, t0, t1, tolerancia)
+    # Signo de la derivada en cada hueco entre intervalos aislantes consecutivos, donde no se anula
+    extremos = [t0] + [extremo for intervalo in raices for extremo in intervalo] + [t1]
+    signos = [int(sp.sign(derivada.eval((extremos[k] + extremos[k+1]) / 2))) for k in range(0, len(extremos), 2)]
+
+    estacionarios = [((a, b), "retroceso" if signos[k] != signos[k+1] else "pausa")
+                     for k, (a, b) in enumerate(raices)]
+    if derivada.eval(t0) == 0:
+        estacionarios.insert(0, ((t0, t0), "pausa"))
+    if derivada.eval(t1) == 0:
+        estacionarios.append(((t1, t1), "pausa"))
+    return estacionarios, signos
+
+def sentido_monotonia(derivada, estacionarios, t0, t1):
+    """
+    Sentido de la monotonía (1, -1, o 0 si no es monótona) a partir de los puntos estacionarios
+    de puntos_estacionarios.
+    """
+    if any(tipo == "retroceso" for _, tipo in estacionarios):
+        return 0
+    return int(sp.sign(derivada.eval(_punto_sin_raices(estacionarios, t0, t1))))
+
+def _punto_sin_raices(estacionarios, t0, t1):
+    """
+    Un punto de (t0, t1) fuera de los intervalos de los puntos estacionarios.
+    """
+    extremos = [t0] + [extremo for intervalo, _ in estacionarios for extremo in intervalo] + [t1]
+    for k in range(0, len(extremos), 2):
+        if extremos[k] < extremos[k+1]:
+            return (extremos[k] + extremos[k+1]) / 2
+    return (t0 + t1) / 2
+
+def intervalos_lentos(derivada, velocidad_minima, t0, t1, tolerancia = TOLERANCIA_MONOTONIA):
+    """
+    Intervalos de tiempo dentro de [t0, t1] en los que la velocidad de la reparametrización (el valor absoluto
+    de su derivada) es menor que velocidad_minima. Sus extremos son raíces de derivada -+ velocidad_minima,
+    que se aíslan de forma exacta, y en cada tramo entre ellas se evalúa la velocidad en un punto intermedio.
+    Devuelve una lista ordenada de intervalos (a, b) (sympy Rational).
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    velocidad_minima = sp.Rational(velocidad_minima)
+    raices = list()
+    for umbral in (velocidad_minima, -velocidad_minima):
+        f = derivada - umbral
+        if not f.is_zero:
+            raices += [(a + b) / 2 for a, b in aislar_raices(f, t0, t1, tolerancia)]
+    cortes = [t0] + sorted(r for r in raices if t0 < r < t1) + [t1]
+
+    intervalos = list()
+    for a, b in zip(cortes[:-1], cortes[1:]):
+        if a < b and abs(derivada.eval((a + b) / 2)) < velocidad_minima:
+            if intervalos and intervalos[-1][1] == a:
+                intervalos[-1] = (intervalos[-1][0], b)
+            else:
+                intervalos.append((a, b))
+    return intervalos
+
+def velocidad_media(repar, t0, t1):
+    """
+    Velocidad media |r(t1) - r(t0)| / (t1 - t0) de la reparametrización en [t0, t1].
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    return abs(repar.eval(t1) - repar.eval(t0)) / (t1 - t0)
+
+def analizar_reparametrizacion(repar, t0, t1, velocidad_minima = None, tolerancia = TOLERANCIA_MONOTONIA):
+    """
+    Analiza la reparametrización repar (sympy Polynomial en 't') en [t0, t1].
+    Si no se da velocidad_minima, se usa FRACCION_VELOCIDAD por la velocidad media.
+    Devuelve una tupla (sentido, estacionarios, lentos):
+    - sentido: 1 si es estrictamente creciente, -1 si es estrictamente decreciente y 0 si no es monótona.
+    - estacionarios: la lista de puntos estacionarios de puntos_estacionarios.
+    - lentos: la lista de intervalos en los que la velocidad es menor que velocidad_minima.
+    """
+    t0, t1 = sp.Rational(t0), sp.Rational(t1)
+    derivada = repar.diff(t)
+    if derivada.is_zero:
+        # Reparametrización constante: el vértice está parado todo el tiempo
+        return 0, [((t0, t1), "pausa")], [(t0, t1)]
+    if velocidad_minima is None:
+        velocidad_minima = FRACCION_VELOCIDAD * velocidad_media(repar, t0, t1)
+
+    estacionarios, _ = puntos_estacionarios(derivada, t0, t1, tolerancia)
+    sentido = sentido_monotonia(derivada, estacionarios, t0, t1)
+    lentos = intervalos_lentos(derivada, velocidad_minima, t0, t1, tolerancia) if velocidad_minima > 0 else []
+    return sentido, estacionarios, lentos
+
+def leer_reparametrizaciones(ruta_fichero):
+    """
+    Lee del fichero de datos de una animación los tiempos y las reparametrizaciones (sympy Polynomial en 't'),
+    sin construir ni interpolar las curvas. Devuelve (t0, t1, reparametrizaciones), siendo [t0, t1]
+    el intervalo de tiempos de la animación.
+    """
+    with open(ruta_fichero, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    tiempos = [sp.Rational(ti) for ti in datos.get("tiempos", [])]
+    repars = [poly_desde_json(r) for r in datos.get("reparametrizaciones", [])]
+    if repars and len(tiempos) < 2:
+        raise Exception(f"El fichero {ruta_fichero} tiene reparametrizaciones pero no tiempos")
+    return (tiempos[0], tiempos[-1], repars) if repars else (None, None, repars)
+
+def _trabajo_monotonia(trabajo):
+    ruta, i, repar, t0, t1, velocidad_minima = trabajo
+    return ruta, i, analizar_reparametrizacion(repar, t0, t1, velocidad_minima)
+
+def analizar_ficheros(rutas, velocidad_minima = None, procesos = None):
+    """
+    Analiza las reparametrizaciones de todos los ficheros dados. Cada reparametrización es un trabajo
+    independiente, y los trabajos se reparten entre procesos (por defecto, tantos como núcleos; con
+    procesos = 1 se hace todo en el proceso actual).
+    Devuelve un diccionario {ruta: lista de resultados de analizar_reparametrizacion}; los ficheros
+    sin reparametrizaciones tienen una lista vacía.
+    """
+    trabajos = list()
+    resultados = {ruta: [] for ruta in rutas}
+    for ruta in rutas:
+        t0, t1, repars = leer_reparametrizaciones(ruta)
+        trabajos += [(ruta, i, repar, t0, t1, velocidad_minima) for i, repar in enumerate(repars)]
+
+    if procesos == 1 or len(trabajos) <= 1:
+        analisis = list(map(_trabajo_monotonia, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            analisis = list(ejecutor.map(_trabajo_monotonia, trabajos))
+
+    for ruta, _, resultado in analisis:
+        resultados[ruta].append(resultado)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Comprueba si las reparametrizaciones de los ficheros de datos de animaciones son estrictamente " \
+        "monótonas, y dónde se paran o van demasiado despacio"
+    )
+    parser.add_argument(
+        "ruta",
+        help="Fichero JSON de datos para una animación, o directorio (se comprueban todos sus ficheros .json)"
+    )
+    parser.add_argument(
+        "--velocidad_minima",
+        help="Velocidad por debajo de la cual se avisa (por defecto, una décima parte de la velocidad media " \
+        "de cada reparametrización)"
+    )
+    parser.add_argument(
+        "--procesos",
+        help="Número de procesos entre los que repartir las reparametrizaciones (por defecto, uno por núcleo)"
+    )
+    args = parser.parse_args()
+
+    rutas = sorted(glob.glob(os.path.join(args.ruta, "*.json"))) if os.path.isdir(args.ruta) else [args.ruta]
+    velocidad_minima = sp.Rational(args.velocidad_minima) if args.velocidad_minima else None
+    procesos = int(args.procesos) if args.procesos else os.cpu_count()
+
+    resultados = analizar_ficheros(rutas, velocidad_minima, procesos)
+    nro_no_monotonas = 0
+    for ruta in rutas:
+        if not resultados[ruta]:
+            continue
+        print(ruta)
+        for i, (sentido, estacionarios, lentos) in enumerate(resultados[ruta]):
+            if sentido == 0:
+                nro_no_monotonas += 1
+                print(f"  {i}: NO es monótona")
+            else:
+                print(f"  {i}: estrictamente {'creciente' if sentido > 0 else 'decreciente'}")
+            for (a, b), tipo in estacionarios:
+                print(f"     {tipo} en t = {a if a == b else float((a + b) / 2)}")
+            for a, b in lentos:
+                print(f"     velocidad baja en [{float(a)}, {float(b)}]")
+
+    if nro_no_monotonas == 0:
+        print("Resultado: CORRECTO (todas las reparametrizaciones son monótonas)")
+    else:
+        print(f"Resultado: INCORRECTO ({nro_no_monotonas} reparametrizaciones no son monótonas)")
+        sys.exit(1)
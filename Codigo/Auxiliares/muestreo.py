@@ -0,0 +1,100 @@
+import numpy as np
+
+SUBDIVISIONES_INICIALES = 8
+MAX_ITERACIONES = 30
+
+def muestreo_adaptativo(funcion, tiempos, tolerancia, subdivisiones_iniciales = SUBDIVISIONES_INICIALES,
+                        max_iteraciones = MAX_ITERACIONES):
+    """
+    Elige los tiempos en los que muestrear una curva para dibujarla como poligonal, de modo que la poligonal
+    se separe de la curva a lo sumo (aproximadamente) la tolerancia dada.
+
+    Se parte de una malla uniforme con subdivisiones_iniciales subintervalos entre cada par de tiempos
+    consecutivos y, en cada iteración, se evalúa la curva en el punto medio de todos los subintervalos
+    pendientes a la vez. Si el punto medio dista de la cuerda más que la tolerancia (la flecha de la cuerda,
+    que es del orden de la curvatura por el cuadrado de la longitud del arco), el subintervalo se divide en dos;
+    si no, se da por bueno. Así, los tramos casi rectos se dibujan con pocos puntos y las curvas cerradas
+    con muchos.
+
+    Parameters
+    ----------
+    funcion : callable
+        Función que recibe un array de tiempos y devuelve un array de puntos de forma (n_tiempos, dim).
+    tiempos : array-like
+        Tiempos (en orden creciente) que deben aparecer en el muestreo, por ejemplo los tiempos de los nodos.
+    tolerancia : float
+        Distancia máxima admitida entre la curva y la poligonal, en las unidades de los puntos.
+    subdivisiones_iniciales : int
+        Número de subintervalos iniciales entre cada par de tiempos, para no confundir con un tramo recto
+        uno en el que la curva vuelve a pasar por la cuerda justo en el punto medio.
+    max_iteraciones : int
+        Número máximo de veces que se puede dividir un subintervalo.
+
+    Returns
+    -------
+    t_vals : np.ndarray
+        Tiempos del muestreo, en orden creciente.
+    puntos : np.ndarray
+        Puntos de la curva en esos tiempos, de forma (n_tiempos, dim).
+    """
+    if tolerancia <= 0:
+        raise ValueError("La tolerancia debe ser positiva")
+    tiempos = np.asarray(tiempos, dtype=float)
+    if len(tiempos) < 2:
+        raise ValueError("Se necesitan al menos dos tiempos para muestrear la curva")
+
+    t_vals = np.concatenate([np.linspace(tiempos[i], tiempos[i+1], subdivisiones_iniciales, endpoint=False)
+                             for i in range(len(tiempos) - 1)] + [tiempos[-1:]])
+    puntos = _como_puntos(funcion(t_vals))
+    pendientes = np.ones(len(t_vals) - 1, dtype=bool)   # subintervalos [t_i, t_{i+1}] aún no aceptados
+
+    for _ in range(max_iteraciones):
+        indices = np.flatnonzero(pendientes)
+        if len(indices) == 0:
+            break
+        t_medios = (t_vals[indices] + t_vals[indices + 1]) / 2
+        puntos_medios = _como_puntos(funcion(t_medios))
+        errores = _distancia_segmento(puntos_medios, puntos[indices], puntos[indices + 1])
+        dividir = errores > tolerancia
+        indices = indices[dividir]
+        if len(indices) == 0:
+            break
+
+        # Insertar los puntos medios de los subintervalos divididos; sus dos mitades quedan pendientes
+        t_vals = np.insert(t_vals, indices + 1, t_medios[dividir])
+        puntos = np.insert(puntos, indices + 1, puntos_medios[dividir], axis=0)
+        posiciones = indices + np.arange(len(indices))
+        pendientes = np.zeros(len(t_vals) - 1, dtype=bool)
+        pendientes[posiciones] = True
+        pendientes[posiciones + 1] = True
+
+    return t_vals, puntos
+
+def muestreo_curva(curva, tiempos, tolerancia, reparametrizada = False, **kwargs):
+    """
+    Muestreo adaptativo (ver muestreo_adaptativo) de la imagen de una CurvaInterpolacion entre los tiempos dados.
+    """
+    return muestreo_adaptativo(lambda t_vals: np.column_stack(curva.evaluar_array(t_vals, reparametrizada)),
+                               tiempos, tolerancia, **kwargs)
+
+def muestreo_grafica(polinomio, tiempos, tolerancia, **kwargs):
+    """
+    Muestreo adaptativo (ver muestreo_adaptativo) de la gráfica (t, p(t)) de un PolinomioInterpolacion
+    entre los tiempos dados.
+    """
+    return muestreo_adaptativo(lambda t_vals: np.column_stack((t_vals, polinomio.evaluar_array(t_vals))),
+                               tiempos, tolerancia, **kwargs)
+
+def _como_puntos(valores):
+    valores = np.asarray(valores, dtype=float)
+    return valores.reshape(len(valores), -1)
+
+def _distancia_segmento(puntos, extremos_a, extremos_b):
+    """
+    Distancia de cada punto al segmento de extremos correspondientes (todos arrays de forma (n, dim)).
+    """
+    direccion = extremos_b - extremos_a
+    longitud2 = np.einsum('ij,ij->i', direccion, direccion)
+    proyeccion = np.einsum('ij,ij->i', puntos - extremos_a, direccion)
+    s = np.clip(np.divide(proyeccion, longitud2, out=np.zeros_like(proyeccion), where=longitud2 > 0), 0, 1)
+    return np.linalg.norm(puntos - extremos_a - s[:, None] * direccion, axis=1)
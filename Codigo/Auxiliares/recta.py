@@ -37,6 +37,13 @@ def ecuacion_recta(p1, p2):
     
     return a*x + b*y + c
 
+def coeficientes_recta(recta):
+    """
+    Devuelve los coeficientes (a, b, c) de la ecuación de la recta a*x + b*y + c (expresión de sympy,
+    como las de ecuacion_recta).
+    """
+    return recta.coeff(x), recta.coeff(y), recta.subs({x: 0, y: 0})
+
 def crear_rectas(poligono):
     """
     poligono es una tupla con dos tuplas. La primera es la primera coordenada de cada uno de sus vértices,
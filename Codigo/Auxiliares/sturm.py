@@ -1,7 +1,227 @@
+import math
+import numpy as np
 import sympy as sp
-from Codigo.Auxiliares.cambios_signo import cambios_signo
+from fractions import Fraction
+from functools import lru_cache
+from math import lcm
+from Codigo.Auxiliares.cambios_signo import cambios_signo, signo, signo_filtrado, gamma, MINIMO_FILTRO
+from Codigo.Auxiliares.hermite import a_fraccion
+from Codigo.Auxiliares.recta import coeficientes_recta
 
 x, y, t = sp.symbols('x y t')
+
+class SecuenciaSturm(object):
+    """
+    Secuencia de Sturm de un polinomio, calculada una sola vez, que permite contar las raíces del polinomio
+    en muchos intervalos.
+    Cada polinomio de la secuencia se guarda como lista de coeficientes enteros (orden decreciente de grado),
+    multiplicándolo por un número positivo para quitar los denominadores, lo que no cambia sus signos.
+    Para evaluar en un racional p/q (q > 0) se usa la forma homogénea q^d f(p/q) = sum a_i p^(d-i) q^i,
+    que solo necesita aritmética de enteros, y las potencias de q se comparten entre todos los polinomios.
+    La secuencia se calcula por defecto solo con enteros (ver sturm_primitiva); con metodo = "sympy" se usa
+    sp.sturm, que trabaja con coeficientes racionales.
+    Si filtro es True (por defecto), los signos se calculan primero en coma flotante, evaluando todos los
+    polinomios de la secuencia a la vez, con una cota rigurosa del error de redondeo, y solo se recurre
+    a la evaluación exacta cuando la cota no permite decidir el signo (ver signo_filtrado).
+    """
+    def __init__(self, f, filtro = True, metodo = "primitiva"):
+        if not isinstance(f, sp.Poly):
+            f = sp.Poly(f, t)
+        self.polinomio = f
+        if metodo == "primitiva":
+            self.secuencia = sturm_primitiva(_coeficientes_enteros(f))
+        elif metodo == "sympy":
+            self.secuencia = [_coeficientes_enteros(f_i) for f_i in sp.sturm(f)]
+        else:
+            raise ValueError(f"Método desconocido para la secuencia de Sturm: {metodo}")
+        self.grado = max(len(coefs) for coefs in self.secuencia) - 1
+        self.filtro = filtro
+        if filtro:
+            # Matriz de coeficientes en coma flotante (una fila por polinomio, rellenando con ceros a la izquierda).
+            # Cada polinomio se divide por una potencia de 2 (lo que no cambia su signo) para que sus coeficientes
+            # quepan en un float; los que quedan por debajo del menor float se redondean con error absoluto
+            # como mucho 2^-1074, que se tiene en cuenta en la cota.
+            self._coefs_float = np.zeros((len(self.secuencia), self.grado + 1))
+            for k, coefs in enumerate(self.secuencia):
+                escala = 1 << max(0, max(abs(c) for c in coefs).bit_length() - 1000)
+                self._coefs_float[k, self.grado + 1 - len(coefs):] = [c / escala for c in coefs]
+            self._coefs_abs = np.abs(self._coefs_float)
+            self._grados = np.array([len(coefs) - 1 for coefs in self.secuencia])
+            # El error de evaluar un polinomio de grado d con Horner, redondeando también los coeficientes y
+            # el punto, es como mucho gamma_(3d+1) sum |a_i| |x|^i; se deja margen para el redondeo de la suma
+            self._gammas = gamma(3 * self._grados + 6)
+            self._minimos = (self._grados + 1) * 2.0**-1073
+
+    def signos(self, punto):
+        """
+        Devuelve la lista de signos (1, 0 o -1) de los polinomios de la secuencia en el punto racional dado.
+        """
+        return self._signos(a_fraccion(punto), len(self.secuencia))
+
+    def signo_polinomio(self, punto):
+        """
+        Devuelve el signo (1, 0 o -1) del polinomio (el primero de la secuencia) en el punto racional dado.
+        """
+        return self._signos(a_fraccion(punto), 1)[0]
+
+    def _signos(self, punto, n):
+        """
+        Signos de los n primeros polinomios de la secuencia en el punto (Fraction).
+        """
+        p, q = punto.numerator, punto.denominator
+        potencias_q = []
+
+        def exacto(k):
+            if not potencias_q:
+                potencias_q.append(1)
+                for _ in range(self.grado):
+                    potencias_q.append(potencias_q[-1] * q)
+            return _evaluar_homogeneo(self.secuencia[k], p, potencias_q)
+
+        if not self.filtro:
+            return [signo(exacto(k)) for k in range(n)]
+
+        x = _punto_float(punto)
+        if x is None:
+            valores = cotas = [math.nan] * n
+        else:
+            valores = np.zeros(n)
+            sumas = np.zeros(n)
+            with np.errstate(all='ignore'):
+                for i in range(self.grado + 1):
+                    valores = valores * x + self._coefs_float[:n, i]
+                    sumas = sumas * abs(x) + self._coefs_abs[:n, i]
+                cotas = sumas * self._gammas[:n] + self._minimos[:n] * max(1.0, abs(x)) ** self._grados[:n]
+        return [signo_filtrado(valores[k], cotas[k], lambda k=k: exacto(k)) for k in range(n)]
+
+    def cambios(self, punto):
+        """
+        Número de cambios de signo de la secuencia en el punto dado.
+        """
+        return cambios_signo(self.signos(punto))
+
+    def nro_raices(self, intervalo1, intervalo2):
+        """
+        Número de raíces distintas del polinomio en el intervalo (intervalo1, intervalo2).
+        Los extremos no deben ser raíces del polinomio.
+        """
+        return self.nro_raices_intervalos([(intervalo1, intervalo2)])[0]
+
+    def nro_raices_intervalos(self, intervalos):
+        """
+        Devuelve una lista con el número de raíces distintas del polinomio en cada intervalo (a, b)
+        de la lista intervalos. Cada extremo distinto se evalúa una sola vez, aunque aparezca en varios intervalos.
+        Los extremos no deben ser raíces del polinomio.
+        """
+        cambios = dict()
+        for intervalo in intervalos:
+            for extremo in intervalo:
+                extremo = a_fraccion(extremo)
+                if extremo not in cambios:
+                    signos = self.signos(extremo)
+                    if signos[0] == 0:
+                        raise Exception("El polinomio no debe anularse en los extremos del intervalo")
+                    cambios[extremo] = cambios_signo(signos)
+        return [cambios[a_fraccion(a)] - cambios[a_fraccion(b)] for a, b in intervalos]
+
+    def nro_raices_particion(self, tiempos):
+        """
+        Devuelve una lista con el número de raíces distintas del polinomio en cada intervalo
+        (tiempos[i], tiempos[i+1]) de la lista creciente tiempos.
+        """
+        return self.nro_raices_intervalos(list(zip(tiempos[:-1], tiempos[1:])))
+
+@lru_cache(maxsize=256)
+def secuencia_sturm(f):
+    """
+    Devuelve la SecuenciaSturm del sympy Polynomial f, guardándola para no volver a calcularla
+    si se pide otra vez la del mismo polinomio.
+    """
+    return SecuenciaSturm(f)
+
+def _punto_float(punto):
+    """
+    Aproximación en coma flotante (con error relativo como mucho EPSILON) del racional punto, o None si no
+    la hay porque el punto es demasiado grande o demasiado cercano a 0.
+    """
+    try:
+        x = punto.numerator / punto.denominator
+    except OverflowError:
+        return None
+    if punto != 0 and not abs(x) > MINIMO_FILTRO:
+        return None
+    return x
+
+def _evaluar_homogeneo(coefs, p, potencias_q):
+    """
+    Calcula q^d f(p/q) para el polinomio f de coeficientes enteros coefs (grado d, orden decreciente),
+    con el esquema de Horner en la forma homogénea.
+    """
+    valor = coefs[0]
+    for i in range(1, len(coefs)):
+        valor = valor * p + coefs[i] * potencias_q[i]
+    return valor
+
+def _coeficientes_enteros(f):
+    """
+    Coeficientes enteros (orden decreciente de grado) de un múltiplo positivo del polinomio racional f.
+    """
+    coefs = [a_fraccion(c) for c in f.all_coeffs()]
+    denominador = lcm(*(c.denominator for c in coefs))
+    return [c.numerator * (denominador // c.denominator) for c in coefs]
+
+def sturm_primitiva(coefs):
+    """
+    Secuencia de Sturm del polinomio de coeficientes enteros coefs (orden decreciente de grado), calculada
+    solo con enteros: cada polinomio es la parte primitiva (sin el máximo común divisor de los coeficientes)
+    del pseudo-resto de los dos anteriores, con el signo corregido.
+    Como cada polinomio es un múltiplo positivo del de la secuencia de Sturm usual (f, f', -rem(f, f'), ...),
+    los cambios de signo son los mismos, pero los coeficientes no crecen como con los racionales.
+    Devuelve la lista de listas de coeficientes enteros.
+    """
+    secuencia = [_parte_primitiva(coefs)]
+    grado = len(coefs) - 1
+    if grado > 0:
+        secuencia.append(_parte_primitiva([c * (grado - i) for i, c in enumerate(coefs[:-1])]))
+    while len(secuencia[-1]) > 1:
+        anterior, actual = secuencia[-2], secuencia[-1]
+        # lc^(delta+1) anterior = cociente * actual + pseudo-resto, así que el resto es el pseudo-resto dividido
+        # por lc^(delta+1), y su signo cambia si esa potencia es negativa
+        resto = _pseudo_resto(anterior, actual)
+        if not resto:
+            break
+        if actual[0] < 0 and (len(anterior) - len(actual) + 1) % 2 == 1:
+            resto = [-c for c in resto]
+        secuencia.append(_parte_primitiva([-c for c in resto]))
+    return secuencia
+
+def _pseudo_resto(a, b):
+    """
+    Pseudo-resto de la división de polinomios de coeficientes enteros a entre b (orden decreciente de grado):
+    el resto de dividir lc(b)^(deg a - deg b + 1) a entre b, que tiene coeficientes enteros.
+    Devuelve la lista de coeficientes sin ceros a la izquierda (vacía si el resto es nulo).
+    """
+    resto = list(a)
+    lider = b[0]
+    exponente = len(a) - len(b) + 1
+    while resto and len(resto) >= len(b):
+        c = resto[0]
+        resto = [lider * r - c * b_i for r, b_i in zip(resto, b + [0] * (len(resto) - len(b)))][1:]
+        exponente -= 1
+        while resto and resto[0] == 0:
+            resto.pop(0)
+    factor = lider ** exponente
+    return [factor * r for r in resto]
+
+def _parte_primitiva(coefs):
+    """
+    Divide los coeficientes enteros por su máximo común divisor (positivo).
+    """
+    divisor = math.gcd(*coefs)
+    if divisor <= 1:
+        return list(coefs)
+    return [c // divisor for c in coefs]
+
 def nro_raices_sturm(f, intervalo1, intervalo2):
     """
     f es un polinomio de Sympy.
@@ -9,14 +229,170 @@ def nro_raices_sturm(f, intervalo1, intervalo2):
     usando la secuencia de Sturm.
     intervalo1 < intervalo2 y no deben ser raíces de f
     """
-    if f(intervalo1) == 0 or f(intervalo2) == 0:
-        raise Exception("El polinomio no debe anularse en los extremos del intervalo")
-    
-    sturm_seq = sp.sturm(f)
-    sturm_seq_int1 = [ f_i(intervalo1) for f_i in sturm_seq ]
-    sturm_seq_int2 = [ f_i(intervalo2) for f_i in sturm_seq ]
+    if not isinstance(f, sp.Poly):
+        f = sp.Poly(f, t)
+    return secuencia_sturm(f).nro_raices(intervalo1, intervalo2)
 
-    return  cambios_signo(sturm_seq_int1) - cambios_signo(sturm_seq_int2)
+def quitar_raices(f, puntos):
+    """
+    Divide el sympy Polynomial f por (t - punto) tantas veces como haga falta para que no se anule
+    en ninguno de los puntos dados. Las raíces de f distintas de esos puntos no cambian.
+    """
+    for punto in puntos:
+        factor = sp.Poly(t - punto, t)
+        while f.degree() > 0 and f.eval(punto) == 0:
+            f = f.exquo(factor)
+    return f
+
+# Grado a partir del cual aislar_raices usa Poly.intervals de sympy en lugar de la secuencia de Sturm
+GRADO_MAXIMO_STURM = 32
+
+def aislar_raices(f, intervalo1, intervalo2, tolerancia = None, multiplicidades = False, extremos = False):
+    """
+    Aísla las raíces reales distintas del polinomio f (sympy Polynomial en 't') en el intervalo abierto
+    (intervalo1, intervalo2) con la secuencia de Sturm, de forma exacta.
+    Devuelve una lista ordenada de intervalos (a, b) de extremos sympy Rational, disjuntos, que contienen
+    exactamente una raíz cada uno (a == b si la raíz es exactamente a). Si se da una tolerancia, los intervalos
+    se refinan hasta que su longitud es como mucho la tolerancia.
+    Las raíces en los extremos del intervalo no se tienen en cuenta, salvo si extremos es True: entonces se
+    añaden como intervalos (intervalo1, intervalo1) y (intervalo2, intervalo2).
+    Si multiplicidades es True, devuelve una lista de pares (intervalo, multiplicidad de la raíz).
+    Para grados mayores que GRADO_MAXIMO_STURM la secuencia de Sturm es demasiado costosa (sus coeficientes
+    crecen mucho) y las raíces se aíslan, también de forma exacta, con Poly.intervals de sympy.
+    """
+    if f.is_zero:
+        raise Exception("El polinomio nulo no tiene raíces aisladas")
+    a, b = a_fraccion(intervalo1), a_fraccion(intervalo2)
+    if a >= b:
+        raise ValueError("Debe ser intervalo1 < intervalo2")
+    ra, rb = sp.Rational(a.numerator, a.denominator), sp.Rational(b.numerator, b.denominator)
+    bordes = dict()
+    if extremos:
+        for punto in (ra, rb):
+            multiplicidad = _multiplicidad_en(f, punto)
+            if multiplicidad > 0:
+                bordes[punto] = ((punto, punto), multiplicidad)
+    f = quitar_raices(f, [ra, rb])
+
+    if f.degree() <= 0:
+        raices = list()
+    elif f.degree() > GRADO_MAXIMO_STURM:
+        eps = None if tolerancia is None else sp.Rational(tolerancia)
+        raices = [((sp.Rational(izq), sp.Rational(der)), multiplicidad)
+                  for (izq, der), multiplicidad in f.intervals(inf=ra, sup=rb, eps=eps)]
+    else:
+        factores = f.sqf_list()[1] if multiplicidades else None
+        raices = [(intervalo, _multiplicidad_intervalo(factores, *intervalo) if multiplicidades else None)
+                  for intervalo in _aislar_raices_sturm(f, a, b, tolerancia)]
+
+    raices = sorted(raices, key = lambda raiz: raiz[0])
+    if ra in bordes:
+        raices.insert(0, bordes[ra])
+    if rb in bordes:
+        raices.append(bordes[rb])
+    return raices if multiplicidades else [intervalo for intervalo, _ in raices]
+
+def _multiplicidad_en(f, punto):
+    """
+    Número de veces que (t - punto) divide a f.
+    """
+    multiplicidad = 0
+    factor = sp.Poly(t - punto, t)
+    while f.degree() > 0 and f.eval(punto) == 0:
+        f = f.exquo(factor)
+        multiplicidad += 1
+    return multiplicidad
+
+def _multiplicidad_intervalo(factores, izq, der):
+    """
+    Multiplicidad de la única raíz del polinomio en el intervalo aislante (izq, der), cuyos extremos no son raíces,
+    a partir de su factorización libre de cuadrados factores = [(g, m), ...]: es la m del único g que se anula
+    en la raíz, que es una raíz simple de g, así que g cambia de signo en el intervalo.
+    """
+    for g, multiplicidad in factores:
+        if izq == der:
+            if g.eval(izq) == 0:
+                return multiplicidad
+        elif sp.sign(g.eval(izq)) != sp.sign(g.eval(der)):
+            return multiplicidad
+    raise Exception("El intervalo no contiene ninguna raíz del polinomio")
+
+def _aislar_raices_sturm(f, a, b, tolerancia):
+    """
+    Bisección con la secuencia de Sturm de f, que no se anula en a ni en b (Fraction), para aislar sus raíces
+    en (a, b). Devuelve la lista de intervalos aislantes, con extremos sympy Rational.
+    """
+    secuencia = secuencia_sturm(f)
+    # Bisección con la secuencia de Sturm hasta que cada intervalo tiene una sola raíz
+    aislados = list()
+    pendientes = [(a, b, secuencia.cambios(a), secuencia.cambios(b))]
+    while pendientes:
+        izq, der, cambios_izq, cambios_der = pendientes.pop()
+        nro_raices = cambios_izq - cambios_der
+        if nro_raices == 0:
+            continue
+        if nro_raices == 1:
+            aislados.append((izq, der))
+            continue
+        medio = _punto_division(secuencia, izq, der)
+        cambios_medio = secuencia.cambios(medio)
+        pendientes.append((medio, der, cambios_medio, cambios_der))
+        pendientes.append((izq, medio, cambios_izq, cambios_medio))
+
+    if tolerancia is not None:
+        tolerancia = a_fraccion(tolerancia)
+        aislados = [_refinar_raiz(secuencia, izq, der, tolerancia) for izq, der in aislados]
+    return [(sp.Rational(izq.numerator, izq.denominator), sp.Rational(der.numerator, der.denominator))
+            for izq, der in sorted(aislados)]
+
+def _punto_division(secuencia, izq, der):
+    """
+    Punto del intervalo (izq, der), lo más cerca posible del punto medio, en el que el polinomio no se anula
+    (para poder usar la secuencia de Sturm en los dos subintervalos).
+    """
+    k = 2
+    while True:
+        for j in range(1, k):
+            medio = izq + (der - izq) * Fraction(j, k)
+            if secuencia.signo_polinomio(medio) != 0:
+                return medio
+        k += 1
+
+def _refinar_raiz(secuencia, izq, der, tolerancia):
+    """
+    Reduce el intervalo (izq, der), que contiene una sola raíz, hasta que su longitud es como mucho la tolerancia.
+    Si el polinomio cambia de signo en el intervalo basta con evaluarlo a él; si no (raíz de multiplicidad par),
+    se usa la secuencia de Sturm.
+    """
+    signo_izq = secuencia.signo_polinomio(izq)
+    cambia_signo = signo_izq != secuencia.signo_polinomio(der)
+    cambios_izq = None if cambia_signo else secuencia.cambios(izq)
+    while der - izq > tolerancia:
+        medio = (izq + der) / 2
+        signo_medio = secuencia.signo_polinomio(medio)
+        if signo_medio == 0:
+            return medio, medio
+        if cambia_signo:
+            raiz_a_la_izquierda = signo_medio != signo_izq
+        else:
+            cambios_medio = secuencia.cambios(medio)
+            raiz_a_la_izquierda = cambios_izq > cambios_medio
+        if raiz_a_la_izquierda:
+            der = medio
+        else:
+            izq = medio
+            if not cambia_signo:
+                cambios_izq = cambios_medio
+    return izq, der
+
+def polinomio_corte(curva_x, curva_y, recta):
+    """
+    Devuelve el polinomio en t (sympy Polynomial) que resulta de sustituir la curva (curva_x(t), curva_y(t))
+    en la ecuación de la recta a*x + b*y + c (expresión de sympy, como las de ecuacion_recta).
+    Sus raíces son los valores del parámetro en los que la curva corta a la recta.
+    """
+    a, b, c = coeficientes_recta(recta)
+    return curva_x * a + curva_y * b + c
 
 def nro_cortes(curva, recta, intervalo1, intervalo2):
     """
@@ -30,11 +406,85 @@ def nro_cortes(curva, recta, intervalo1, intervalo2):
     if curva_x is None or curva_y is None:
         raise Exception("Curva no interpolada")
 
-    f = sp.Poly(recta.subs({x: curva_x.as_expr(), y: curva_y.as_expr()}), t)
+    f = polinomio_corte(curva_x, curva_y, recta)
     return nro_raices_sturm(f, intervalo1, intervalo2)
 
+def cortes_curva_recta(curva, recta, intervalo1, intervalo2, tolerancia = None):
+    """
+    Devuelve los intervalos que aíslan (ver aislar_raices) los valores del parámetro en (intervalo1, intervalo2)
+    en los que la curva (objeto de la clase CurvaInterpolacion) corta a la recta, refinados hasta la tolerancia dada.
+    """
+    if curva.xpoly is None or curva.ypoly is None:
+        raise Exception("Curva no interpolada")
+    return aislar_raices(polinomio_corte(curva.xpoly, curva.ypoly, recta), intervalo1, intervalo2, tolerancia)
+
+def _bits_secuencia(secuencia):
+    """
+    Mayor número de bits de los coeficientes de una secuencia de Sturm (lista de listas de enteros).
+    """
+    return max(abs(c).bit_length() for coefs in secuencia for c in coefs)
+
+if __name__ == "__main__":
+    import os
+    import glob
+    import time
+    import argparse
+    from Codigo.Auxiliares.lectura_datos import leer_poligonos_desde_json
+    from Codigo.Auxiliares.validacion import leer_curvas_validacion, rectas_poligonos
 
+    parser = argparse.ArgumentParser(
+        description="Compara la secuencia de Sturm con enteros (sturm_primitiva) con la de sympy (sp.sturm) en los " \
+        "polinomios de corte de las curvas de las animaciones con las rectas de los lados de sus polígonos"
+    )
+    parser.add_argument(
+        "archivos",
+        nargs="*",
+        help="Ficheros JSON de datos para animaciones (por defecto, todos los de Codigo/Animaciones/DatosAnimaciones)"
+    )
+    parser.add_argument(
+        "--grado_maximo",
+        help="No usar los polinomios de grado mayor que este (sp.sturm es muy lento con grados altos)"
+    )
+    parser.add_argument(
+        "--polinomios",
+        help="Número máximo de polinomios por fichero (por defecto, todos)"
+    )
+    args = parser.parse_args()
 
+    archivos = args.archivos or sorted(glob.glob("Codigo/Animaciones/DatosAnimaciones/*.json"))
+    grado_maximo = int(args.grado_maximo) if args.grado_maximo else None
+    nro_polinomios = int(args.polinomios) if args.polinomios else None
 
+    print(f"{'fichero':>32} {'pols':>5} {'grado':>6} {'sympy (s)':>10} {'enteros (s)':>12} {'bits sympy':>11} "
+          f"{'bits enteros':>13}")
+    for archivo in archivos:
+        curvas = leer_curvas_validacion(archivo)
+        rectas = list(dict.fromkeys(recta for _, _, recta in rectas_poligonos(leer_poligonos_desde_json(archivo))))
+        polinomios = list()
+        for _, curva_x, curva_y, tiempos in curvas:
+            for recta in rectas:
+                f = polinomio_corte(curva_x, curva_y, recta)
+                if f.is_zero:
+                    continue
+                f = quitar_raices(f, tiempos)
+                if f.degree() > 0 and (grado_maximo is None or f.degree() <= grado_maximo):
+                    polinomios.append((f, tiempos))
+        polinomios = polinomios[:nro_polinomios]
+        if not polinomios:
+            continue
 
+        duraciones = dict()
+        bits = dict()
+        cortes = dict()
+        for metodo in ("sympy", "primitiva"):
+            inicio = time.perf_counter()
+            secuencias = [SecuenciaSturm(f, filtro = False, metodo = metodo) for f, _ in polinomios]
+            cortes[metodo] = [s.nro_raices_particion(tiempos) for s, (_, tiempos) in zip(secuencias, polinomios)]
+            duraciones[metodo] = time.perf_counter() - inicio
+            bits[metodo] = max(_bits_secuencia(s.secuencia) for s in secuencias)
+        if cortes["sympy"] != cortes["primitiva"]:
+            raise Exception(f"Las dos secuencias de Sturm dan resultados distintos en {archivo}")
 
+        grado_medio = sum(f.degree() for f, _ in polinomios) / len(polinomios)
+        print(f"{os.path.basename(archivo):>32} {len(polinomios):>5} {grado_medio:>6.1f} {duraciones['sympy']:>10.3f} "
+              f"{duraciones['primitiva']:>12.3f} {bits['sympy']:>11} {bits['primitiva']:>13}")
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import argparse
+import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+from Codigo.Auxiliares.lectura_datos import leer_poligonos_desde_json, completar_interpolacion
+from Codigo.Auxiliares.cache_interpolacion import poly_desde_json
+from Codigo.Auxiliares.recta import crear_rectas, coeficientes_recta
+from Codigo.Auxiliares.bernstein import puntos_control, sin_cortes_recta
+from Codigo.Auxiliares.hermite import a_fraccion
+from Codigo.Auxiliares.cambios_signo import estadisticas_filtro, reiniciar_estadisticas_filtro
+from Codigo.Auxiliares.sturm import SecuenciaSturm, polinomio_corte, quitar_raices
+from Codigo.Curvas.clase_curva import CurvaInterpolacion
+
+def leer_curvas_validacion(ruta_fichero, usar_repars = True):
+    """
+    Lee un fichero de curvas (diccionario de curvas guardado por curvas_inter) o de datos para una animación
+    (lista de curvas, con "tiempos" y, opcionalmente, "reparametrizaciones").
+    Devuelve una lista de tuplas (nombre, curva_x, curva_y, tiempos) con los polinomios de cada curva y los
+    tiempos que delimitan los intervalos en los que se comprueba. Si el fichero tiene "tiempos", se usan esos
+    (y, si usar_repars es True, los polinomios compuestos con las reparametrizaciones, como en la animación);
+    si no, los tiempos de los nodos de cada curva.
+    """
+    with open(ruta_fichero, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+
+    curvas_datos = datos.get("curvas", [])
+    if isinstance(curvas_datos, dict):
+        nombres = list(curvas_datos.keys())
+        curvas = [CurvaInterpolacion.from_dict(curvas_datos[nombre]) for nombre in nombres]
+    else:
+        nombres = [str(i) for i in range(len(curvas_datos))]
+        curvas = [CurvaInterpolacion.from_dict(c) for c in curvas_datos]
+    # Las curvas sin nodos no se pueden interpolar ni comprobar
+    nombres = [nombre for nombre, curva in zip(nombres, curvas) if len(curva.nodos) > 0]
+    curvas = [curva for curva in curvas if len(curva.nodos) > 0]
+    completar_interpolacion(curvas)
+
+    tiempos = [sp.Rational(ti) for ti in datos["tiempos"]] if "tiempos" in datos else None
+    repars = [poly_desde_json(r) for r in datos.get("reparametrizaciones", [])] if usar_repars else []
+
+    resultado = list()
+    for i, (nombre, curva) in enumerate(zip(nombres, curvas)):
+        if tiempos is not None and i < len(repars):
+            curva.set_reparametrizacion(repars[i], (tiempos[0], tiempos[-1]))
+        curva_x, curva_y = curva.polinomios_reparametrizados()
+        resultado.append((nombre, curva_x, curva_y, tiempos if tiempos is not None else list(curva.tiempos)))
+    return resultado
+
+def rectas_poligonos(poligonos):
+    """
+    Devuelve una lista de tuplas (índice del polígono, índice del lado, recta) con las rectas que contienen
+    los lados de todos los polígonos dados (en el formato de leer_poligonos_desde_json).
+    """
+    rectas = list()
+    for i, poligono in enumerate(poligonos):
+        # crear_rectas supone que el primer vértice está repetido al final
+        if poligono[0][0] != poligono[0][-1] or poligono[1][0] != poligono[1][-1]:
+            poligono = (poligono[0] + poligono[0][:1], poligono[1] + poligono[1][:1])
+        for j, recta in enumerate(crear_rectas(poligono)):
+            rectas.append((i, j, recta))
+    return rectas
+
+def cortes_intervalos(curva_x, curva_y, recta, tiempos):
+    """
+    Cuenta los cortes de la curva (curva_x(t), curva_y(t)) con la recta en cada intervalo abierto
+    (tiempos[i], tiempos[i+1]). Devuelve la lista de números de cortes, o None si la curva está contenida
+    en la recta.
+    Como las curvas pasan por los vértices de los polígonos en los tiempos de los nodos, el polinomio
+    puede anularse en los extremos de los intervalos: esas raíces se eliminan dividiendo por (t - extremo)
+    tantas veces como sea necesario, lo que no cambia el número de raíces en los intervalos abiertos.
+    """
+    f = polinomio_corte(curva_x, curva_y, recta)
+    if f.is_zero:
+        return None
+    f = quitar_raices(f, tiempos)
+    if f.degree() <= 0:
+        return [0] * (len(tiempos) - 1)
+    return SecuenciaSturm(f).nro_raices_particion(tiempos)
+
+def controles_intervalos(curva_x, curva_y, tiempos):
+    """
+    Devuelve la lista de puntos de control (ver puntos_control) de la curva en cada intervalo
+    (tiempos[i], tiempos[i+1]).
+    """
+    return [puntos_control(curva_x, curva_y, tiempos[i], tiempos[i+1]) for i in range(len(tiempos) - 1)]
+
+def _trabajo_cortes(trabajo):
+    i_curva, i_recta, curva_x, curva_y, recta, tiempos, controles = trabajo
+    # Los contadores de los signos calculados se devuelven con el resultado, porque el trabajo puede
+    # ejecutarse en otro proceso
+    reiniciar_estadisticas_filtro()
+    if controles is not None:
+        # Filtro conservador: si los polígonos de control de todos los intervalos quedan a un lado de la recta,
+        # no hay cortes y no hace falta la sustitución ni la secuencia de Sturm
+        coefs_recta = tuple(a_fraccion(c) for c in coeficientes_recta(recta))
+        if all(sin_cortes_recta(control_x, control_y, coefs_recta) for control_x, control_y in controles):
+            return i_curva, i_recta, [0] * len(controles), True, estadisticas_filtro()
+    cortes = cortes_intervalos(curva_x, curva_y, recta, tiempos)
+    return i_curva, i_recta, cortes, False, estadisticas_filtro()
+
+def validar_cortes(curvas, rectas, procesos = None, poda = True):
+    """
+    Comprueba todas las curvas con todas las rectas en todos sus intervalos.
+    curvas es una lista como la de leer_curvas_validacion y rectas una como la de rectas_poligonos.
+    Cada par (curva, recta) es un trabajo independiente (la secuencia de Sturm se calcula una vez y sirve
+    para todos los intervalos de la curva), y los trabajos se reparten entre procesos (por defecto, tantos
+    como núcleos; con procesos = 1 se hace todo en el proceso actual).
+    Las rectas repetidas (lados compartidos por varios polígonos) se comprueban una sola vez.
+    Si poda es True, antes de usar la secuencia de Sturm se intenta descartar cada par con los puntos de
+    control de Bernstein de la curva en cada intervalo (ver sin_cortes_recta).
+    Devuelve un diccionario {(índice de curva, índice de recta): lista de cortes por intervalo o None},
+    el número de pares (curva, recta distinta) descartados sin calcular la secuencia de Sturm y los contadores
+    de signos calculados con el filtro en coma flotante y recalculados de forma exacta (ver estadisticas_filtro).
+    """
+    rectas_distintas = list(dict.fromkeys(recta for _, _, recta in rectas))
+    controles = [controles_intervalos(curva_x, curva_y, tiempos) if poda else None
+                 for _, curva_x, curva_y, tiempos in curvas]
+    trabajos = [(i, j, curva_x, curva_y, recta, tiempos, controles[i])
+                for i, (_, curva_x, curva_y, tiempos) in enumerate(curvas)
+                for j, recta in enumerate(rectas_distintas)]
+
+    if procesos == 1 or len(trabajos) <= 1:
+        resultados = list(map(_trabajo_cortes, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(_trabajo_cortes, trabajos))
+    cortes_rectas = {(i, j): cortes for i, j, cortes, _, _ in resultados}
+    descartados = sum(1 for _, _, _, descartado, _ in resultados if descartado)
+    estadisticas = {clave: sum(r[4][clave] for r in resultados) for clave in ("evaluaciones", "exactas")}
+
+    indice_recta = {recta: j for j, recta in enumerate(rectas_distintas)}
+    cortes = {(i, k): cortes_rectas[(i, indice_recta[recta])]
+              for i in range(len(curvas)) for k, (_, _, recta) in enumerate(rectas)}
+    return cortes, descartados, estadisticas
+
+def imprimir_tabla(curvas, rectas, cortes, solo_cortes = False):
+    """
+    Escribe la tabla de cortes por intervalo de cada curva con cada lado y devuelve el número total de cortes.
+    Si solo_cortes es True, solo se escriben las filas con algún corte.
+    """
+    print(f"{'curva':>8} {'polígono':>8} {'lado':>5} {'total':>6}  cortes por intervalo")
+    total = 0
+    for i, (nombre, _, _, tiempos) in enumerate(curvas):
+        for k, (i_poligono, i_lado, _) in enumerate(rectas):
+            cortes_ik = cortes[(i, k)]
+            if cortes_ik is None:
+                # La curva está contenida en la recta del lado: no lo atraviesa
+                if not solo_cortes:
+                    print(f"{nombre:>8} {i_poligono:>8} {i_lado:>5} {'-':>6}  curva contenida en la recta")
+                continue
+            suma = sum(cortes_ik)
+            total += suma
+            if suma > 0 or not solo_cortes:
+                print(f"{nombre:>8} {i_poligono:>8} {i_lado:>5} {suma:>6}  {' '.join(str(c) for c in cortes_ik)}")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Comprueba si las curvas cortan a las rectas de los lados de los polígonos en los intervalos " \
+        "entre los tiempos dados"
+    )
+    parser.add_argument(
+        "archivo_datos",
+        help="Ruta a un fichero JSON con curvas (guardadas por curvas_inter) o con los datos de una animación"
+    )
+    parser.add_argument(
+        "--archivo_poligonos",
+        help="Ruta a un fichero JSON con los polígonos. Por defecto, se usan los del fichero de datos"
+    )
+    parser.add_argument(
+        "--reparametrizaciones",
+        help="Indica si se deben usar las reparametrizaciones del fichero de datos ('True' o 'False', por defecto True)"
+    )
+    parser.add_argument(
+        "--procesos",
+        help="Número de procesos entre los que repartir las comprobaciones (por defecto, uno por núcleo)"
+    )
+    parser.add_argument(
+        "--solo_cortes",
+        action="store_true",
+        help="Mostrar solo las filas de la tabla con algún corte"
+    )
+    parser.add_argument(
+        "--sin_poda",
+        action="store_true",
+        help="No descartar pares (curva, lado) con los puntos de control de Bernstein: usar siempre Sturm"
+    )
+    args = parser.parse_args()
+
+    usar_repars = not (args.reparametrizaciones and args.reparametrizaciones.lower() in ('false', 'f', '0'))
+    procesos = int(args.procesos) if args.procesos else os.cpu_count()
+
+    curvas = leer_curvas_validacion(args.archivo_datos, usar_repars)
+    poligonos = leer_poligonos_desde_json(args.archivo_poligonos if args.archivo_poligonos else args.archivo_datos)
+    rectas = rectas_poligonos(poligonos)
+    print(f"{len(curvas)} curvas y {len(rectas)} lados leídos")
+
+    cortes, descartados, estadisticas = validar_cortes(curvas, rectas, procesos, poda = not args.sin_poda)
+    total = imprimir_tabla(curvas, rectas, cortes, args.solo_cortes)
+    nro_pares = len(curvas) * len(set(recta for _, _, recta in rectas))
+    print(f"Pares (curva, recta) descartados con los puntos de control, sin secuencia de Sturm: "
+          f"{descartados} de {nro_pares}")
+    print(f"Signos calculados en coma flotante: {estadisticas['evaluaciones']}, "
+          f"de ellos recalculados de forma exacta: {estadisticas['exactas']}")
+
+    if total == 0:
+        print("Resultado: CORRECTO (ninguna curva corta a los lados en el interior de los intervalos)")
+    else:
+        print(f"Resultado: INCORRECTO ({total} cortes)")
+        sys.exit(1)
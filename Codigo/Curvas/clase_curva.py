@@ -1,9 +1,15 @@
 import numpy as np
 import sympy as sp
+import math
 import bisect
 from ast import literal_eval
 from Codigo.Curvas.nodos import Nodo, punto_a_Rational
-from Codigo.Auxiliares.hermite import curva_hermite_nodos
+from Codigo.Auxiliares.hermite import curva_hermite_nodos, curvas_hermite_lote, poly_desde_floats, TOLERANCIA_FLOAT, \
+    EstadoHermite, condiciones_nuevas
+from Codigo.Auxiliares.cache_interpolacion import cache_por_defecto, clave_condiciones, poly_desde_json
+from Codigo.Auxiliares.formato_polinomios import polinomio_a_json, FORMATO_TEXTO
+from Codigo.Auxiliares.evaluacion import coeficientes_float, coeficientes_intervalo, evaluar_intervalo, horner
+from Codigo.Auxiliares.muestreo import muestreo_curva
 t = sp.symbols('t')
 
 class CurvaInterpolacion(object):
@@ -13,13 +19,51 @@ class CurvaInterpolacion(object):
         self.tiempos = [n.get_tiempo() for n in self.nodos]
         self.xpoly = xpoly
         self.ypoly = ypoly
+        self.error_estimado = None
+        self.reparametrizacion = None
+        self.intervalo_reparametrizacion = None
+        # Forma de Newton de la última interpolación exacta y condiciones que la definen,
+        # para poder actualizarla en O(N) cuando solo se añaden nodos o derivadas
+        self._estado = None
+        self._condiciones_estado = dict()
+
+    @property
+    def xpoly(self):
+        # Si la curva se ha interpolado en forma de Newton, el polinomio se desarrolla solo cuando se pide
+        if self._xpoly is None and self._xnewton is not None:
+            self._xpoly = self._xnewton.a_poly()
+        return self._xpoly
+
+    @xpoly.setter
+    def xpoly(self, poly):
+        self._xpoly = poly
+        self._xnewton = None
+        self._invalidar_derivados()
+
+    @property
+    def ypoly(self):
+        if self._ypoly is None and self._ynewton is not None:
+            self._ypoly = self._ynewton.a_poly()
+        return self._ypoly
+
+    @ypoly.setter
+    def ypoly(self, poly):
+        self._ypoly = poly
+        self._ynewton = None
+        self._invalidar_derivados()
+
+    def _invalidar_derivados(self):
+        # Datos calculados a partir de xpoly e ypoly, que dejan de ser válidos cuando estos cambian:
+        # coeficientes en coma flotante {(reparametrizada, intervalo): (coefs_x, coefs_y)} y polinomios compuestos
+        self._coefs_float = dict()
+        self._compuestas = None
 
     @classmethod
     def from_dict(cls, datos):
         """
         Construye la curva a partir de un diccionario datos, que debe incluir una lista de nodos
         dados en forma de diccionario. También incluye los polinomios xpoly, ypoly, que podrían ser
-        None.
+        None, como expresiones o como listas de coeficientes (ver polinomio_a_json).
         """
 
         nodos_dict_list = datos["nodos"]
@@ -31,21 +75,22 @@ class CurvaInterpolacion(object):
         if xpoly is None or ypoly is None:
            xpoly = ypoly = None
         else:
-            xpoly = sp.Poly(xpoly, t)
-            ypoly = sp.Poly(ypoly, t)
+            xpoly = poly_desde_json(xpoly)
+            ypoly = poly_desde_json(ypoly)
 
         return cls(nodos, xpoly, ypoly)
     
-    def to_dict(self):
+    def to_dict(self, formato = FORMATO_TEXTO):
         """
-        Genera un diccionario con los datos de la curva
+        Genera un diccionario con los datos de la curva. Los polinomios se guardan en el formato dado:
+        "texto" (expresión) o "coeficientes" (lista de pares [numerador, denominador], ver polinomio_a_json).
         """
         nodos_dict_list = [n.to_dict() for n in self.nodos]
         if self.xpoly is None or self.ypoly is None:
             xpoly = ypoly = None
         else:
-            xpoly = str(self.xpoly.as_expr())
-            ypoly = str(self.ypoly.as_expr())
+            xpoly = polinomio_a_json(self.xpoly, formato)
+            ypoly = polinomio_a_json(self.ypoly, formato)
         return {
             "nodos": nodos_dict_list,
             "xpoly": xpoly,
@@ -58,16 +103,171 @@ class CurvaInterpolacion(object):
     def actualizar_tiempos(self):
         self.tiempos = [n.get_tiempo() for n in self.nodos]
 
-    def interpolar(self):
-        self.xpoly, self.ypoly = curva_hermite_nodos(self.nodos)
+    def interpolar(self, modo = "fraccion", newton = False):
+        """
+        Calcula los polinomios de Hermite de la curva. Con modo = "float" los coeficientes se calculan
+        en coma flotante y se guarda en self.error_estimado una estimación del error relativo; si no es finita
+        o supera TOLERANCIA_FLOAT, se avisa y se interpola en modo exacto.
+        En el modo por defecto ("fraccion") se guarda la forma de Newton, de modo que si desde la última
+        llamada solo se han añadido nodos o derivadas, la interpolación se actualiza en O(N) por condición.
+        Con newton = True (solo en modo "fraccion") los polinomios se guardan en forma de Newton y se evalúan
+        sin desarrollarlos; xpoly e ypoly se desarrollan la primera vez que se consultan.
+        """
+        self.error_estimado = None
+        if modo == "fraccion":
+            self._interpolar_incremental(newton)
+            return
+        if newton:
+            raise ValueError("La forma de Newton solo está disponible en modo 'fraccion'")
+
+        self._estado = None
+        if modo == "float":
+            coefs_x, coefs_y, error_estimado = curva_hermite_nodos(self.nodos, modo)
+            if not math.isfinite(error_estimado) or error_estimado > TOLERANCIA_FLOAT:
+                print(f"Aviso: error relativo estimado {error_estimado:.2e} en coma flotante. Se interpola en modo exacto.")
+                self._interpolar_incremental()
+                return
+            self.error_estimado = error_estimado
+            self.xpoly, self.ypoly = poly_desde_floats(coefs_x), poly_desde_floats(coefs_y)
+            self._coefs_float[(False, None)] = (coefs_x, coefs_y)
+        else:
+            self.xpoly, self.ypoly = curva_hermite_nodos(self.nodos, modo)
+
+    def _interpolar_incremental(self, newton = False):
+        condiciones = self.condiciones()
+        nuevas = None
+        if self._estado is not None:
+            nuevas = condiciones_nuevas(self._condiciones_estado, condiciones)
+
+        cache = None if newton else cache_por_defecto()
+        if cache is not None:
+            clave = clave_condiciones("curva", condiciones)
+            if nuevas is None:
+                # No se puede actualizar la forma de Newton: antes de reconstruirla se consulta la caché
+                polinomios = cache.obtener(clave)
+                if polinomios is not None:
+                    self._estado = None
+                    self._condiciones_estado = dict()
+                    self.xpoly, self.ypoly = polinomios
+                    return
+
+        if nuevas is None:
+            # Se ha quitado o modificado alguna condición: se reconstruye la forma de Newton
+            self._estado = EstadoHermite(columnas = 2, monomios = not newton)
+            nuevas = condiciones_nuevas(dict(), condiciones)
+
+        self._estado.anadir_condiciones(nuevas)
+        self._condiciones_estado = condiciones
+        if newton:
+            self._xpoly = self._ypoly = None
+            self._invalidar_derivados()
+            self._xnewton, self._ynewton = self._estado.polinomios_newton()
+        else:
+            self.xpoly, self.ypoly = self._estado.polinomios()
+            if cache is not None:
+                cache.guardar(clave, [self.xpoly, self.ypoly])
+
+    def condiciones(self):
+        """
+        Devuelve las condiciones de interpolación de la curva como un diccionario
+        {tiempo: [punto, primera derivada, segunda derivada, ...]}
+        """
+        return {n.get_tiempo(): [tuple(n.get_punto())] + [tuple(der) for der in n.get_derivadas()]
+                for n in self.nodos}
     
     def evaluar(self, t0):
+        """
+        Evalúa la curva en t0. Si t0 es un array de NumPy, se evalúa en coma flotante con evaluar_array.
+        """
+        if isinstance(t0, np.ndarray):
+            return self.evaluar_array(t0)
+        if self._xnewton is not None:
+            return (self._xnewton(t0), self._ynewton(t0))
         return (self.xpoly(t0), self.ypoly(t0))
+
+    def set_reparametrizacion(self, reparametrizacion, intervalo = None):
+        """
+        Asigna a la curva una reparametrización (sympy Polynomial en 't', o None para quitarla).
+        Las composiciones xpoly(r(t)) e ypoly(r(t)) se calculan una sola vez, de forma exacta, la primera vez
+        que se necesitan. Con una reparametrización hay que dar el intervalo (a, b) de tiempos en que se va a
+        usar la curva: los coeficientes en coma flotante de las composiciones se calculan en la base de Chebyshev
+        de ese intervalo (ver coeficientes_intervalo), porque en la base de monomios sus grados (decenas o
+        cientos) hacen que la evaluación no tenga ninguna cifra correcta.
+        """
+        if reparametrizacion is not None and intervalo is None:
+            raise ValueError("Hay que indicar el intervalo de tiempos en que se usa la reparametrización")
+        self.reparametrizacion = reparametrizacion
+        self.intervalo_reparametrizacion = intervalo
+        self._invalidar_derivados()
+
+    def polinomios_reparametrizados(self):
+        """
+        Devuelve los polinomios compuestos (xpoly(r(t)), ypoly(r(t))), siendo r la reparametrización de la curva.
+        Si la curva no tiene reparametrización, devuelve (xpoly, ypoly).
+        """
+        if self.xpoly is None or self.ypoly is None:
+            raise Exception("Curva no interpolada")
+        if self.reparametrizacion is None:
+            return self.xpoly, self.ypoly
+        if self._compuestas is None:
+            self._compuestas = (self.xpoly.compose(self.reparametrizacion), 
+                                self.ypoly.compose(self.reparametrizacion))
+        return self._compuestas
+
+    def coeficientes_float(self, reparametrizada = False, intervalo = None):
+        """
+        Devuelve los coeficientes de xpoly e ypoly como arrays de floats (orden decreciente de grado).
+        Si reparametrizada es True, los de los polinomios compuestos con la reparametrización.
+        Si se da un intervalo (a, b), se devuelven en su lugar los coeficientes de Chebyshev en la variable
+        reescalada de ese intervalo (ver coeficientes_intervalo). Los polinomios compuestos siempre se dan en
+        la base de Chebyshev, por defecto la del intervalo de set_reparametrizacion.
+        Se calculan una vez y se guardan hasta que cambian los polinomios (por ejemplo, al volver a interpolar).
+        """
+        intervalo = self._intervalo_evaluacion(reparametrizada, intervalo)
+        clave = (reparametrizada and self.reparametrizacion is not None, intervalo)
+        if clave not in self._coefs_float:
+            if reparametrizada:
+                polinomios = self.polinomios_reparametrizados()
+            else:
+                polinomios = (self.xpoly, self.ypoly)
+                if None in polinomios:
+                    raise Exception("Curva no interpolada")
+            if intervalo is None:
+                self._coefs_float[clave] = tuple(coeficientes_float(p) for p in polinomios)
+            else:
+                self._coefs_float[clave] = tuple(coeficientes_intervalo(p, *intervalo) for p in polinomios)
+        return self._coefs_float[clave]
+
+    def _intervalo_evaluacion(self, reparametrizada, intervalo):
+        # Intervalo de la base de Chebyshev con que se evalúa la curva (None para la base de monomios)
+        if not reparametrizada or self.reparametrizacion is None or intervalo is not None:
+            return intervalo
+        if self.intervalo_reparametrizacion is None:
+            raise ValueError("La reparametrización no tiene intervalo de tiempos (ver set_reparametrizacion)")
+        return self.intervalo_reparametrizacion
+
+    def evaluar_array(self, t_vals, reparametrizada = False, intervalo = None):
+        """
+        Evalúa la curva en coma flotante en todos los valores del array t_vals a la vez.
+        Si reparametrizada es True, se evalúan las composiciones con la reparametrización de la curva.
+        Devuelve dos arrays de NumPy con las coordenadas x e y.
+        """
+        if self._xnewton is not None and not (reparametrizada and self.reparametrizacion is not None):
+            return self._xnewton.evaluar_float(t_vals), self._ynewton.evaluar_float(t_vals)
+        intervalo = self._intervalo_evaluacion(reparametrizada, intervalo)
+        coefs_x, coefs_y = self.coeficientes_float(reparametrizada, intervalo)
+        if intervalo is not None:
+            return evaluar_intervalo(coefs_x, t_vals, *intervalo), evaluar_intervalo(coefs_y, t_vals, *intervalo)
+        return horner(coefs_x, t_vals), horner(coefs_y, t_vals)
     
-    def graficar(self, ax, color_curva = 'blue', color_puntos = 'black', samples = 400, t0=None, t1=None, puntos = True):
+    def graficar(self, ax, color_curva = 'blue', color_puntos = 'black', samples = 400, t0=None, t1=None, puntos = True,
+                 tolerancia = None):
         """
         Dibuja la imagen de la curva en el intervalo dado por los nodos y, si se han proporcionado, 
         los tiempos t0 y t1.
+        Si se da una tolerancia, en lugar de tomar samples puntos equiespaciados en cada intervalo se usa un
+        muestreo adaptativo (ver muestreo_adaptativo) en el que la poligonal dibujada dista de la curva
+        a lo sumo la tolerancia (en unidades del dibujo).
         Devuelve los objetos correspondientes al dibujo de la curva y de los nodos en el gráfico
         (curva_graf y puntos_graf).
         """
@@ -81,13 +281,13 @@ class CurvaInterpolacion(object):
             tiempos_grafica.append(t1)
         
         # Dibujar la curva en los intervalos dados
-        x_vals = []
-        y_vals = []
-        for i in range(len(tiempos_grafica) - 1):
-            t_vals = np.linspace(tiempos_grafica[i], tiempos_grafica[i+1], samples)
-
-            x_vals.extend(np.array([self.xpoly(tj) for tj in t_vals]))
-            y_vals.extend(np.array([self.ypoly(tj) for tj in t_vals]))
+        if tolerancia is None:
+            t_vals = np.concatenate([np.linspace(float(tiempos_grafica[i]), float(tiempos_grafica[i+1]), samples)
+                                     for i in range(len(tiempos_grafica) - 1)])
+            x_vals, y_vals = self.evaluar_array(t_vals)
+        else:
+            _, vertices = muestreo_curva(self, [float(ti) for ti in tiempos_grafica], tolerancia)
+            x_vals, y_vals = vertices[:, 0], vertices[:, 1]
 
         curva_graf, = ax.plot(x_vals, y_vals, color = color_curva)
 
@@ -329,4 +529,28 @@ class CurvaInterpolacion(object):
     
     def __repr__(self):
         return str(self)
-    
\ No newline at end of file
+
+def interpolar_curvas(curvas, modo = "fraccion"):
+    """
+    Interpola todas las curvas de la lista a la vez (ver curvas_hermite_lote): las curvas con los mismos
+    tiempos y número de derivadas comparten la tabla de diferencias divididas. En modo "float", las curvas
+    cuyo error estimado no es finito o supera TOLERANCIA_FLOAT se vuelven a interpolar en modo exacto.
+    """
+    resultados = curvas_hermite_lote([curva.nodos for curva in curvas], modo)
+    inexactas = list()
+    for curva, resultado in zip(curvas, resultados):
+        curva._estado = None
+        if modo == "float":
+            coefs_x, coefs_y, curva.error_estimado = resultado
+            if not math.isfinite(curva.error_estimado) or curva.error_estimado > TOLERANCIA_FLOAT:
+                inexactas.append(curva)
+                continue
+            curva.xpoly, curva.ypoly = poly_desde_floats(coefs_x), poly_desde_floats(coefs_y)
+        else:
+            curva.xpoly, curva.ypoly = resultado
+            curva.error_estimado = None
+
+    if inexactas:
+        print(f"Aviso: {len(inexactas)} curvas superan el error relativo estimado admisible en coma flotante. " \
+              "Se interpolan en modo exacto.")
+        interpolar_curvas(inexactas, "fraccion")
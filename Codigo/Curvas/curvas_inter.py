@@ -2,6 +2,7 @@ import os
 import argparse
 import matplotlib.pyplot as plt
 from Codigo.Auxiliares.lectura_datos import *
+from Codigo.Auxiliares.lectura_perezosa import leer_curvas_perezoso
 from Codigo.Auxiliares.sturm import *
 from Codigo.Auxiliares.cambios_signo import signo
 from Codigo.Auxiliares.graficas import dibujar_poligonos
@@ -13,9 +14,9 @@ if __name__ == "__main__":
     sobreescribir = False
     
     def guardar_curva(curva, nombre = None):
-        guardar_en_dict(curva, curvas_guardar_dict, nombre)
-        print("Datos actuales de la curva guardados en el diccionario 'curvas_guardar_dict'."  \
-              "El fichero .json se escribirá al cerrar el programa con exit(), quit() o Ctrl + D.")
+        guardar_en_dict(curva, curvas_guardar_dict, nombre, diario = diario)
+        print("Datos actuales de la curva guardados en el diccionario 'curvas_guardar_dict' y en el diario " \
+              "de la sesión. El fichero .json se escribirá al cerrar el programa con exit(), quit() o Ctrl + D.")
 
     # 1. Parsear argumento de entrada (ruta al JSON)
     parser = argparse.ArgumentParser(
@@ -37,6 +38,15 @@ if __name__ == "__main__":
     lista_poligonos = leer_poligonos_desde_json(ruta_poligono)
     print("Polígonos leídos")
 
+    # Diario de la sesión: las curvas guardadas se anotan en él en cuanto se guardan, y si una sesión anterior
+    # con los mismos polígonos se interrumpió sin escribir el fichero .json, se recuperan sus curvas
+    nombre_sin_ext = os.path.splitext(os.path.basename(ruta_poligono))[0]
+    diario, recuperadas = DiarioSesion.abrir(f"./curvas_{nombre_sin_ext}")
+    if recuperadas:
+        curvas_guardar_dict.update(recuperadas)
+        print(f"Recuperadas {len(recuperadas)} curvas de sesiones interrumpidas, " \
+              "guardadas en el diccionario 'curvas_guardar_dict'")
+
     # Determinamos los límites de la figura
     xmin = float(min(vx for poly in lista_poligonos for vx in poly[0]))
     xmax = float(max(vx for poly in lista_poligonos for vx in poly[0]))
@@ -45,7 +55,8 @@ if __name__ == "__main__":
     
     if args.archivo_curvas:
         ruta_curvas = args.archivo_curvas
-        curvas_dict = leer_curvas_desde_json(ruta_curvas)
+        # Cada curva se construye (y se interpola, si hace falta) la primera vez que se usa
+        curvas_dict = leer_curvas_perezoso(ruta_curvas)
         print("Curvas leídas, guardadas en el diccionario 'curvas_dict'")
 
     def borrar(ax):
@@ -74,8 +85,6 @@ if __name__ == "__main__":
         # Si hay curvas en el diccionario dedicado a guardarlas, se escriben los datos en un fichero
         if len(curvas_guardar_dict) > 0:
             if ruta_archivo_curvas == "":
-                nombre_poligono = os.path.basename(ruta_poligono)
-                nombre_sin_ext = os.path.splitext(nombre_poligono)[0]
                 base = "./curvas_" + nombre_sin_ext
             else:
                 base = ruta_archivo_curvas
@@ -90,5 +99,8 @@ if __name__ == "__main__":
                     ruta_archivo_curvas = f"{base[:-5]}_{i}.json"
                     i += 1
             
-            guardar_dict_en_archivo(ruta_archivo_curvas, curvas_guardar_dict)
+            # Se escribe el fichero .json completo y, una vez escrito, se borra el diario
+            diario.compactar(ruta_archivo_curvas, curvas_guardar_dict)
             print(f"Curvas guardadas en el fichero '{ruta_archivo_curvas}'")
+        else:
+            diario.descartar()
@@ -1,8 +1,14 @@
 import numpy as np
 import sympy as sp
+import math
 import bisect
 from ast import literal_eval
-from Codigo.Auxiliares.hermite import hermite_nodos
+from Codigo.Auxiliares.hermite import hermite_nodos, poly_desde_floats, TOLERANCIA_FLOAT, \
+    EstadoHermite, condiciones_nuevas
+from Codigo.Auxiliares.cache_interpolacion import cache_por_defecto, clave_condiciones, poly_desde_json
+from Codigo.Auxiliares.formato_polinomios import polinomio_a_json, FORMATO_TEXTO
+from Codigo.Auxiliares.evaluacion import coeficientes_float, horner
+from Codigo.Auxiliares.muestreo import muestreo_grafica
 t = sp.symbols('t')
 
 class Nodo1d(object):
@@ -63,12 +69,31 @@ class PolinomioInterpolacion(object):
         self.nodos.sort(key = lambda n: n.get_tiempo())
         self.tiempos = [ n.get_tiempo() for n in self.nodos ]
         self.poly = polinomio
+        self.error_estimado = None
+        # Forma de Newton de la última interpolación exacta y condiciones que la definen,
+        # para poder actualizarla en O(N) cuando solo se añaden nodos o derivadas
+        self._estado = None
+        self._condiciones_estado = dict()
+
+    @property
+    def poly(self):
+        # Si se ha interpolado en forma de Newton, el polinomio se desarrolla solo cuando se pide
+        if self._poly is None and self._newton is not None:
+            self._poly = self._newton.a_poly()
+        return self._poly
+
+    @poly.setter
+    def poly(self, polinomio):
+        self._poly = polinomio
+        self._newton = None
+        self._coefs_float = None
 
     @classmethod
     def from_dict(cls, datos):
         """
         Construye el polinomio a partir de un diccionario datos, que debe incluir una lista de nodos
-        dados en forma de diccionario. También incluye la expresión del polinomio, que podría ser None.
+        dados en forma de diccionario. También incluye el polinomio, que podría ser None, como expresión
+        o como lista de coeficientes (ver polinomio_a_json).
         """
 
         nodos_dict_list = datos["nodos"]
@@ -79,37 +104,139 @@ class PolinomioInterpolacion(object):
         if poly is None:
            pass
         else:
-            poly = sp.Poly(poly, t)
+            poly = poly_desde_json(poly)
 
         return cls(nodos, poly)
     
-    def to_dict(self):
+    def to_dict(self, formato = FORMATO_TEXTO):
         """
-        Devuelve un diccionario con los datos del polinomio, incluyendo una lista de nodos
+        Devuelve un diccionario con los datos del polinomio, incluyendo una lista de nodos.
+        El polinomio se guarda en el formato dado: "texto" (expresión) o "coeficientes" (lista de pares
+        [numerador, denominador], ver polinomio_a_json).
         """
         
         nodos_dict_list = [ n.to_dict() for n in self.nodos ]
         if self.poly is None:
             poly = None
         else:
-            poly = str(self.poly.as_expr())
+            poly = polinomio_a_json(self.poly, formato)
         return {
             "nodos": nodos_dict_list,
             "poly": poly
         }
 
-    def interpolar(self):
-        self.poly = hermite_nodos(self.nodos)
+    def interpolar(self, modo = "fraccion", newton = False):
+        """
+        Calcula el polinomio de Hermite. Con modo = "float" los coeficientes se calculan
+        en coma flotante y se guarda en self.error_estimado una estimación del error relativo; si no es finita
+        o supera TOLERANCIA_FLOAT, se avisa y se interpola en modo exacto.
+        En el modo por defecto ("fraccion") se guarda la forma de Newton, de modo que si desde la última
+        llamada solo se han añadido nodos o derivadas, la interpolación se actualiza en O(N) por condición.
+        Con newton = True (solo en modo "fraccion") el polinomio se guarda en forma de Newton y se evalúa
+        sin desarrollarlo; self.poly se desarrolla la primera vez que se consulta.
+        """
+        self.error_estimado = None
+        if modo == "fraccion":
+            self._interpolar_incremental(newton)
+            return
+        if newton:
+            raise ValueError("La forma de Newton solo está disponible en modo 'fraccion'")
+
+        self._estado = None
+        if modo == "float":
+            coefs, error_estimado = hermite_nodos(self.nodos, modo)
+            if not math.isfinite(error_estimado) or error_estimado > TOLERANCIA_FLOAT:
+                print(f"Aviso: error relativo estimado {error_estimado:.2e} en coma flotante. Se interpola en modo exacto.")
+                self._interpolar_incremental()
+                return
+            self.error_estimado = error_estimado
+            self.poly = poly_desde_floats(coefs)
+            self._coefs_float = coefs
+        else:
+            self.poly = hermite_nodos(self.nodos, modo)
+
+    def _interpolar_incremental(self, newton = False):
+        condiciones = self.condiciones()
+        nuevas = None
+        if self._estado is not None:
+            nuevas = condiciones_nuevas(self._condiciones_estado, condiciones)
+
+        cache = None if newton else cache_por_defecto()
+        if cache is not None:
+            clave = clave_condiciones("polinomio", condiciones)
+            if nuevas is None:
+                # No se puede actualizar la forma de Newton: antes de reconstruirla se consulta la caché
+                polinomios = cache.obtener(clave)
+                if polinomios is not None:
+                    self._estado = None
+                    self._condiciones_estado = dict()
+                    self.poly, = polinomios
+                    return
+
+        if nuevas is None:
+            # Se ha quitado o modificado alguna condición: se reconstruye la forma de Newton
+            self._estado = EstadoHermite(columnas = 1, monomios = not newton)
+            nuevas = condiciones_nuevas(dict(), condiciones)
+
+        self._estado.anadir_condiciones(nuevas)
+        self._condiciones_estado = condiciones
+        if newton:
+            self._poly = None
+            self._coefs_float = None
+            self._newton, = self._estado.polinomios_newton()
+        else:
+            self.poly, = self._estado.polinomios()
+            if cache is not None:
+                cache.guardar(clave, [self.poly])
+
+    def condiciones(self):
+        """
+        Devuelve las condiciones de interpolación como un diccionario
+        {tiempo: [(valor,), (primera derivada,), (segunda derivada,), ...]}
+        """
+        return {n.get_tiempo(): [(n.get_valor(),)] + [(der,) for der in n.get_derivadas()] for n in self.nodos}
     
     def evaluar(self, t0):
+        """
+        Evalúa el polinomio en t0. Si t0 es un array de NumPy, se evalúa en coma flotante con evaluar_array.
+        """
+        if isinstance(t0, np.ndarray):
+            return self.evaluar_array(t0)
+        if self._newton is not None:
+            return self._newton(t0)
         if self.poly is None:
             raise Exception("No se puede evaluar. No hay polinomio interpolado.")
         return self.poly(t0)
+
+    def coeficientes_float(self):
+        """
+        Devuelve los coeficientes del polinomio como array de floats (orden decreciente de grado).
+        Se calculan una vez y se guardan hasta que cambia el polinomio (por ejemplo, al volver a interpolar).
+        """
+        if self._coefs_float is None:
+            if self.poly is None:
+                raise Exception("No se puede evaluar. No hay polinomio interpolado.")
+            self._coefs_float = coeficientes_float(self.poly)
+        return self._coefs_float
+
+    def evaluar_array(self, t_vals):
+        """
+        Evalúa el polinomio en coma flotante en todos los valores del array t_vals a la vez.
+        """
+        if self._newton is not None:
+            return self._newton.evaluar_float(t_vals)
+        return horner(self.coeficientes_float(), t_vals)
     
     def actualizar_tiempos(self):
         self.tiempos = [n.get_tiempo() for n in self.nodos]
     
-    def graficar(self, ax, color_grafica = 'blue', color_puntos = 'black', t0=None, t1=None, samples = 400):
+    def graficar(self, ax, color_grafica = 'blue', color_puntos = 'black', t0=None, t1=None, samples = 400,
+                 tolerancia = None):
+        """
+        Dibuja la gráfica del polinomio en el intervalo dado por los nodos y, si se han proporcionado,
+        los tiempos t0 y t1. Si se da una tolerancia, se usa un muestreo adaptativo (ver muestreo_adaptativo)
+        en lugar de samples puntos equiespaciados en cada intervalo.
+        """
         # Crear la lista de tiempos entre los que se debe dibujar la curva
         tiempos_grafica = list()
         if not t0 is None:
@@ -121,8 +248,12 @@ class PolinomioInterpolacion(object):
         if self.poly is None:
             raise Exception("No se puede graficar un polinomio no interpolado")
         for i in range(len(tiempos_grafica) - 1):
-            t_vals = np.linspace(tiempos_grafica[i], tiempos_grafica[i+1], samples)
-            y_vals = np.array([self.poly(tj) for tj in t_vals])
+            if tolerancia is None:
+                t_vals = np.linspace(float(tiempos_grafica[i]), float(tiempos_grafica[i+1]), samples)
+                y_vals = self.evaluar_array(t_vals)
+            else:
+                _, puntos = muestreo_grafica(self, [float(tiempos_grafica[i]), float(tiempos_grafica[i+1])], tolerancia)
+                t_vals, y_vals = puntos[:, 0], puntos[:, 1]
 
             ax.plot(t_vals, y_vals, color = color_grafica)
         
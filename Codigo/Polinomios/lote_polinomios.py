@@ -0,0 +1,163 @@
+import json
+import time
+import itertools
+import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+from Codigo.Polinomios.clase_polinomio import Nodo1d, PolinomioInterpolacion
+from Codigo.Auxiliares.formato_polinomios import FORMATO_TEXTO
+from Codigo.Auxiliares.monotonia import es_estrictamente_monotona
+t = sp.symbols('t')
+
+# Número de especificaciones que se leen y se reparten entre los procesos de una vez
+TAMANO_BLOQUE = 256
+
+def leer_especificaciones(ruta_fichero):
+    """
+    Recorre las especificaciones de polinomios de un fichero y devuelve tuplas (nombre, especificación, error).
+    - Si el fichero termina en .jsonl, tiene una especificación por línea (las líneas vacías se saltan) y se lee
+      línea a línea; el nombre es la clave "nombre" de la especificación o, si no la tiene, el número de línea.
+      Si una línea no es JSON válido, se devuelve su número con especificación None y el mensaje de error,
+      y se sigue con las siguientes.
+    - Si no, es un JSON con una lista de especificaciones (los nombres son los índices) o un diccionario
+      {nombre: especificación}, como los que escribe repar_inter al guardar polinomios.
+    Cada especificación es un diccionario con los nodos como los de PolinomioInterpolacion.to_dict ("nodos")
+    o con las listas "tiempos", "valores" y, opcionalmente, "derivadas" (una lista de derivadas por tiempo).
+    """
+    if ruta_fichero.endswith(".jsonl"):
+        with open(ruta_fichero, 'r', encoding='utf-8') as f:
+            for i, linea in enumerate(f):
+                if not linea.strip():
+                    continue
+                try:
+                    especificacion = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield i, None, f"{type(e).__name__}: {e}"
+                    continue
+                nombre = especificacion.get("nombre", i) if isinstance(especificacion, dict) else i
+                yield nombre, especificacion, None
+        return
+
+    with open(ruta_fichero, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    elementos = datos.items() if isinstance(datos, dict) else enumerate(datos)
+    for nombre, especificacion in elementos:
+        yield nombre, especificacion, None
+
+def polinomio_desde_especificacion(especificacion):
+    """
+    Construye el PolinomioInterpolacion (sin interpolar) de una especificación de leer_especificaciones.
+    """
+    if not isinstance(especificacion, dict):
+        raise ValueError("La especificación debe ser un objeto JSON")
+    if "nodos" in especificacion:
+        nodos = [Nodo1d.from_dict(n) for n in especificacion["nodos"]]
+    else:
+        tiempos = especificacion["tiempos"]
+        valores = especificacion["valores"]
+        derivadas = especificacion.get("derivadas", [[] for _ in tiempos])
+        if len(valores) != len(tiempos) or len(derivadas) != len(tiempos):
+            raise ValueError("Las listas 'tiempos', 'valores' y 'derivadas' deben tener la misma longitud")
+        nodos = [Nodo1d(ti, vi, di) for ti, vi, di in zip(tiempos, valores, derivadas)]
+
+    if len(set(n.get_tiempo() for n in nodos)) < len(nodos):
+        raise ValueError("Hay varios nodos con el mismo tiempo")
+    return PolinomioInterpolacion(nodos)
+
+def condiciones_incumplidas(polinomio):
+    """
+    Comprueba de forma exacta que el polinomio interpolado cumple todas las condiciones de sus nodos.
+    Devuelve la lista de condiciones incumplidas como tuplas (tiempo, orden de derivación), vacía si es correcto.
+    """
+    incumplidas = list()
+    derivada = polinomio.poly
+    orden = 0
+    condiciones = polinomio.condiciones()
+    while any(orden < len(valores) for valores in condiciones.values()):
+        for tiempo, valores in condiciones.items():
+            if orden < len(valores) and derivada.eval(tiempo) != valores[orden][0]:
+                incumplidas.append((tiempo, orden))
+        derivada = derivada.diff(t)
+        orden += 1
+    return incumplidas
+
+def procesar_especificacion(nombre, especificacion, formato = FORMATO_TEXTO, monotonia = True):
+    """
+    Interpola y comprueba el polinomio de una especificación. Devuelve el diccionario que se escribe en el
+    fichero de resultados: el nombre, los datos del polinomio (ver PolinomioInterpolacion.to_dict), si cumple
+    las condiciones de los nodos y, si monotonia es True, el sentido de su monotonía entre el primer y el
+    último tiempo (1, -1 o 0 si no es monótono, ver es_estrictamente_monotona), con el tiempo empleado.
+    Si la especificación no es válida, devuelve el nombre y el mensaje de error.
+    """
+    inicio = time.perf_counter()
+    try:
+        polinomio = polinomio_desde_especificacion(especificacion)
+        polinomio.interpolar()
+    except Exception as e:
+        return {"nombre": nombre, "error": f"{type(e).__name__}: {e}"}
+
+    resultado = {"nombre": nombre}
+    resultado.update(polinomio.to_dict(formato))
+    incumplidas = condiciones_incumplidas(polinomio)
+    resultado["correcto"] = not incumplidas
+    if incumplidas:
+        resultado["condiciones_incumplidas"] = [[str(tiempo), orden] for tiempo, orden in incumplidas]
+    if monotonia:
+        tiempos = polinomio.tiempos
+        resultado["monotonia"] = es_estrictamente_monotona(polinomio.poly, tiempos[0], tiempos[-1]) \
+                                 if len(tiempos) > 1 else None
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+def _trabajo_lote(trabajo):
+    nombre, especificacion, error, formato, monotonia = trabajo
+    if error is not None:
+        # La especificación no se ha podido leer del fichero
+        return {"nombre": nombre, "error": error}
+    return procesar_especificacion(nombre, especificacion, formato, monotonia)
+
+def procesar_lote(ruta_lote, ruta_salida, procesos = None, formato = FORMATO_TEXTO, monotonia = True,
+                  tamano_bloque = TAMANO_BLOQUE):
+    """
+    Interpola y comprueba todos los polinomios del fichero ruta_lote (ver leer_especificaciones) y escribe los
+    resultados (ver procesar_especificacion) en el fichero JSONL ruta_salida, uno por línea y en el mismo orden.
+    Las especificaciones se leen por bloques de tamano_bloque, que se reparten entre procesos (por defecto,
+    tantos como núcleos; con procesos = 1 se hace todo en el proceso actual), y los resultados de cada bloque
+    se escriben en cuanto están, informando del ritmo de trabajo.
+    Devuelve un diccionario con el número de polinomios, los correctos, los incorrectos, los no monótonos,
+    los erróneos y los segundos empleados.
+    """
+    totales = {"polinomios": 0, "correctos": 0, "incorrectos": 0, "no_monotonos": 0, "errores": 0}
+    especificaciones = leer_especificaciones(ruta_lote)
+    inicio = time.perf_counter()
+    ejecutor = None if procesos == 1 else ProcessPoolExecutor(max_workers=procesos)
+    try:
+        with open(ruta_salida, 'w', encoding='utf-8') as salida:
+            while True:
+                bloque = [(nombre, especificacion, error, formato, monotonia)
+                          for nombre, especificacion, error in itertools.islice(especificaciones, tamano_bloque)]
+                if not bloque:
+                    break
+                if ejecutor is None or len(bloque) <= 1:
+                    resultados = map(_trabajo_lote, bloque)
+                else:
+                    resultados = ejecutor.map(_trabajo_lote, bloque)
+
+                for resultado in resultados:
+                    salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                    totales["polinomios"] += 1
+                    if "error" in resultado:
+                        totales["errores"] += 1
+                        continue
+                    totales["correctos" if resultado["correcto"] else "incorrectos"] += 1
+                    if resultado.get("monotonia") == 0:
+                        totales["no_monotonos"] += 1
+                salida.flush()
+
+                segundos = time.perf_counter() - inicio
+                print(f"{totales['polinomios']} polinomios procesados en {segundos:.2f} s " \
+                      f"({totales['polinomios'] / segundos:.1f} polinomios por segundo)")
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    totales["segundos"] = time.perf_counter() - inicio
+    return totales
@@ -1,9 +1,13 @@
 import os
+import sys
+import argparse
 import matplotlib.pyplot as plt
 from ast import literal_eval
 import sympy as sp
 from .clase_polinomio import *
+from .lote_polinomios import procesar_lote
 from Codigo.Auxiliares.lectura_datos import *
+from Codigo.Auxiliares.formato_polinomios import FORMATOS
 
 def borrar(ax, grid = True):
     ax.clear()
@@ -16,9 +20,64 @@ if __name__ == "__main__":
     ruta_archivo_polinomios = ""
 
     def guardar_polinomio(polinomio, nombre):
-        guardar_en_dict(polinomio, polinomios_guardar_dict, nombre)
-        print("Datos actuales del polinomio guardados en el diccionario 'polinomios_guardar_dict'."  \
-              "El fichero .json se escribirá al cerrar el programa con exit(), quit() o Ctrl + D.")
+        guardar_en_dict(polinomio, polinomios_guardar_dict, nombre, diario = diario)
+        print("Datos actuales del polinomio guardados en el diccionario 'polinomios_guardar_dict' y en el diario " \
+              "de la sesión. El fichero .json se escribirá al cerrar el programa con exit(), quit() o Ctrl + D.")
+
+    parser = argparse.ArgumentParser(
+        description="Construye polinomios de interpolación de Hermite en 1D. Sin argumentos, pide los datos por " \
+        "consola y abre un REPL interactivo; con --lote, interpola todos los polinomios de un fichero"
+    )
+    parser.add_argument(
+        "--lote",
+        help="Fichero con las especificaciones de los polinomios: JSON (lista o diccionario) o JSONL (una por línea)"
+    )
+    parser.add_argument(
+        "--salida",
+        help="Fichero JSONL en el que escribir los resultados del lote (por defecto, el del lote terminado " \
+        "en '_resultados.jsonl')"
+    )
+    parser.add_argument(
+        "--procesos",
+        help="Número de procesos entre los que repartir los polinomios del lote (por defecto, uno por núcleo)"
+    )
+    parser.add_argument(
+        "--formato",
+        help=f"Formato de los polinomios en los resultados: uno de {FORMATOS} (por defecto, 'texto')"
+    )
+    parser.add_argument(
+        "--sin_monotonia",
+        action="store_true",
+        help="No comprobar si los polinomios del lote son monótonos entre su primer y su último tiempo"
+    )
+    args = parser.parse_args()
+
+    # Modo por lotes: no se pide nada por consola
+    if args.lote:
+        procesos = int(args.procesos) if args.procesos else os.cpu_count()
+        formato = args.formato if args.formato else FORMATO_TEXTO
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de polinomio desconocido: {formato}. Debe ser uno de {FORMATOS}")
+        ruta_salida = args.salida if args.salida else os.path.splitext(args.lote)[0] + "_resultados.jsonl"
+
+        totales = procesar_lote(args.lote, ruta_salida, procesos, formato, not args.sin_monotonia)
+        segundos = totales["segundos"]
+        print(f"Resultados escritos en el fichero '{ruta_salida}'")
+        print(f"{totales['polinomios']} polinomios en {segundos:.2f} s " \
+              f"({totales['polinomios'] / segundos if segundos > 0 else 0:.1f} polinomios por segundo)")
+        print(f"Correctos: {totales['correctos']}, incorrectos: {totales['incorrectos']}, " \
+              f"no monótonos: {totales['no_monotonos']}, especificaciones no válidas: {totales['errores']}")
+        if totales["incorrectos"] > 0 or totales["errores"] > 0:
+            sys.exit(1)
+        sys.exit(0)
+
+    # Diario de la sesión: los polinomios guardados se anotan en él en cuanto se guardan, y si una sesión anterior
+    # se interrumpió sin escribir el fichero .json, se recuperan sus polinomios
+    diario, recuperados = DiarioSesion.abrir("./polinomios")
+    if recuperados:
+        polinomios_guardar_dict.update(recuperados)
+        print(f"Recuperados {len(recuperados)} polinomios de sesiones interrumpidas, " \
+              "guardados en el diccionario 'polinomios_guardar_dict'")
 
     # Obtener datos para la interpolación del usuario
     tiempos_string = input("Tiempos en los que interpolar (separados por comas, fracciones entrecomilladas):\n")
@@ -68,6 +127,9 @@ if __name__ == "__main__":
                     ruta_archivo_polinomios = f"{base[:-5]}_{i}.json"
                     i += 1
             
-            guardar_dict_en_archivo(ruta_archivo_polinomios, polinomios_guardar_dict)
+            # Se escribe el fichero .json completo y, una vez escrito, se borra el diario
+            diario.compactar(ruta_archivo_polinomios, polinomios_guardar_dict)
             print(f"Curvas guardadas en el fichero '{ruta_archivo_polinomios}'")
+        else:
+            diario.descartar()
         